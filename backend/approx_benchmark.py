@@ -0,0 +1,95 @@
+"""
+Approximate Summary Benchmark
+Runs /api/summary?approx=true against the DuckDB Snowflake stand-in
+(standin.py) once per sample seed, for each SAMPLE method, and compares
+every estimate with the exact answer: how many runs land inside the
+reported 95% margin, and the median query time next to the exact scan.
+The daily rollup is switched off so the exact path scans SCORED_MENTIONS.
+
+The stand-in stores rows in random created_at order, so a SYSTEM block is a
+random set of rows and its shares behave like a row sample. What it cannot
+hide is that SYSTEM picks a random number of whole blocks: total_tweets,
+scaled from the sample row count, misses its Bernoulli margin in most runs.
+
+Requires duckdb (pip install duckdb).
+
+Usage:
+    python approx_benchmark.py                                # 200k rows, 20k sampled
+    python approx_benchmark.py --rows 1600000 --sample-rows 200000
+    python approx_benchmark.py --seeds 100 --keyword love
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import main
+import result_cache
+from snowflake_client import init_pool
+from standin import SEED_START, StandinEngine, open_database
+
+METHODS = ("BERNOULLI", "SYSTEM")
+FIELDS = ("total_tweets", "avg_score", "pct_positive", "pct_negative", "pct_neutral")
+# Estimates are rounded to these steps before the margin check.
+ROUNDING = {"total_tweets": 1, "avg_score": 0.0001}
+END_DATE = "2009-06-27"
+
+
+async def summary(approx: bool, keyword) -> tuple[main.SummaryResponse, float]:
+    result_cache._cache = result_cache.ResultCache()
+    started = time.perf_counter()
+    response = await main.get_summary(
+        start_date=SEED_START, end_date=END_DATE, keyword=keyword,
+        sentiment_filter=None, approx=approx,
+    )
+    return response, time.perf_counter() - started
+
+
+async def run(methods, seeds: int, keyword) -> None:
+    exact, _ = await summary(False, keyword)
+    exact_times = [(await summary(False, keyword))[1] for _ in range(5)]
+    print(f"exact: {statistics.median(exact_times) * 1000:.1f}ms\n")
+
+    header = f"{'method':<11}" + "".join(f"{name:>14}" for name in FIELDS) + f"{'median':>10}"
+    print(header + "\n" + "-" * len(header))
+    for method in methods:
+        main.APPROX_SAMPLE_METHOD = method
+        inside = dict.fromkeys(FIELDS, 0)
+        timings = []
+        for seed in range(seeds):
+            main.APPROX_SAMPLE_SEED = seed
+            estimate, seconds = await summary(True, keyword)
+            timings.append(seconds)
+            for name in FIELDS:
+                error = abs(getattr(estimate, name) - getattr(exact, name))
+                margin = getattr(estimate.approx, f"{name}_margin")
+                inside[name] += error <= margin + ROUNDING.get(name, 0.01)
+        print(
+            f"{method:<11}"
+            + "".join(f"{inside[name]:>10}/{seeds:<3}" for name in FIELDS)
+            + f"{statistics.median(timings) * 1000:>8.1f}ms"
+        )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Check approx=true margins per SAMPLE method")
+    parser.add_argument("--rows", type=int, default=200_000, help="Seeded SCORED_MENTIONS rows")
+    parser.add_argument("--sample-rows", type=int, default=20_000, help="APPROX_SAMPLE_ROWS")
+    parser.add_argument("--seeds", type=int, default=40, help="Sample seeds per method")
+    parser.add_argument("--keyword", default=None)
+    parser.add_argument("--methods", nargs="+", default=list(METHODS))
+    args = parser.parse_args()
+
+    engine = StandinEngine(
+        open_database(":memory:", args.rows),
+        latency=0, cortex_latency=0, connect_latency=0, resume_latency=0,
+    )
+    init_pool(engine.connect)
+    main.USE_DAILY_ROLLUP = False
+    main.APPROX_SAMPLE_ROWS = args.sample_rows
+    asyncio.run(run([m.upper() for m in args.methods], args.seeds, args.keyword))
+
+
+if __name__ == "__main__":
+    main_cli()
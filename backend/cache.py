@@ -1,5 +1,111 @@
 import hashlib
-from snowflake_client import execute_query, execute_dml
+import os
+import threading
+import time
+from datetime import datetime
+
+from metrics import observe_cache
+from result_cache import ResultCache
+from snowflake_client import (
+    execute_query,
+    execute_query_async,
+    execute_dml,
+    execute_dml_async,
+)
+
+# Two tiers: a size-bounded in-process LRU in front of WHY_LAYER_CACHE.
+# Both honour the same 24-hour TTL, measured from generated_at in Snowflake
+# time: memory entries never outlive the Snowflake row.
+WHY_CACHE_TTL_SECONDS = 24 * 3600
+# Content-addressed analyses depend only on the tweets sent to Cortex, so
+# they stay valid longer than parameter-keyed entries.
+WHY_CONTENT_CACHE_TTL_HOURS = int(os.environ.get("WHY_CONTENT_CACHE_TTL_HOURS", "168"))
+# Namespaces parameter keys by keyword semantics. Bump it whenever the same
+# parameters start selecting different tweets, so entries computed under the
+# old meaning are never served: v2 is whole-token keyword matching
+# (keyword_index.py), where "love" no longer matches "lovely".
+WHY_CACHE_KEY_VERSION = "v2"
+WHY_MEMORY_CACHE_MAX_ENTRIES = int(os.environ.get("WHY_MEMORY_CACHE_MAX_ENTRIES", "256"))
+WHY_MEMORY_CACHE_MAX_BYTES = int(
+    os.environ.get("WHY_MEMORY_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+
+READ_SQL = """
+    SELECT
+        bullet_summary,
+        tweet_sample,
+        generated_at,
+        DATEDIFF('second', CURRENT_TIMESTAMP(), DATEADD('hour', 24, generated_at))
+            AS ttl_remaining
+    FROM WHY_LAYER_CACHE
+    WHERE cache_key = %s
+      AND generated_at > DATEADD('hour', -24, CURRENT_TIMESTAMP())
+"""
+MERGE_SQL = """
+    MERGE INTO WHY_LAYER_CACHE t
+    USING (
+        SELECT %s AS cache_key, %s AS sentiment_type,
+               %s AS bullet_summary, %s AS tweet_sample, %s AS content_key
+    ) s
+    ON t.cache_key = s.cache_key
+    WHEN MATCHED THEN UPDATE SET
+        sentiment_type = s.sentiment_type,
+        bullet_summary = s.bullet_summary,
+        tweet_sample = s.tweet_sample,
+        content_key = s.content_key,
+        generated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+        (cache_key, sentiment_type, bullet_summary, tweet_sample, content_key,
+         generated_at)
+        VALUES (s.cache_key, s.sentiment_type, s.bullet_summary, s.tweet_sample,
+                s.content_key, CURRENT_TIMESTAMP())
+"""
+CONTENT_READ_SQL = f"""
+    SELECT
+        bullet_summary,
+        tweet_sample,
+        generated_at,
+        DATEDIFF('second', CURRENT_TIMESTAMP(),
+                 DATEADD('hour', {WHY_CONTENT_CACHE_TTL_HOURS}, generated_at))
+            AS ttl_remaining
+    FROM WHY_CONTENT_CACHE
+    WHERE content_key = %s
+      AND generated_at > DATEADD('hour', -{WHY_CONTENT_CACHE_TTL_HOURS}, CURRENT_TIMESTAMP())
+"""
+CONTENT_MERGE_SQL = """
+    MERGE INTO WHY_CONTENT_CACHE t
+    USING (
+        SELECT %s AS content_key, %s AS model, %s AS prompt_version,
+               %s AS bullet_summary, %s AS tweet_sample
+    ) s
+    ON t.content_key = s.content_key
+    WHEN MATCHED THEN UPDATE SET
+        bullet_summary = s.bullet_summary,
+        tweet_sample = s.tweet_sample,
+        generated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+        (content_key, model, prompt_version, bullet_summary, tweet_sample, generated_at)
+        VALUES (s.content_key, s.model, s.prompt_version, s.bullet_summary,
+                s.tweet_sample, CURRENT_TIMESTAMP())
+"""
+
+_memory = ResultCache(
+    max_entries=WHY_MEMORY_CACHE_MAX_ENTRIES,
+    max_bytes=WHY_MEMORY_CACHE_MAX_BYTES,
+    ttl_seconds=WHY_CACHE_TTL_SECONDS,
+)
+# Content-addressed analyses get their own memory tier, so they neither
+# evict nor are evicted by parameter-keyed entries.
+_content_memory = ResultCache(
+    max_entries=WHY_MEMORY_CACHE_MAX_ENTRIES,
+    max_bytes=WHY_MEMORY_CACHE_MAX_BYTES,
+    ttl_seconds=WHY_CONTENT_CACHE_TTL_HOURS * 3600,
+)
+_stats_lock = threading.Lock()
+_snowflake_hits = 0
+_snowflake_misses = 0
+_content_hits = 0
+_content_misses = 0
 
 
 def compute_cache_key(
@@ -8,24 +114,95 @@ def compute_cache_key(
     keyword: str | None,
     sentiment_type: str,
 ) -> str:
-    """Computes MD5 hash cache key from filter parameters.
-    Keyword is normalized to lowercase and stripped."""
+    """Computes MD5 hash cache key from filter parameters and
+    WHY_CACHE_KEY_VERSION. Keyword is normalized to lowercase and stripped."""
     normalized_keyword = (keyword or "").lower().strip()
-    raw = f"{start_date}||{end_date}||{normalized_keyword}||{sentiment_type}"
+    raw = (
+        f"{WHY_CACHE_KEY_VERSION}||{start_date}||{end_date}||"
+        f"{normalized_keyword}||{sentiment_type}"
+    )
     return hashlib.md5(raw.encode("utf-8")).hexdigest()
 
 
+def compute_content_key(
+    tweet_ids: list,
+    model: str,
+    prompt_version: str,
+) -> str:
+    """Computes MD5 hash of the ordered tweet_ids sent to Cortex, plus the
+    model and prompt version. Identical selections share one analysis."""
+    raw = f"{model}||{prompt_version}||" + ",".join(str(t) for t in tweet_ids)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def _from_snowflake(cache_key: str, results: list[dict]) -> dict | None:
+    global _snowflake_hits, _snowflake_misses
+    with _stats_lock:
+        if results:
+            _snowflake_hits += 1
+        else:
+            _snowflake_misses += 1
+    return _remember(_memory, cache_key, results)
+
+
+def _remember(memory: ResultCache, key: str, results: list[dict]) -> dict | None:
+    """Stores a row read from Snowflake in a memory tier until the row's own
+    expiry, i.e. for its ttl_remaining as computed by Snowflake."""
+    if not results:
+        return None
+    entry = dict(results[0])
+    ttl_remaining = entry.pop("ttl_remaining", None)
+    memory.put(
+        key,
+        entry,
+        ttl_seconds=None if ttl_remaining is None else float(ttl_remaining),
+    )
+    return entry
+
+
+def _remember_written(
+    memory: ResultCache,
+    key: str,
+    bullet_summary: str,
+    tweet_sample: str,
+    ttl_seconds: float,
+    started: float,
+) -> None:
+    """Stores an entry just MERGEd without reading it back. Snowflake stamps
+    generated_at during the MERGE, after started, so expiring ttl_seconds
+    after started never outlives the row."""
+    memory.put(
+        key,
+        {
+            "bullet_summary": bullet_summary,
+            "tweet_sample": tweet_sample,
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        ttl_seconds=ttl_seconds - (time.monotonic() - started),
+    )
+
+
 def read_cache(cache_key: str) -> dict | None:
     """Reads a cache entry if it exists and is within the 24-hour TTL.
     Returns dict with bullet_summary, tweet_sample, generated_at or None."""
-    sql = """
-        SELECT bullet_summary, tweet_sample, generated_at
-        FROM WHY_LAYER_CACHE
-        WHERE cache_key = %s
-          AND generated_at > DATEADD('hour', -24, CURRENT_TIMESTAMP())
-    """
-    results = execute_query(sql, (cache_key,))
-    return results[0] if results else None
+    started = time.monotonic()
+    hit, entry = _memory.get(cache_key)
+    if not hit:
+        entry = _from_snowflake(cache_key, execute_query(READ_SQL, (cache_key,)))
+    observe_cache("why", entry is not None, time.monotonic() - started)
+    return entry
+
+
+async def read_cache_async(cache_key: str) -> dict | None:
+    """Async read_cache."""
+    started = time.monotonic()
+    hit, entry = _memory.get(cache_key)
+    if not hit:
+        entry = _from_snowflake(
+            cache_key, await execute_query_async(READ_SQL, (cache_key,))
+        )
+    observe_cache("why", entry is not None, time.monotonic() - started)
+    return entry
 
 
 def write_cache(
@@ -33,17 +210,140 @@ def write_cache(
     sentiment_type: str,
     bullet_summary: str,
     tweet_sample: str,
+    content_key: str | None = None,
+) -> None:
+    """Inserts or replaces a cache entry with a single MERGE.
+    content_key records which content-addressed analysis the entry reuses."""
+    started = time.monotonic()
+    execute_dml(
+        MERGE_SQL,
+        (cache_key, sentiment_type, bullet_summary, tweet_sample, content_key),
+    )
+    _remember_written(
+        _memory, cache_key, bullet_summary, tweet_sample, WHY_CACHE_TTL_SECONDS, started
+    )
+
+
+async def write_cache_async(
+    cache_key: str,
+    sentiment_type: str,
+    bullet_summary: str,
+    tweet_sample: str,
+    content_key: str | None = None,
 ) -> None:
-    """Inserts or replaces a cache entry (DELETE + INSERT)."""
-    execute_dml("DELETE FROM WHY_LAYER_CACHE WHERE cache_key = %s", (cache_key,))
-    sql = """
-        INSERT INTO WHY_LAYER_CACHE
-            (cache_key, sentiment_type, bullet_summary, tweet_sample, generated_at)
-        VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP())
-    """
-    execute_dml(sql, (cache_key, sentiment_type, bullet_summary, tweet_sample))
-
-
-def delete_cache(cache_key: str) -> None:
-    """Deletes a specific cache entry. Used for force_refresh."""
-    execute_dml("DELETE FROM WHY_LAYER_CACHE WHERE cache_key = %s", (cache_key,))
+    """Async write_cache."""
+    started = time.monotonic()
+    await execute_dml_async(
+        MERGE_SQL,
+        (cache_key, sentiment_type, bullet_summary, tweet_sample, content_key),
+    )
+    _remember_written(
+        _memory, cache_key, bullet_summary, tweet_sample, WHY_CACHE_TTL_SECONDS, started
+    )
+
+
+# --- Content-addressed layer ---
+# Keyed on compute_content_key. Entries live in _content_memory in front of
+# WHY_CONTENT_CACHE, expiring WHY_CONTENT_CACHE_TTL_HOURS after generated_at.
+
+
+def _count_content(hit: bool) -> None:
+    global _content_hits, _content_misses
+    with _stats_lock:
+        if hit:
+            _content_hits += 1
+        else:
+            _content_misses += 1
+
+
+def _content_from_snowflake(content_key: str, results: list[dict]) -> dict | None:
+    _count_content(bool(results))
+    return _remember(_content_memory, content_key, results)
+
+
+def read_content_cache(content_key: str) -> dict | None:
+    """Reads a content-addressed analysis. Returns dict with bullet_summary,
+    tweet_sample, generated_at or None."""
+    started = time.monotonic()
+    hit, entry = _content_memory.get(content_key)
+    if hit:
+        _count_content(True)
+    else:
+        entry = _content_from_snowflake(
+            content_key, execute_query(CONTENT_READ_SQL, (content_key,))
+        )
+    observe_cache("why_content", entry is not None, time.monotonic() - started)
+    return entry
+
+
+async def read_content_cache_async(content_key: str) -> dict | None:
+    """Async read_content_cache."""
+    started = time.monotonic()
+    hit, entry = _content_memory.get(content_key)
+    if hit:
+        _count_content(True)
+    else:
+        entry = _content_from_snowflake(
+            content_key, await execute_query_async(CONTENT_READ_SQL, (content_key,))
+        )
+    observe_cache("why_content", entry is not None, time.monotonic() - started)
+    return entry
+
+
+def write_content_cache(
+    content_key: str,
+    model: str,
+    prompt_version: str,
+    bullet_summary: str,
+    tweet_sample: str,
+) -> None:
+    """Stores a Cortex analysis under its content key."""
+    started = time.monotonic()
+    execute_dml(
+        CONTENT_MERGE_SQL,
+        (content_key, model, prompt_version, bullet_summary, tweet_sample),
+    )
+    _remember_written(
+        _content_memory, content_key, bullet_summary, tweet_sample,
+        WHY_CONTENT_CACHE_TTL_HOURS * 3600, started,
+    )
+
+
+async def write_content_cache_async(
+    content_key: str,
+    model: str,
+    prompt_version: str,
+    bullet_summary: str,
+    tweet_sample: str,
+) -> None:
+    """Async write_content_cache."""
+    started = time.monotonic()
+    await execute_dml_async(
+        CONTENT_MERGE_SQL,
+        (content_key, model, prompt_version, bullet_summary, tweet_sample),
+    )
+    _remember_written(
+        _content_memory, content_key, bullet_summary, tweet_sample,
+        WHY_CONTENT_CACHE_TTL_HOURS * 3600, started,
+    )
+
+
+def _ratio(hits: int, misses: int) -> dict:
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def why_cache_stats() -> dict:
+    """Hit ratios reported separately for the memory and Snowflake tiers, and
+    for the content-addressed layer (each content hit is a Cortex call saved)
+    with its own memory tier."""
+    memory = _memory.stats()
+    with _stats_lock:
+        snowflake = _ratio(_snowflake_hits, _snowflake_misses)
+        content = _ratio(_content_hits, _content_misses)
+    content["memory"] = _content_memory.stats()
+    return {"memory": memory, "snowflake": snowflake, "content": content}
@@ -1,4 +1,22 @@
-from snowflake_client import execute_query, execute_scalar
+import os
+from typing import AsyncIterator, Callable
+
+from snowflake_client import (
+    execute_query,
+    execute_query_async,
+    execute_scalar,
+    execute_scalar_async,
+)
+from keyword_index import keyword_condition
+from metrics import cortex_timer
+from prompt_dedup import TweetCluster, cluster_near_duplicates, within_budget
+from cache import (
+    compute_content_key,
+    read_content_cache,
+    read_content_cache_async,
+    write_content_cache,
+    write_content_cache_async,
+)
 
 # Business rules from the PRD — do not change
 SENTIMENT_POSITIVE_THRESHOLD = 0.2
@@ -6,16 +24,21 @@ SENTIMENT_NEGATIVE_THRESHOLD = -0.2
 CORTEX_MODEL = "mistral-7b"
 MAX_TWEET_BATCH = 150
 MAX_TWEET_CHARS = 200
+# Candidates fetched per Why request. Near-duplicates are grouped before the
+# MAX_TWEET_BATCH distinct tweets are chosen, so fetch a deeper pool.
+MAX_TWEET_CANDIDATES = int(os.environ.get("WHY_MAX_TWEET_CANDIDATES", "450"))
 
+# Bump whenever build_prompt changes so content-addressed analyses produced
+# by an older prompt are not reused.
+PROMPT_VERSION = "v2"
 
-def fetch_tweets_for_why(
+
+def _why_tweets_query(
     sentiment_type: str,
     start_date: str,
     end_date: str,
-    keyword: str | None = None,
-) -> list[dict]:
-    """Fetches up to 150 tweets for the Why Layer prompt.
-    Orders by most extreme sentiment first."""
+    keyword: str | None,
+) -> tuple[str, tuple]:
     if sentiment_type not in ("NEGATIVE", "POSITIVE"):
         raise ValueError(f"Invalid sentiment_type: {sentiment_type}")
 
@@ -31,28 +54,74 @@ def fetch_tweets_for_why(
     params = [sentiment_type, start_date, end_date]
 
     if keyword:
-        sql += " AND LOWER(text) LIKE %s"
-        params.append(f"%{keyword.lower().strip()}%")
+        condition, keyword_params = keyword_condition(keyword, start_date, end_date)
+        sql += f" AND {condition}"
+        params.extend(keyword_params)
+
+    sql += f" ORDER BY sentiment_score {order} LIMIT {int(MAX_TWEET_CANDIDATES)}"
+
+    return sql, tuple(params)
+
+
+def fetch_tweets_for_why(
+    sentiment_type: str,
+    start_date: str,
+    end_date: str,
+    keyword: str | None = None,
+) -> list[dict]:
+    """Fetches up to MAX_TWEET_CANDIDATES tweets for the Why Layer prompt.
+    Orders by most extreme sentiment first."""
+    sql, params = _why_tweets_query(sentiment_type, start_date, end_date, keyword)
+    return execute_query(sql, params)
 
-    sql += f" ORDER BY sentiment_score {order} LIMIT {MAX_TWEET_BATCH}"
 
-    return execute_query(sql, tuple(params))
+async def fetch_tweets_for_why_async(
+    sentiment_type: str,
+    start_date: str,
+    end_date: str,
+    keyword: str | None = None,
+) -> list[dict]:
+    """Async fetch_tweets_for_why."""
+    sql, params = _why_tweets_query(sentiment_type, start_date, end_date, keyword)
+    return await execute_query_async(sql, params)
 
 
-def build_prompt(tweets: list[dict], sentiment_type: str) -> str:
+def _tweet_line(index: int, cluster: TweetCluster) -> str:
+    text = (cluster.representative["text"] or "")[:MAX_TWEET_CHARS]
+    if cluster.count > 1:
+        return f"{index}. [x{cluster.count}] {text}"
+    return f"{index}. {text}"
+
+
+def select_prompt_tweets(tweets: list[dict]) -> list[TweetCluster]:
+    """Groups near-duplicate tweets and keeps up to 150 distinct ones that
+    fit the prompt token budget, most extreme first."""
+    clusters = cluster_near_duplicates(tweets)
+    return within_budget(clusters, _tweet_line, MAX_TWEET_BATCH)
+
+
+def build_prompt(clusters: list[TweetCluster], sentiment_type: str) -> str:
     """Constructs the structured prompt for CORTEX.COMPLETE().
-    Each tweet truncated to 200 chars. Max 5 root-cause bullets."""
+    One line per near-duplicate cluster, truncated to 200 chars and
+    prefixed with [xN] when it stands for N tweets. Max 5 root-cause bullets."""
     sentiment_word = "negative" if sentiment_type == "NEGATIVE" else "positive"
 
-    tweet_lines = []
-    for i, tweet in enumerate(tweets, 1):
-        text = (tweet["text"] or "")[:MAX_TWEET_CHARS]
-        tweet_lines.append(f"{i}. {text}")
+    tweet_block = "\n".join(
+        _tweet_line(i, cluster) for i, cluster in enumerate(clusters, 1)
+    )
+    total = sum(cluster.count for cluster in clusters)
 
-    tweet_block = "\n".join(tweet_lines)
+    if total > len(clusters):
+        intro = (
+            f"Below are {len(clusters)} distinct {sentiment_word} tweets standing "
+            f"for {total} tweets; [xN] marks a tweet posted N times in near-identical "
+            f"form. Weight percentages by these counts. "
+        )
+    else:
+        intro = f"Below are {len(clusters)} {sentiment_word} tweets. "
 
     return (
-        f"You are a brand analyst. Below are {len(tweets)} {sentiment_word} tweets. "
+        f"You are a brand analyst. {intro}"
         f"Identify the top root causes of this {sentiment_word} sentiment. "
         f"Return a maximum of 5 bullet points. "
         f"Format each bullet exactly as: • [~XX%] Reason here\n"
@@ -61,33 +130,191 @@ def build_prompt(tweets: list[dict], sentiment_type: str) -> str:
     )
 
 
-def call_cortex_complete(prompt: str) -> str:
-    """Calls SNOWFLAKE.CORTEX.COMPLETE() via SQL with the mistral-7b model."""
-    sql = "SELECT SNOWFLAKE.CORTEX.COMPLETE(%s, %s) AS response"
-    result = execute_scalar(sql, (CORTEX_MODEL, prompt))
+COMPLETE_SQL = "SELECT SNOWFLAKE.CORTEX.COMPLETE(%s, %s) AS response"
+
 
+def _complete_result(result) -> str:
     if result is None:
         raise RuntimeError("CORTEX.COMPLETE returned no result")
 
     return str(result)
 
 
+def call_cortex_complete(prompt: str) -> str:
+    """Calls SNOWFLAKE.CORTEX.COMPLETE() via SQL with the mistral-7b model."""
+    with cortex_timer():
+        return _complete_result(execute_scalar(COMPLETE_SQL, (CORTEX_MODEL, prompt)))
+
+
+async def call_cortex_complete_async(prompt: str) -> str:
+    """Async call_cortex_complete."""
+    with cortex_timer():
+        return _complete_result(
+            await execute_scalar_async(COMPLETE_SQL, (CORTEX_MODEL, prompt))
+        )
+
+
+async def stream_cortex_complete_async(prompt: str) -> AsyncIterator[str]:
+    """call_cortex_complete_async as a chunk stream. COMPLETE through SQL
+    returns the whole response at once, so this yields a single chunk;
+    generate_why_analysis_stream accepts any chunk-yielding completion (a
+    streaming client, or a stub in tests) in its place."""
+    # Timed by the caller, which holds cortex_timer for the whole stream.
+    yield _complete_result(await execute_scalar_async(COMPLETE_SQL, (CORTEX_MODEL, prompt)))
+
+
+async def _completed_lines(chunks: AsyncIterator[str], parts: list[str]) -> AsyncIterator[str]:
+    """Yields each non-empty line of a chunk stream as soon as it is
+    complete, collecting the raw chunks into parts."""
+    buffer = ""
+    async for chunk in chunks:
+        parts.append(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _no_tweets_error(sentiment_type: str) -> ValueError:
+    return ValueError(
+        f"No {sentiment_type} tweets found for the given date range and keyword."
+    )
+
+
+def _content_key(clusters: list[TweetCluster]) -> str:
+    # Every tweet the prompt stands for, including grouped near-duplicates.
+    return compute_content_key(
+        [tweet["tweet_id"] for cluster in clusters for tweet in cluster.members],
+        CORTEX_MODEL,
+        PROMPT_VERSION,
+    )
+
+
+def resolve_content_key(
+    sentiment_type: str,
+    start_date: str,
+    end_date: str,
+    keyword: str | None = None,
+) -> str | None:
+    """The content key generate_why_analysis would look up for these
+    filters, or None when no tweets match. Fetches tweets but calls no model."""
+    tweets = fetch_tweets_for_why(sentiment_type, start_date, end_date, keyword)
+    if not tweets:
+        return None
+    return _content_key(select_prompt_tweets(tweets))
+
+
 def generate_why_analysis(
     sentiment_type: str,
     start_date: str,
     end_date: str,
     keyword: str | None = None,
-) -> tuple[str, str]:
+    force: bool = False,
+) -> tuple[str, str, str]:
     """Full pipeline: fetch tweets -> build prompt -> call Cortex.
-    Returns (bullet_summary, prompt_text)."""
+    Reuses a stored analysis when the same tweets were analysed before,
+    unless force is set. Returns (bullet_summary, prompt_text, content_key)."""
     tweets = fetch_tweets_for_why(sentiment_type, start_date, end_date, keyword)
 
     if not tweets:
-        raise ValueError(
-            f"No {sentiment_type} tweets found for the given date range and keyword."
-        )
+        raise _no_tweets_error(sentiment_type)
 
-    prompt = build_prompt(tweets, sentiment_type)
+    clusters = select_prompt_tweets(tweets)
+    content_key = _content_key(clusters)
+    cached = None if force else read_content_cache(content_key)
+    if cached:
+        return cached["bullet_summary"], cached["tweet_sample"], content_key
+
+    prompt = build_prompt(clusters, sentiment_type)
     bullet_summary = call_cortex_complete(prompt)
+    write_content_cache(
+        content_key, CORTEX_MODEL, PROMPT_VERSION, bullet_summary, prompt
+    )
+
+    return bullet_summary, prompt, content_key
+
+
+async def generate_why_analysis_async(
+    sentiment_type: str,
+    start_date: str,
+    end_date: str,
+    keyword: str | None = None,
+    force: bool = False,
+) -> tuple[str, str, str]:
+    """Async generate_why_analysis."""
+    tweets = await fetch_tweets_for_why_async(
+        sentiment_type, start_date, end_date, keyword
+    )
+
+    if not tweets:
+        raise _no_tweets_error(sentiment_type)
+
+    clusters = select_prompt_tweets(tweets)
+    content_key = _content_key(clusters)
+    cached = None if force else await read_content_cache_async(content_key)
+    if cached:
+        return cached["bullet_summary"], cached["tweet_sample"], content_key
+
+    prompt = build_prompt(clusters, sentiment_type)
+    bullet_summary = await call_cortex_complete_async(prompt)
+    await write_content_cache_async(
+        content_key, CORTEX_MODEL, PROMPT_VERSION, bullet_summary, prompt
+    )
+
+    return bullet_summary, prompt, content_key
+
+
+async def generate_why_analysis_stream(
+    sentiment_type: str,
+    start_date: str,
+    end_date: str,
+    keyword: str | None = None,
+    force: bool = False,
+    complete: Callable[[str], AsyncIterator[str]] | None = None,
+) -> AsyncIterator[dict]:
+    """generate_why_analysis_async as events: progress once the tweets are
+    fetched and once the prompt is built, a bullet event per bullet line as
+    soon as the completion has produced it, and finally a result event with
+    bullet_summary, prompt_text and content_key. A content-cache hit skips
+    the completion. complete defaults to stream_cortex_complete_async."""
+    complete = complete or stream_cortex_complete_async
+    tweets = await fetch_tweets_for_why_async(
+        sentiment_type, start_date, end_date, keyword
+    )
+
+    if not tweets:
+        raise _no_tweets_error(sentiment_type)
+    yield {"event": "progress", "stage": "tweets_fetched", "tweets": len(tweets)}
+
+    clusters = select_prompt_tweets(tweets)
+    content_key = _content_key(clusters)
+    cached = None if force else await read_content_cache_async(content_key)
+    if cached:
+        bullet_summary, prompt = cached["bullet_summary"], cached["tweet_sample"]
+        for line in bullet_summary.splitlines():
+            if line.strip():
+                yield {"event": "bullet", "text": line.strip()}
+    else:
+        prompt = build_prompt(clusters, sentiment_type)
+        yield {"event": "progress", "stage": "prompt_built", "distinct_tweets": len(clusters)}
+
+        parts: list[str] = []
+        with cortex_timer():
+            async for line in _completed_lines(complete(prompt), parts):
+                yield {"event": "bullet", "text": line}
+        bullet_summary = "".join(parts)
+        if not bullet_summary.strip():
+            raise RuntimeError("CORTEX.COMPLETE returned no result")
+        await write_content_cache_async(
+            content_key, CORTEX_MODEL, PROMPT_VERSION, bullet_summary, prompt
+        )
 
-    return bullet_summary, prompt
+    yield {
+        "event": "result",
+        "bullet_summary": bullet_summary,
+        "prompt_text": prompt,
+        "content_key": content_key,
+    }
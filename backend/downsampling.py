@@ -0,0 +1,35 @@
+def lttb_indices(values: list[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets: indices of at most `threshold` points
+    of an evenly spaced series that best preserve its visual shape. The
+    first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Thresholds below 3 keep every point."""
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+
+        next_start = end
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        if bucket == threshold - 3:
+            next_start, next_end = n - 1, n
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        px, py = previous, values[previous]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((px - avg_x) * (values[i] - py) - (px - i) * (avg_y - py))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        previous = best
+
+    selected.append(n - 1)
+    return selected
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from result_cache import current_watermark_async
+
+HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", "0"))
+# Bump when a response shape changes so clients drop their old copies.
+ETAG_VERSION = "1"
+
+
+def cache_control() -> str:
+    """Browsers may reuse a response for HTTP_CACHE_MAX_AGE seconds and must
+    revalidate with If-None-Match after that (immediately by default)."""
+    return f"private, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+
+
+def compute_etag(path: str, query_items: list[tuple[str, str]], watermark) -> str:
+    """Weak ETag for a GET: path, sorted query parameters and the
+    SCORED_MENTIONS data watermark. Any load or rescoring moves the watermark
+    and therefore changes every ETag. It is weak because the compression
+    middleware sends the same content gzip, brotli or identity encoded."""
+    raw = json.dumps(
+        [ETAG_VERSION, path, sorted(query_items), list(watermark)], default=str
+    )
+    return 'W/"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+async def conditional_get(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+    paths: frozenset[str],
+) -> Response:
+    """Answers a matching If-None-Match with 304 before the endpoint runs, and
+    tags successful responses with ETag, Cache-Control and Vary."""
+    if request.method != "GET" or request.url.path not in paths:
+        return await call_next(request)
+
+    watermark = await current_watermark_async()
+    etag = compute_etag(request.url.path, request.query_params.multi_items(), watermark)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control(),
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from zoneinfo import ZoneInfo
+
+from snowflake_client import execute_query_async
+
+logger = logging.getLogger("sentiment_api.keepalive")
+
+# "08:00-18:00" keeps SENTIMENT_WH running through those hours on KEEPALIVE_DAYS
+# (an end before the start spans midnight). Empty disables the scheduler.
+# The warehouse then bills for the whole window, so keep it to the hours the
+# dashboard is actually used.
+KEEPALIVE_HOURS = os.environ.get("KEEPALIVE_HOURS", "")
+KEEPALIVE_DAYS = os.environ.get("KEEPALIVE_DAYS", "mon-fri")
+KEEPALIVE_TIMEZONE = os.environ.get("KEEPALIVE_TIMEZONE", "UTC")
+# Must stay under the warehouse's AUTO_SUSPEND (120s in snowflake/setup.sql).
+KEEPALIVE_INTERVAL_SECONDS = float(os.environ.get("KEEPALIVE_INTERVAL_SECONDS", "100"))
+
+# Reads table data, so it runs on the warehouse rather than being answered
+# from metadata, and RANDOM() keeps it out of the result cache.
+KEEPALIVE_SQL = """
+    SELECT sentiment_score FROM SCORED_MENTIONS WHERE RANDOM() IS NOT NULL LIMIT 1
+"""
+
+_DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_days(spec: str) -> frozenset[int]:
+    """Weekday numbers (Monday is 0) for "mon-fri", "sat,sun" or "mon-wed,fri"."""
+    days = set()
+    for part in spec.lower().replace(" ", "").split(","):
+        first, _, last = part.partition("-")
+        start = _DAY_NAMES.index(first)
+        end = _DAY_NAMES.index(last) if last else start
+        days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+    return frozenset(days)
+
+
+def parse_hours(spec: str) -> tuple[datetime.time, datetime.time]:
+    """(start, end) times for "08:00-18:00"."""
+    start, end = spec.replace(" ", "").split("-")
+    return datetime.time.fromisoformat(start), datetime.time.fromisoformat(end)
+
+
+@dataclass(frozen=True)
+class BusinessHours:
+    days: frozenset[int]
+    start: datetime.time
+    end: datetime.time
+    timezone: datetime.tzinfo
+
+    @classmethod
+    def parse(cls, hours: str, days: str, timezone: str) -> "BusinessHours":
+        start, end = parse_hours(hours)
+        return cls(parse_days(days), start, end, ZoneInfo(timezone))
+
+    def contains(self, moment: datetime.datetime) -> bool:
+        """True if the aware datetime falls inside the window. A window that
+        spans midnight belongs to the day it starts on."""
+        local = moment.astimezone(self.timezone)
+        now, weekday = local.time(), local.weekday()
+        if self.start <= self.end:
+            return weekday in self.days and self.start <= now < self.end
+        if now >= self.start:
+            return weekday in self.days
+        return now < self.end and (weekday - 1) % 7 in self.days
+
+
+def business_hours_from_env() -> BusinessHours | None:
+    if not KEEPALIVE_HOURS:
+        return None
+    return BusinessHours.parse(KEEPALIVE_HOURS, KEEPALIVE_DAYS, KEEPALIVE_TIMEZONE)
+
+
+async def _ping() -> None:
+    await execute_query_async(KEEPALIVE_SQL)
+
+
+class WarehouseKeepAlive:
+    """Runs KEEPALIVE_SQL every interval_seconds while inside business hours,
+    so the warehouse never reaches AUTO_SUSPEND and a pooled connection is
+    always freshly used. Outside the window it only sleeps, and the
+    warehouse suspends as usual. Disabled when hours is None."""
+
+    def __init__(
+        self,
+        hours: BusinessHours | None = None,
+        interval_seconds: float = KEEPALIVE_INTERVAL_SECONDS,
+        ping: Callable[[], Awaitable[None]] = _ping,
+    ):
+        self.hours = hours
+        self.interval_seconds = interval_seconds
+        self._ping = ping
+        self._task: asyncio.Task | None = None
+        self.pings = 0
+        self.failures = 0
+        self.last_ping_seconds: float | None = None
+
+    @classmethod
+    def from_env(cls) -> "WarehouseKeepAlive":
+        return cls(business_hours_from_env())
+
+    def start(self) -> None:
+        if self.hours is not None and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if self.hours.contains(datetime.datetime.now(datetime.timezone.utc)):
+                started = time.monotonic()
+                try:
+                    await self._ping()
+                    self.pings += 1
+                    self.last_ping_seconds = time.monotonic() - started
+                except Exception as e:
+                    self.failures += 1
+                    logger.warning(f"Warehouse keep-alive query failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.hours is not None,
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "pings": self.pings,
+            "failures": self.failures,
+            "last_ping_seconds": (
+                round(self.last_ping_seconds, 3)
+                if self.last_ping_seconds is not None
+                else None
+            ),
+        }
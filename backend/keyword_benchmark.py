@@ -0,0 +1,122 @@
+"""
+Keyword Filter Benchmark
+Times keyword-filtered queries against the DuckDB Snowflake stand-in
+(standin.py) seeded with 1.6M synthetic SCORED_MENTIONS, once through the
+MENTION_TOKENS index (keyword_index.py) and once through the
+LOWER(text) LIKE '%kw%' fallback (USE_TOKEN_INDEX=0). Each keyword runs the
+two query shapes the dashboard issues: a summary aggregate over every match
+and the first /api/tweets page.
+
+Matches differ between the two paths by design: the index matches whole
+tokens ("love" does not match "lovely"), LIKE matches substrings. Both
+counts are printed.
+
+Only engine time is measured; no network or warehouse latency is injected.
+The stand-in does not model what the index relies on in Snowflake: DuckDB
+neither clusters MENTION_TOKENS by token nor prunes micro-partitions, so
+each semi-join scans the whole index, while its vectorized LIKE scan is
+cheap. Each seeded word also matches about 13% of rows. On this stand-in the
+LIKE path is therefore faster; rerun against a warehouse for the real
+comparison.
+
+Requires duckdb (pip install duckdb).
+
+Usage:
+    python keyword_benchmark.py                         # 1.6M rows, in memory
+    python keyword_benchmark.py --db bench.duckdb       # seeded once, reused
+    python keyword_benchmark.py --rows 200000 --repeat 3 --keywords love "good night" lo*
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+
+import keyword_index
+from main import build_where_clause
+from standin import SEED_DAYS, SEED_START, open_database, translate
+
+KEYWORDS = ("love", "work", "lakers", "iphone", "happy birthday", "good night", "lo*", "i")
+MODES = ("index", "like")
+
+SUMMARY_SQL = """
+    SELECT COUNT(*) AS matches, AVG(sentiment_score) AS avg_score
+    FROM SCORED_MENTIONS {where}
+"""
+TWEETS_SQL = """
+    SELECT tweet_id, created_at, text
+    FROM SCORED_MENTIONS {where}
+    ORDER BY created_at DESC, tweet_id DESC
+    LIMIT 500
+"""
+
+
+def time_query(db, sql: str, params: list, repeat: int) -> tuple[float, list]:
+    """Median seconds over repeat runs, after one warm-up run."""
+    translated = translate(sql)
+    rows = db.execute(translated, params).fetchall()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(translated, params).fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), rows
+
+
+def run_keyword(db, keyword: str, start_date: str, end_date: str, repeat: int) -> dict:
+    result = {}
+    for mode in MODES:
+        keyword_index.USE_TOKEN_INDEX = mode == "index"
+        where, params = build_where_clause(start_date, end_date, keyword)
+        summary_seconds, rows = time_query(db, SUMMARY_SQL.format(where=where), params, repeat)
+        tweets_seconds, _ = time_query(db, TWEETS_SQL.format(where=where), params, repeat)
+        result[mode] = {
+            "matches": rows[0][0],
+            "summary": summary_seconds,
+            "tweets": tweets_seconds,
+        }
+    keyword_index.USE_TOKEN_INDEX = True
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MENTION_TOKENS vs LIKE keyword filters")
+    parser.add_argument("--rows", type=int, default=1_600_000, help="Seeded SCORED_MENTIONS rows")
+    parser.add_argument("--db", default=":memory:", help="DuckDB file (reused if already seeded)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (median reported)")
+    parser.add_argument("--keywords", nargs="+", default=list(KEYWORDS))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = open_database(args.db, args.rows)
+    print(f"Stand-in ready with {args.rows:,} rows in {time.perf_counter() - started:.1f}s\n")
+
+    start_date = SEED_START
+    end_date = str(datetime.date.fromisoformat(SEED_START) + datetime.timedelta(days=SEED_DAYS))
+
+    header = (
+        f"{'keyword':<16}{'index rows':>12}{'like rows':>12}"
+        f"{'summary idx':>13}{'summary like':>14}{'tweets idx':>12}{'tweets like':>13}{'speedup':>9}"
+    )
+    print(header + "\n" + "-" * len(header))
+    totals = {mode: 0.0 for mode in MODES}
+    for keyword in args.keywords:
+        r = run_keyword(db, keyword, start_date, end_date, args.repeat)
+        for mode in MODES:
+            totals[mode] += r[mode]["summary"] + r[mode]["tweets"]
+        index_total = r["index"]["summary"] + r["index"]["tweets"]
+        like_total = r["like"]["summary"] + r["like"]["tweets"]
+        print(
+            f"{keyword:<16}{r['index']['matches']:>12,}{r['like']['matches']:>12,}"
+            f"{r['index']['summary'] * 1000:>11.1f}ms{r['like']['summary'] * 1000:>12.1f}ms"
+            f"{r['index']['tweets'] * 1000:>10.1f}ms{r['like']['tweets'] * 1000:>11.1f}ms"
+            f"{like_total / index_total:>8.2f}x"
+        )
+    print(
+        f"\nAll keywords: index {totals['index'] * 1000:.1f}ms, "
+        f"like {totals['like'] * 1000:.1f}ms ({totals['like'] / totals['index']:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import re
+
+# Must match the tokenizer used to build MENTION_TOKENS in snowflake/tasks.sql:
+# lowercase, then split on any run of characters outside [a-z0-9_#@'].
+TOKEN_PATTERN = re.compile(r"[a-z0-9_#@']+")
+INDEXABLE_KEYWORD = re.compile(r"^[a-z0-9_#@'\s]+\*?$")
+
+USE_TOKEN_INDEX = os.environ.get("USE_TOKEN_INDEX", "1") != "0"
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits text into MENTION_TOKENS tokens."""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def keyword_condition(
+    keyword: str,
+    start_date: str,
+    end_date: str,
+) -> tuple[str, list]:
+    """Builds the keyword predicate for a query over SCORED_MENTIONS.
+
+    Keywords made only of index-alphabet words are matched as whole words
+    through semi-joins on MENTION_TOKENS (a trailing '*' makes the last word a
+    prefix match); multi-word phrases also keep a LIKE on the narrowed rows to
+    enforce adjacency. Anything else falls back to LOWER(text) LIKE '%kw%',
+    a substring match that already covers a trailing '*', so it is dropped."""
+    normalized = keyword.lower().strip()
+    tokens = tokenize(normalized)
+    if not USE_TOKEN_INDEX or not tokens or not INDEXABLE_KEYWORD.match(normalized):
+        substring = normalized[:-1] if len(normalized) > 1 and normalized.endswith("*") else normalized
+        return "LOWER(text) LIKE %s", [f"%{substring}%"]
+
+    prefix = normalized.endswith("*")
+
+    conditions = []
+    params: list = []
+    for i, token in enumerate(tokens):
+        if prefix and i == len(tokens) - 1:
+            match, value = "token LIKE %s ESCAPE '^'", token.replace("_", "^_") + "%"
+        else:
+            match, value = "token = %s", token
+        conditions.append(
+            f"tweet_id IN (SELECT tweet_id FROM MENTION_TOKENS "
+            f"WHERE {match} AND created_at >= %s AND created_at < %s)"
+        )
+        params.extend([value, start_date, end_date])
+
+    if len(tokens) > 1:
+        phrase = " ".join(tokens)
+        conditions.append("LOWER(text) LIKE %s")
+        params.append(f"%{phrase}%")
+
+    return " AND ".join(conditions), params
@@ -0,0 +1,368 @@
+"""
+Offline Load Benchmark
+Runs the API in-process against the DuckDB Snowflake stand-in (standin.py),
+seeded with synthetic SCORED_MENTIONS, and drives every route in main.py
+with a realistic filter mix: a Zipf-weighted pool of date ranges, keywords
+and sentiment filters, so popular views repeat and caches behave as in
+production. Each query pays an injected latency, and CORTEX.COMPLETE pays
+an additional one. Reports throughput and p50/p95/p99 latency per route and
+writes them as JSON; pass a previous run as --baseline to fail on p95
+regressions.
+
+Requires duckdb and httpx (pip install duckdb httpx); no Snowflake account.
+
+Usage:
+    python load_benchmark.py                                   # 50k rows, 2000 requests
+    python load_benchmark.py --rows 200000 --output baseline.json
+    python load_benchmark.py --rows 1600000 --db bench.duckdb  # seeded once, reused
+    python load_benchmark.py --baseline baseline.json --tolerance 0.2
+    python load_benchmark.py --latency-ms 0 --no-result-cache  # engine cost only
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from standin import StandinEngine, open_database
+
+# Routes the mix deliberately leaves out.
+UNBENCHMARKED_ROUTES = {"/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc"}
+
+# (route, weight). Why jobs are polled only after a POST returned one.
+ROUTE_MIX = (
+    ("/api/dashboard", 30),
+    ("/api/tweets", 18),
+    ("/api/summary", 8),
+    ("/api/trend", 8),
+    ("/api/distribution", 6),
+    ("/api/date-range", 6),
+    ("/api/why", 8),
+    ("/api/why/jobs/{job_id}", 6),
+    ("/api/why/stream", 4),
+    ("/api/tweets?format=ndjson", 2),
+    ("/api/cache-stats", 2),
+    ("/metrics", 2),
+)
+KEYWORDS = (
+    (None, 65),
+    ("work", 6),
+    ("love", 6),
+    ("school", 4),
+    ("iphone", 4),
+    ("lakers", 3),
+    ("going to", 4),
+    ("twit*", 4),
+    ("happy birthday", 4),
+)
+SENTIMENT_FILTERS = (
+    (None, 60),
+    ("POSITIVE", 12),
+    ("NEGATIVE", 12),
+    ("NEUTRAL", 6),
+    ("POSITIVE,NEGATIVE", 10),
+)
+FILTER_POOL_SIZE = 200
+ZIPF_EXPONENT = 1.1
+NDJSON_EXPORT_LIMIT = 5000
+
+
+def _weighted(rnd: random.Random, choices):
+    values, weights = zip(*choices)
+    return rnd.choices(values, weights)[0]
+
+
+@dataclass
+class FilterSet:
+    start_date: str
+    end_date: str
+    keyword: str | None
+    sentiment_filter: str | None
+
+    def params(self) -> dict:
+        params = {"start_date": self.start_date, "end_date": self.end_date}
+        if self.keyword:
+            params["keyword"] = self.keyword
+        if self.sentiment_filter:
+            params["sentiment_filter"] = self.sentiment_filter
+        return params
+
+
+def filter_pool(rnd: random.Random, min_date: str, max_date: str) -> list[FilterSet]:
+    """FILTER_POOL_SIZE distinct views, most popular first: the full range,
+    recent weeks and months, single days, and a few sub-day windows that
+    bypass the daily rollup."""
+    first = datetime.date.fromisoformat(min_date)
+    end = datetime.date.fromisoformat(max_date) + datetime.timedelta(days=1)
+    span = (end - first).days
+
+    pool = [FilterSet(first.isoformat(), end.isoformat(), None, None)]
+    seen = {(pool[0].start_date, pool[0].end_date, None, None)}
+    while len(pool) < FILTER_POOL_SIZE:
+        kind = rnd.choices(("full", "last7", "last30", "day", "window", "hours"), (25, 20, 20, 15, 15, 5))[0]
+        if kind == "full":
+            start, stop = first, end
+        elif kind in ("last7", "last30"):
+            start, stop = end - datetime.timedelta(days=7 if kind == "last7" else 30), end
+        else:
+            length = 14 if kind == "window" else 1
+            start = first + datetime.timedelta(days=rnd.randrange(max(span - length, 1)))
+            stop = start + datetime.timedelta(days=length)
+        start_date, end_date = start.isoformat(), stop.isoformat()
+        if kind == "hours":
+            hour = rnd.randrange(0, 20)
+            start_date = f"{start_date} {hour:02d}:00:00"
+            end_date = f"{start.isoformat()} {hour + 4:02d}:00:00"
+        key = (
+            start_date,
+            end_date,
+            _weighted(rnd, KEYWORDS),
+            _weighted(rnd, SENTIMENT_FILTERS),
+        )
+        if key not in seen:
+            seen.add(key)
+            pool.append(FilterSet(*key))
+    return pool
+
+
+@dataclass
+class LoadState:
+    rnd: random.Random
+    pool: list[FilterSet]
+    weights: list[float]
+    job_ids: list[str] = field(default_factory=list)
+    next_cursors: list[tuple[FilterSet, str]] = field(default_factory=list)
+
+    def filters(self) -> FilterSet:
+        return self.rnd.choices(self.pool, self.weights)[0]
+
+
+async def issue(client: httpx.AsyncClient, route: str, state: LoadState) -> httpx.Response:
+    """Sends one request for `route` with filters drawn from the pool."""
+    filters = state.filters()
+    params = filters.params()
+
+    if route == "/api/tweets":
+        # A third of tweet requests page onward from an earlier response.
+        if state.next_cursors and state.rnd.random() < 0.33:
+            filters, cursor = state.next_cursors.pop(state.rnd.randrange(len(state.next_cursors)))
+            params = dict(filters.params(), cursor=cursor)
+        response = await client.get(route, params=params)
+        if response.status_code == 200 and response.json().get("next_cursor"):
+            state.next_cursors.append((filters, response.json()["next_cursor"]))
+            del state.next_cursors[:-50]
+        return response
+    if route == "/api/tweets?format=ndjson":
+        params.update(format="ndjson", limit=str(NDJSON_EXPORT_LIMIT))
+        return await client.get("/api/tweets", params=params)
+    if route == "/api/distribution":
+        params.pop("sentiment_filter", None)
+        return await client.get(route, params=params)
+    if route in ("/api/dashboard", "/api/summary", "/api/trend"):
+        return await client.get(route, params=params)
+    if route == "/api/why":
+        body = {
+            "sentiment_type": state.rnd.choice(("NEGATIVE", "POSITIVE")),
+            "start_date": filters.start_date,
+            "end_date": filters.end_date,
+            "keyword": filters.keyword,
+        }
+        response = await client.post(route, json=body)
+        if response.status_code == 202:
+            state.job_ids.append(response.json()["job_id"])
+            del state.job_ids[:-50]
+        return response
+    if route == "/api/why/stream":
+        # Timed to the final event; ASGITransport delivers the body at once.
+        params = {
+            "sentiment_type": state.rnd.choice(("NEGATIVE", "POSITIVE")),
+            "start_date": filters.start_date,
+            "end_date": filters.end_date,
+        }
+        if filters.keyword:
+            params["keyword"] = filters.keyword
+        return await client.get(route, params=params)
+    if route == "/api/why/jobs/{job_id}":
+        if not state.job_ids:
+            return await issue(client, "/api/why", state)
+        return await client.get(f"/api/why/jobs/{state.rnd.choice(state.job_ids)}")
+    return await client.get(route)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: dict[str, list[tuple[float, int]]], elapsed: float) -> dict:
+    endpoints = {}
+    for route, results in sorted(samples.items()):
+        latencies = sorted(seconds * 1000 for seconds, _ in results)
+        endpoints[route] = {
+            "requests": len(results),
+            "errors": sum(1 for _, status in results if status >= 500),
+            "statuses": {
+                str(status): sum(1 for _, s in results if s == status)
+                for status in sorted({status for _, status in results})
+            },
+            "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+    total = sum(len(results) for results in samples.values())
+    return {
+        "requests": total,
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+async def run_load(app, requests: int, concurrency: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        date_range = (await client.get("/api/date-range")).json()
+        pool = filter_pool(rnd, date_range["min_date"], date_range["max_date"])
+        weights = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(len(pool))]
+        state = LoadState(rnd, pool, weights)
+
+        routes = [rnd.choices(*zip(*ROUTE_MIX))[0] for _ in range(requests)]
+        queue: asyncio.Queue = asyncio.Queue()
+        for route in routes:
+            queue.put_nowait(route)
+        samples: dict[str, list[tuple[float, int]]] = {}
+
+        async def worker():
+            while not queue.empty():
+                route = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    status = (await issue(client, route, state)).status_code
+                except Exception:
+                    status = 599
+                samples.setdefault(route, []).append((time.perf_counter() - started, status))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(samples, time.perf_counter() - started)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Routes whose p95 grew by more than tolerance (and at least 1 ms)."""
+    regressions = []
+    for route, stats in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(route)
+        if not previous:
+            continue
+        limit = previous["p95_ms"] * (1 + tolerance)
+        if stats["p95_ms"] > limit and stats["p95_ms"] - previous["p95_ms"] >= 1:
+            regressions.append(
+                f"{route}: p95 {previous['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms"
+            )
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{'route':<28} {'reqs':>6} {'err':>4} {'rps':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    for route, stats in report["endpoints"].items():
+        print(
+            f"{route:<28} {stats['requests']:>6} {stats['errors']:>4} "
+            f"{stats['throughput_rps']:>8.1f} {stats['p50_ms']:>9.1f} "
+            f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        )
+    print(
+        f"\n{report['requests']} requests in {report['elapsed_seconds']}s "
+        f"({report['throughput_rps']} req/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline API load benchmark")
+    parser.add_argument("--rows", type=int, default=50_000, help="Seeded SCORED_MENTIONS rows (e.g. 50000, 200000, 1600000)")
+    parser.add_argument("--db", default=":memory:", help="DuckDB file to seed once and reuse")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Injected latency per query")
+    parser.add_argument("--cortex-latency-ms", type=float, default=1500, help="Extra latency per CORTEX.COMPLETE")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the request mix")
+    parser.add_argument("--no-result-cache", action="store_true", help="Disable the API result cache")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Previous --output to regression-check against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # The API reads its configuration at import time.
+    if args.no_result_cache:
+        os.environ["RESULT_CACHE_TTL"] = "0"
+    from main import app, why_jobs
+    from snowflake_client import close_connection, init_pool
+
+    started = time.perf_counter()
+    db = open_database(args.db, args.rows)
+    print(f"Stand-in ready with {args.rows:,} rows in {time.perf_counter() - started:.1f}s")
+    engine = StandinEngine(db, args.latency_ms / 1000, args.cortex_latency_ms / 1000)
+    init_pool(engine.connect)
+
+    covered = {route for route, _ in ROUTE_MIX} | {"/api/tweets"}
+    missing = {
+        route.path for route in app.routes
+        if route.path not in covered and route.path not in UNBENCHMARKED_ROUTES
+    }
+    if missing:
+        print(f"warning: routes not in the mix: {sorted(missing)}")
+
+    async def run() -> dict:
+        try:
+            return await run_load(app, args.requests, args.concurrency, args.seed)
+        finally:
+            await why_jobs.shutdown()
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        close_connection()
+
+    report["config"] = {
+        "rows": args.rows,
+        "latency_ms": args.latency_ms,
+        "cortex_latency_ms": args.cortex_latency_ms,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "result_cache": not args.no_result_cache,
+        "queries_run": engine.queries_run,
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No p95 regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
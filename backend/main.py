@@ -1,18 +1,148 @@
+import asyncio
+import base64
+import datetime
 import logging
-from typing import Optional
+import math
+import os
+import re
+import time
+from typing import Awaitable, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+import orjson
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool
+from starlette.routing import Match
 
-from snowflake_client import execute_query, close_connection
-from cortex import generate_why_analysis
-from cache import compute_cache_key, read_cache, write_cache, delete_cache
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional: pip install brotli-asgi
+    BrotliMiddleware = None
+
+from snowflake_client import (
+    close_connection,
+    execute_columnar_async,
+    execute_query_async,
+    iter_query,
+    open_pool,
+    pool_stats,
+)
+from result_cache import cached_result_async, cache_stats
+from http_cache import conditional_get
+import metrics
+from keyword_index import keyword_condition
+from singleflight import SingleFlight
+from downsampling import lttb_indices
+from keepalive import WarehouseKeepAlive
+from why_jobs import WhyJobQueue, QueueFullError
+from prewarm import log_why_request_async
+from cortex import generate_why_analysis_async, generate_why_analysis_stream
+from cache import (
+    compute_cache_key,
+    read_cache_async,
+    write_cache_async,
+    why_cache_stats,
+)
 
 logger = logging.getLogger("sentiment_api")
 
-app = FastAPI(title="Sentiment Tracker API", version="1.0.0")
+why_flights = SingleFlight()
+why_jobs = WhyJobQueue()
+keepalive = WarehouseKeepAlive.from_env()
+
+# On startup, connections are opened and the dashboard's first view is
+# queried in the background (see warm_start), so the first user after a
+# deploy neither waits for connection setup nor resumes SENTIMENT_WH.
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "1") != "0"
+WARMUP_CONNECTIONS = int(os.environ.get("WARMUP_CONNECTIONS", "2"))
+warm_start_report: dict = {"status": "disabled" if not WARMUP_ON_STARTUP else "pending"}
+_warm_start_task: asyncio.Task | None = None
+
+# Endpoints that shape rows themselves return ORJSONResponse directly, which
+# skips FastAPI's jsonable_encoder pass; the rest still render with orjson.
+app = FastAPI(
+    title="Sentiment Tracker API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+
+# Tweet pages and long trends compress well; small payloads are sent as-is.
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True
+    )
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+# Server-Sent Events must reach the client as each event is written, but the
+# compression middleware buffers streamed bodies, so these paths are served
+# uncompressed by hiding the client's Accept-Encoding from it.
+EVENT_STREAM_PATHS = frozenset({"/api/why/stream"})
+
+
+@app.middleware("http")
+async def event_stream_encoding_middleware(request: Request, call_next):
+    if request.url.path in EVENT_STREAM_PATHS:
+        request.scope["headers"] = [
+            (name, value)
+            for name, value in request.scope["headers"]
+            if name != b"accept-encoding"
+        ]
+    return await call_next(request)
+
+# Read endpoints whose responses depend only on the query string and the
+# SCORED_MENTIONS watermark, so they can be revalidated with ETags.
+HTTP_CACHEABLE_PATHS = frozenset({
+    "/api/summary",
+    "/api/trend",
+    "/api/distribution",
+    "/api/dashboard",
+    "/api/tweets",
+    "/api/date-range",
+})
+
+
+@app.middleware("http")
+async def http_cache_middleware(request: Request, call_next):
+    return await conditional_get(request, call_next, HTTP_CACHEABLE_PATHS)
+
+
+def route_template(request: Request) -> str:
+    """The matched route's path ("/api/why/jobs/{job_id}"), which keeps ids
+    out of metric labels."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
 
+# Registered after the caching middleware so it wraps it and also times 304s.
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    endpoint = route_template(request)
+    token = metrics.current_endpoint.set(endpoint)
+    started = time.monotonic()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.observe_request(
+            endpoint, request.method, status, time.monotonic() - started
+        )
+        metrics.current_endpoint.reset(token)
+
+
+# Added after every other middleware, so it is the outermost layer and its
+# headers also reach responses the inner layers answer themselves, such as
+# the 304s from http_cache_middleware.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -21,11 +151,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
+@app.on_event("startup")
+async def startup_event():
+    # Scheduled rather than awaited: uvicorn only starts listening once
+    # startup handlers return.
+    global _warm_start_task
+    if WARMUP_ON_STARTUP:
+        _warm_start_task = asyncio.ensure_future(run_warm_start())
+    keepalive.start()
+
+
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
+    if _warm_start_task is not None:
+        _warm_start_task.cancel()
+        await asyncio.gather(_warm_start_task, return_exceptions=True)
+    await keepalive.shutdown()
+    await why_jobs.shutdown()
     close_connection()
 
 
@@ -38,6 +184,7 @@ class WhyRequest(BaseModel):
     end_date: str
     keyword: Optional[str] = None
     force_refresh: Optional[bool] = False
+    wait: Optional[bool] = False
 
 
 class WhyResponse(BaseModel):
@@ -46,12 +193,32 @@ class WhyResponse(BaseModel):
     generated_at: str
 
 
+class WhyJobResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[WhyResponse] = None
+    queue_wait_seconds: Optional[float] = None
+    run_seconds: Optional[float] = None
+
+
+class ApproxSummary(BaseModel):
+    sample_percent: float
+    sample_rows: int
+    confidence: float
+    total_tweets_margin: int
+    avg_score_margin: float
+    pct_positive_margin: float
+    pct_negative_margin: float
+    pct_neutral_margin: float
+
+
 class SummaryResponse(BaseModel):
     total_tweets: int
     avg_score: float
     pct_positive: float
     pct_negative: float
     pct_neutral: float
+    approx: Optional[ApproxSummary] = None
 
 
 class DateRangeResponse(BaseModel):
@@ -64,6 +231,29 @@ class DateRangeResponse(BaseModel):
 VALID_SENTIMENT_LABELS = {"POSITIVE", "NEGATIVE", "NEUTRAL"}
 
 
+def parse_sentiment_filter(sentiment_filter: Optional[str]) -> list[str]:
+    """Parses a comma-separated label filter into a sorted, de-duplicated list."""
+    if not sentiment_filter:
+        return []
+    labels = sorted({s.strip().upper() for s in sentiment_filter.split(",")})
+    for label in labels:
+        if label not in VALID_SENTIMENT_LABELS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sentiment label: {label}. "
+                f"Must be one of {VALID_SENTIMENT_LABELS}",
+            )
+    return labels
+
+
+KEYWORD_DESCRIPTION = (
+    "Matches whole words, case-insensitively: 'love' does not match 'lovely'. "
+    "End the last word with * for a prefix match ('lov*'). Multi-word keywords "
+    "match adjacent words. Keywords with characters other than letters, digits "
+    "and _#@' match as substrings."
+)
+
+
 def build_where_clause(
     start_date: str,
     end_date: str,
@@ -75,18 +265,12 @@ def build_where_clause(
     params: list = [start_date, end_date]
 
     if keyword:
-        conditions.append("LOWER(text) LIKE %s")
-        params.append(f"%{keyword.lower().strip()}%")
-
-    if sentiment_filter:
-        labels = [s.strip().upper() for s in sentiment_filter.split(",")]
-        for label in labels:
-            if label not in VALID_SENTIMENT_LABELS:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid sentiment label: {label}. "
-                    f"Must be one of {VALID_SENTIMENT_LABELS}",
-                )
+        condition, keyword_params = keyword_condition(keyword, start_date, end_date)
+        conditions.append(condition)
+        params.extend(keyword_params)
+
+    labels = parse_sentiment_filter(sentiment_filter)
+    if labels:
         placeholders = ", ".join(["%s"] * len(labels))
         conditions.append(f"sentiment_label IN ({placeholders})")
         params.extend(labels)
@@ -95,153 +279,751 @@ def build_where_clause(
     return where, params
 
 
+# Keyword-free aggregates over whole days are answered from the daily rollup
+# (see snowflake/setup.sql and tasks.sql). Both sources expose the same
+# columns, so every aggregate query below is written once against either.
+USE_DAILY_ROLLUP = os.environ.get("USE_DAILY_ROLLUP", "1") != "0"
+_PLAIN_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def can_use_rollup(start_date: str, end_date: str, keyword: Optional[str]) -> bool:
+    """True when the filter is keyword-free and aligned to whole days."""
+    return (
+        USE_DAILY_ROLLUP
+        and not keyword
+        and bool(_PLAIN_DATE.match(start_date))
+        and bool(_PLAIN_DATE.match(end_date))
+    )
+
+
+def build_aggregate_source(
+    start_date: str,
+    end_date: str,
+    keyword: Optional[str] = None,
+    labels: Optional[list[str]] = None,
+    sample_percent: Optional[float] = None,
+    hourly: bool = False,
+) -> tuple[str, list]:
+    """Returns a subquery with columns (d, sentiment_label, bucket_start,
+    tweet_count, score_sum, score_count) and its params, read from
+    DAILY_SENTIMENT_ROLLUP when possible and from SCORED_MENTIONS otherwise.
+    sample_percent reads a SAMPLE of SCORED_MENTIONS instead (see
+    resolve_sample_percent); the rollup is never sampled. hourly makes d the
+    hour of created_at rather than its day, which only SCORED_MENTIONS has."""
+    if not hourly and can_use_rollup(start_date, end_date, keyword):
+        conditions = ["day >= %s", "day < %s"]
+        params: list = [start_date, end_date]
+        if labels:
+            conditions.append(f"sentiment_label IN ({', '.join(['%s'] * len(labels))})")
+            params.extend(labels)
+        source = f"""
+        SELECT day AS d, sentiment_label, bucket_start,
+               tweet_count, score_sum, score_count
+        FROM DAILY_SENTIMENT_ROLLUP
+        WHERE {" AND ".join(conditions)}
+    """
+        return source, params
+
+    where, params = build_where_clause(
+        start_date, end_date, keyword, ",".join(labels) if labels else None
+    )
+    period = "DATE_TRUNC('HOUR', created_at)" if hourly else "DATE(created_at)"
+    source = f"""
+        SELECT {period} AS d, sentiment_label,
+               FLOOR(sentiment_score * 5) / 5 AS bucket_start,
+               1 AS tweet_count,
+               sentiment_score AS score_sum,
+               IFF(sentiment_score IS NULL, 0, 1) AS score_count
+        FROM SCORED_MENTIONS {sample_clause(sample_percent) if sample_percent else ""}
+        {where}
+    """
+    return source, params
+
+
+# Approximate mode: /api/summary and /api/distribution can answer
+# approx=true from a seeded row sample of SCORED_MENTIONS sized to about
+# APPROX_SAMPLE_ROWS rows, scaled back up, with 95% margins of error. With the
+# default 200k rows the label percentages are within about +/-0.22 points
+# and avg_score within about +/-0.003 on a full-range query; keyword filters
+# shrink the matched sample and widen the margins, which are always returned.
+# Requests the rollup can answer stay exact. APPROX_AUTO_MIN_ROWS > 0 turns
+# the mode on automatically when approx is omitted and the date range holds
+# at least that many tweets; approx=false always forces the exact path.
+APPROX_SAMPLE_ROWS = int(os.environ.get("APPROX_SAMPLE_ROWS", "200000"))
+APPROX_AUTO_MIN_ROWS = int(os.environ.get("APPROX_AUTO_MIN_ROWS", "0"))
+# BERNOULLI samples rows, which is what the margins below assume, but it
+# still reads every row, so it saves aggregation and join work, not I/O.
+# SYSTEM reads only the sampled blocks and was 3-5x faster on the stand-in
+# (approx_benchmark.py), but it takes a random number of whole blocks:
+# total_tweets fell inside its margin in 4 of 40 seeds (200k rows) and 0 of
+# 20 (1.6M rows), against 37/40 and 19/20 for BERNOULLI. In Snowflake,
+# micro-partitions also hold time slices, which would widen the label-share
+# errors too. The margins are part of the response, so BERNOULLI stays the
+# default.
+APPROX_SAMPLE_METHOD = os.environ.get("APPROX_SAMPLE_METHOD", "BERNOULLI").upper()
+APPROX_SAMPLE_SEED = 20090406
+APPROX_CONFIDENCE = 0.95
+APPROX_Z = 1.96
+
+
+def sample_clause(sample_percent: float) -> str:
+    # SAMPLE takes literals only; the percent is computed, never user input.
+    return f"SAMPLE {APPROX_SAMPLE_METHOD} ({sample_percent:.4f}) SEED ({APPROX_SAMPLE_SEED})"
+
+
+def approx_sample_percent(estimated_rows: int) -> Optional[float]:
+    """Percent of SCORED_MENTIONS to sample for about APPROX_SAMPLE_ROWS rows,
+    or None when the range is small enough to scan exactly."""
+    if estimated_rows <= APPROX_SAMPLE_ROWS:
+        return None
+    return max(round(APPROX_SAMPLE_ROWS * 100.0 / estimated_rows, 4), 0.0001)
+
+
+async def estimate_range_rows(start_date: str, end_date: str) -> int:
+    """Upper bound on the tweets in the range, from the daily rollup over
+    every day the range touches. Ignores keyword and label filters."""
+    sql = """
+        SELECT COALESCE(SUM(tweet_count), 0) AS tweet_count
+        FROM DAILY_SENTIMENT_ROLLUP
+        WHERE day >= DATE(%s) AND day <= DATE(%s)
+    """
+    params = [start_date, end_date]
+
+    async def compute() -> int:
+        results = await execute_query_async(sql, tuple(params))
+        return int(results[0]["tweet_count"]) if results else 0
+
+    return await cached_result_async("row_estimate", sql, params, compute)
+
+
+async def resolve_sample_percent(
+    approx: Optional[bool],
+    start_date: str,
+    end_date: str,
+    keyword: Optional[str],
+) -> Optional[float]:
+    """The sample percent to answer an aggregate from, or None for the exact
+    path."""
+    if approx is False or can_use_rollup(start_date, end_date, keyword):
+        return None
+    if approx is None and APPROX_AUTO_MIN_ROWS <= 0:
+        return None
+    estimated_rows = await estimate_range_rows(start_date, end_date)
+    if approx is None and estimated_rows < APPROX_AUTO_MIN_ROWS:
+        return None
+    return approx_sample_percent(estimated_rows)
+
+
+# --- Trend Granularity ---
+
+# Bucket size -> TO_CHAR format of its label. Weeks are labelled by the date
+# they start on (Monday with Snowflake's default WEEK_START).
+TREND_GRANULARITIES = {
+    "hour": "YYYY-MM-DD HH24:MI",
+    "day": "YYYY-MM-DD",
+    "week": "YYYY-MM-DD",
+    "month": "YYYY-MM",
+}
+_GRANULARITY_HOURS = {"hour": 1, "day": 24, "week": 24 * 7, "month": 24 * 30}
+# granularity=auto picks the finest bucket that keeps the series within this
+# many points (or within max_points when the client sends it).
+TREND_MAX_POINTS = int(os.environ.get("TREND_MAX_POINTS", "200"))
+
+
+def resolve_granularity(
+    granularity: str,
+    start_date: str,
+    end_date: str,
+    max_points: Optional[int] = None,
+) -> str:
+    """Validates granularity, resolving auto from the length of the range."""
+    granularity = granularity.lower()
+    if granularity in TREND_GRANULARITIES:
+        return granularity
+    if granularity != "auto":
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid granularity: {granularity}. "
+            f"Must be auto or one of {list(TREND_GRANULARITIES)}",
+        )
+    try:
+        span = datetime.datetime.fromisoformat(end_date) - datetime.datetime.fromisoformat(start_date)
+    except ValueError:
+        return "day"
+    hours = span.total_seconds() / 3600
+    cap = max_points or TREND_MAX_POINTS
+    for candidate in ("hour", "day", "week"):
+        if hours / _GRANULARITY_HOURS[candidate] <= cap:
+            return candidate
+    return "month"
+
+
+def period_expression(granularity: str) -> str:
+    """Groups the aggregate source's d column into granularity buckets. Hour
+    sources (build_aggregate_source(hourly=True)) are already bucketed."""
+    if granularity in ("hour", "day"):
+        return "d"
+    return f"DATE_TRUNC('{granularity.upper()}', d)"
+
+
+def downsample_trend(points: list[dict], max_points: Optional[int]) -> dict:
+    """Trend response body, reduced with LTTB on the total tweet count when
+    the series is longer than max_points. Kept points are real buckets with
+    their exact counts; downsampled_from records the original length."""
+    if not max_points or len(points) <= max_points:
+        return {"data": points}
+    totals = [p["POSITIVE"] + p["NEGATIVE"] + p["NEUTRAL"] for p in points]
+    return {
+        "data": [points[i] for i in lttb_indices(totals, max_points)],
+        "downsampled_from": len(points),
+    }
+
+
+def count_margin(sample_count: float, fraction: float) -> float:
+    """95% margin of a count scaled up from a Bernoulli sample: the sample
+    count is Binomial(N, fraction), so its estimate count / fraction has
+    standard error sqrt(count * (1 - fraction)) / fraction."""
+    return APPROX_Z * math.sqrt(sample_count * (1 - fraction)) / fraction
+
+
+def proportion_margin(share: float, sample_rows: int, fraction: float) -> float:
+    """95% margin of a sample proportion, with the finite population
+    correction for sampling a fraction of the matched rows."""
+    if sample_rows == 0:
+        return 0.0
+    return APPROX_Z * math.sqrt(share * (1 - share) / sample_rows * (1 - fraction))
+
+
+# --- Row Shaping Helpers ---
+
+
+def summary_from_row(row: dict) -> SummaryResponse:
+    return SummaryResponse(
+        total_tweets=int(row.get("total_tweets", 0)),
+        avg_score=round(float(row.get("avg_score") or 0), 4),
+        pct_positive=round(float(row.get("pct_positive", 0)), 2),
+        pct_negative=round(float(row.get("pct_negative", 0)), 2),
+        pct_neutral=round(float(row.get("pct_neutral", 0)), 2),
+    )
+
+
+def approx_summary_from_row(row: dict, sample_percent: float) -> SummaryResponse:
+    """Scales a sampled summary row (counts per label, score moments) up to
+    estimates for the whole range, with their margins."""
+    fraction = sample_percent / 100
+    sample_rows = int(row.get("sample_rows") or 0)
+    scored_rows = int(row.get("scored_rows") or 0)
+    shares = {
+        label: int(row.get(label) or 0) / sample_rows if sample_rows else 0.0
+        for label in ("positive", "negative", "neutral")
+    }
+    score_stddev = float(row.get("score_stddev") or 0)
+    avg_margin = (
+        APPROX_Z * score_stddev / math.sqrt(scored_rows) * math.sqrt(1 - fraction)
+        if scored_rows
+        else 0.0
+    )
+    return SummaryResponse(
+        total_tweets=round(sample_rows / fraction),
+        avg_score=round(float(row.get("avg_score") or 0), 4),
+        pct_positive=round(shares["positive"] * 100, 2),
+        pct_negative=round(shares["negative"] * 100, 2),
+        pct_neutral=round(shares["neutral"] * 100, 2),
+        approx=ApproxSummary(
+            sample_percent=sample_percent,
+            sample_rows=sample_rows,
+            confidence=APPROX_CONFIDENCE,
+            total_tweets_margin=math.ceil(count_margin(sample_rows, fraction)),
+            avg_score_margin=round(avg_margin, 4),
+            **{
+                f"pct_{label}_margin": round(
+                    proportion_margin(share, sample_rows, fraction) * 100, 2
+                )
+                for label, share in shares.items()
+            },
+        ),
+    )
+
+
+# The helpers below take execute_columnar results ({column: values}) and
+# cast whole columns at once rather than building a dict per fetched row.
+
+
+def take_rows(columns: dict[str, list], indices: list[int]) -> dict[str, list]:
+    return {name: [values[i] for i in indices] for name, values in columns.items()}
+
+
+def trend_points(columns: dict[str, list]) -> list[dict]:
+    return [
+        {"day": day, "POSITIVE": positive, "NEGATIVE": negative, "NEUTRAL": neutral}
+        for day, positive, negative, neutral in zip(
+            columns["day"],
+            map(int, columns["positive"]),
+            map(int, columns["negative"]),
+            map(int, columns["neutral"]),
+        )
+    ]
+
+
+def distribution_buckets(columns: dict[str, list]) -> list[dict]:
+    return [
+        {"range": f"{bs:.1f} to {bs + 0.2:.1f}", "count": count}
+        for bs, count in zip(
+            map(float, columns["bucket_start"]), map(int, columns["count"])
+        )
+    ]
+
+
+def approx_distribution(columns: dict[str, list], sample_percent: float) -> dict:
+    """Sampled bucket counts scaled up to estimates, with a margin per bucket
+    in the same order as the buckets."""
+    fraction = sample_percent / 100
+    sample_counts = [int(count) for count in columns["count"]]
+    buckets = distribution_buckets(
+        dict(columns, count=[round(count / fraction) for count in sample_counts])
+    )
+    return {
+        "buckets": buckets,
+        "approx": {
+            "sample_percent": sample_percent,
+            "sample_rows": sum(sample_counts),
+            "confidence": APPROX_CONFIDENCE,
+            "count_margins": [
+                math.ceil(count_margin(count, fraction)) for count in sample_counts
+            ],
+        },
+    }
+
+
 # --- Endpoints ---
 
 
-@app.get("/api/summary", response_model=SummaryResponse)
-def get_summary(
+@app.get("/api/summary", response_model=SummaryResponse, response_model_exclude_none=True)
+async def get_summary(
     start_date: str = Query(...),
     end_date: str = Query(...),
-    keyword: Optional[str] = Query(None),
+    keyword: Optional[str] = Query(None, description=KEYWORD_DESCRIPTION),
     sentiment_filter: Optional[str] = Query(None),
+    approx: Optional[bool] = Query(None),
 ):
-    where, params = build_where_clause(start_date, end_date, keyword, sentiment_filter)
+    labels = parse_sentiment_filter(sentiment_filter)
+    sample_percent = await resolve_sample_percent(approx, start_date, end_date, keyword)
+    if sample_percent:
+        return await get_approx_summary(start_date, end_date, keyword, labels, sample_percent)
+
+    source, params = build_aggregate_source(start_date, end_date, keyword, labels)
 
     sql = f"""
         SELECT
-            COUNT(*) AS total_tweets,
-            COALESCE(AVG(sentiment_score), 0) AS avg_score,
-            CASE WHEN COUNT(*) > 0
-                THEN COUNT_IF(sentiment_label = 'POSITIVE') * 100.0 / COUNT(*)
+            COALESCE(SUM(tweet_count), 0) AS total_tweets,
+            COALESCE(SUM(score_sum) / NULLIF(SUM(score_count), 0), 0) AS avg_score,
+            CASE WHEN SUM(tweet_count) > 0
+                THEN SUM(IFF(sentiment_label = 'POSITIVE', tweet_count, 0)) * 100.0 / SUM(tweet_count)
                 ELSE 0 END AS pct_positive,
-            CASE WHEN COUNT(*) > 0
-                THEN COUNT_IF(sentiment_label = 'NEGATIVE') * 100.0 / COUNT(*)
+            CASE WHEN SUM(tweet_count) > 0
+                THEN SUM(IFF(sentiment_label = 'NEGATIVE', tweet_count, 0)) * 100.0 / SUM(tweet_count)
                 ELSE 0 END AS pct_negative,
-            CASE WHEN COUNT(*) > 0
-                THEN COUNT_IF(sentiment_label = 'NEUTRAL') * 100.0 / COUNT(*)
+            CASE WHEN SUM(tweet_count) > 0
+                THEN SUM(IFF(sentiment_label = 'NEUTRAL', tweet_count, 0)) * 100.0 / SUM(tweet_count)
                 ELSE 0 END AS pct_neutral
-        FROM SCORED_MENTIONS
-        {where}
+        FROM ({source}) src
     """
 
-    results = execute_query(sql, tuple(params))
-    row = results[0] if results else {}
+    async def compute() -> SummaryResponse:
+        results = await execute_query_async(sql, tuple(params))
+        return summary_from_row(results[0] if results else {})
 
-    return SummaryResponse(
-        total_tweets=int(row.get("total_tweets", 0)),
-        avg_score=round(float(row.get("avg_score", 0)), 4),
-        pct_positive=round(float(row.get("pct_positive", 0)), 2),
-        pct_negative=round(float(row.get("pct_negative", 0)), 2),
-        pct_neutral=round(float(row.get("pct_neutral", 0)), 2),
+    return await cached_result_async("summary", source, params, compute)
+
+
+async def get_approx_summary(
+    start_date: str,
+    end_date: str,
+    keyword: Optional[str],
+    labels: list[str],
+    sample_percent: float,
+) -> SummaryResponse:
+    source, params = build_aggregate_source(
+        start_date, end_date, keyword, labels, sample_percent
     )
 
+    sql = f"""
+        SELECT
+            COUNT(*) AS sample_rows,
+            SUM(score_count) AS scored_rows,
+            AVG(score_sum) AS avg_score,
+            STDDEV_SAMP(score_sum) AS score_stddev,
+            SUM(IFF(sentiment_label = 'POSITIVE', 1, 0)) AS positive,
+            SUM(IFF(sentiment_label = 'NEGATIVE', 1, 0)) AS negative,
+            SUM(IFF(sentiment_label = 'NEUTRAL', 1, 0)) AS neutral
+        FROM ({source}) src
+    """
+
+    async def compute() -> SummaryResponse:
+        results = await execute_query_async(sql, tuple(params))
+        return approx_summary_from_row(results[0] if results else {}, sample_percent)
+
+    return await cached_result_async("summary", source, params, compute)
+
 
 @app.get("/api/trend")
-def get_trend(
+async def get_trend(
     start_date: str = Query(...),
     end_date: str = Query(...),
-    keyword: Optional[str] = Query(None),
+    keyword: Optional[str] = Query(None, description=KEYWORD_DESCRIPTION),
     sentiment_filter: Optional[str] = Query(None),
+    granularity: str = Query("day"),
+    max_points: Optional[int] = Query(None, ge=3),
 ):
-    where, params = build_where_clause(start_date, end_date, keyword, sentiment_filter)
+    granularity = resolve_granularity(granularity, start_date, end_date, max_points)
+    source, params = build_aggregate_source(
+        start_date,
+        end_date,
+        keyword,
+        parse_sentiment_filter(sentiment_filter),
+        hourly=granularity == "hour",
+    )
+    period = period_expression(granularity)
 
     sql = f"""
         SELECT
-            TO_CHAR(DATE(created_at), 'YYYY-MM-DD') AS day,
-            COUNT_IF(sentiment_label = 'POSITIVE') AS positive,
-            COUNT_IF(sentiment_label = 'NEGATIVE') AS negative,
-            COUNT_IF(sentiment_label = 'NEUTRAL') AS neutral
-        FROM SCORED_MENTIONS
-        {where}
-        GROUP BY DATE(created_at)
+            TO_CHAR({period}, '{TREND_GRANULARITIES[granularity]}') AS day,
+            SUM(IFF(sentiment_label = 'POSITIVE', tweet_count, 0)) AS positive,
+            SUM(IFF(sentiment_label = 'NEGATIVE', tweet_count, 0)) AS negative,
+            SUM(IFF(sentiment_label = 'NEUTRAL', tweet_count, 0)) AS neutral
+        FROM ({source}) src
+        GROUP BY {period}
         ORDER BY day
     """
 
-    rows = execute_query(sql, tuple(params))
+    async def compute() -> list[dict]:
+        columns = await execute_columnar_async(sql, tuple(params))
 
-    data = [
-        {
-            "day": row["day"],
-            "POSITIVE": int(row["positive"]),
-            "NEGATIVE": int(row["negative"]),
-            "NEUTRAL": int(row["neutral"]),
-        }
-        for row in rows
-    ]
+        return trend_points(columns)
 
-    return {"data": data}
+    points = await cached_result_async("trend", sql, params, compute)
+    return ORJSONResponse(
+        dict(downsample_trend(points, max_points), granularity=granularity)
+    )
 
 
 @app.get("/api/distribution")
-def get_distribution(
+async def get_distribution(
     start_date: str = Query(...),
     end_date: str = Query(...),
-    keyword: Optional[str] = Query(None),
+    keyword: Optional[str] = Query(None, description=KEYWORD_DESCRIPTION),
+    approx: Optional[bool] = Query(None),
 ):
-    where, params = build_where_clause(start_date, end_date, keyword)
+    sample_percent = await resolve_sample_percent(approx, start_date, end_date, keyword)
+    source, params = build_aggregate_source(
+        start_date, end_date, keyword, sample_percent=sample_percent
+    )
 
     sql = f"""
         SELECT
-            FLOOR(sentiment_score * 5) / 5 AS bucket_start,
-            COUNT(*) AS count
-        FROM SCORED_MENTIONS
-        {where}
+            bucket_start,
+            SUM(tweet_count) AS count
+        FROM ({source}) src
         GROUP BY bucket_start
         ORDER BY bucket_start
     """
 
-    rows = execute_query(sql, tuple(params))
+    async def compute() -> dict:
+        columns = await execute_columnar_async(sql, tuple(params))
+        if sample_percent:
+            return approx_distribution(columns, sample_percent)
 
-    buckets = []
-    for row in rows:
-        bs = float(row["bucket_start"])
-        be = bs + 0.2
-        buckets.append({"range": f"{bs:.1f} to {be:.1f}", "count": int(row["count"])})
+        return {"buckets": distribution_buckets(columns)}
 
-    return {"buckets": buckets}
+    return ORJSONResponse(
+        await cached_result_async("distribution", source, params, compute)
+    )
 
 
-@app.get("/api/tweets")
-def get_tweets(
+@app.get("/api/dashboard")
+async def get_dashboard(
     start_date: str = Query(...),
     end_date: str = Query(...),
-    keyword: Optional[str] = Query(None),
+    keyword: Optional[str] = Query(None, description=KEYWORD_DESCRIPTION),
     sentiment_filter: Optional[str] = Query(None),
-    limit: int = Query(500, ge=1, le=1000),
+    granularity: str = Query("day"),
+    max_points: Optional[int] = Query(None, ge=3),
 ):
+    """Summary, trend and distribution from a single scan of the aggregate source.
+    The distribution ignores sentiment_filter, matching /api/distribution, so
+    the label filter is applied per-aggregate via in_filter instead of in WHERE.
+    granularity and max_points shape the trend as in /api/trend."""
+    granularity = resolve_granularity(granularity, start_date, end_date, max_points)
+    source, params = build_aggregate_source(
+        start_date, end_date, keyword, hourly=granularity == "hour"
+    )
+    labels = parse_sentiment_filter(sentiment_filter)
+
+    if labels:
+        in_filter = f"sentiment_label IN ({', '.join(['%s'] * len(labels))})"
+    else:
+        in_filter = "TRUE"
+
+    sql = f"""
+        WITH src AS ({source}),
+        flagged AS (
+            SELECT src.*, {period_expression(granularity)} AS period,
+                   {in_filter} AS in_filter
+            FROM src
+        )
+        SELECT
+            GROUPING(period) AS g_day,
+            GROUPING(bucket_start) AS g_bucket,
+            TO_CHAR(period, '{TREND_GRANULARITIES[granularity]}') AS day,
+            bucket_start,
+            COALESCE(SUM(tweet_count), 0) AS count,
+            COALESCE(SUM(IFF(in_filter, tweet_count, 0)), 0) AS total_tweets,
+            COALESCE(
+                SUM(IFF(in_filter, score_sum, NULL))
+                    / NULLIF(SUM(IFF(in_filter, score_count, 0)), 0),
+                0
+            ) AS avg_score,
+            COALESCE(SUM(IFF(in_filter AND sentiment_label = 'POSITIVE', tweet_count, 0)), 0) AS positive,
+            COALESCE(SUM(IFF(in_filter AND sentiment_label = 'NEGATIVE', tweet_count, 0)), 0) AS negative,
+            COALESCE(SUM(IFF(in_filter AND sentiment_label = 'NEUTRAL', tweet_count, 0)), 0) AS neutral
+        FROM flagged
+        GROUP BY GROUPING SETS ((), (period), (bucket_start))
+    """
+    query_params = list(params) + labels
+
+    async def compute() -> dict:
+        columns = await execute_columnar_async(sql, tuple(query_params))
+
+        summary_row: dict = {}
+        days = []
+        buckets = []
+        for i, (g_day, g_bucket) in enumerate(zip(columns["g_day"], columns["g_bucket"])):
+            if int(g_day) and int(g_bucket):
+                total = int(columns["total_tweets"][i])
+                summary_row = {
+                    "total_tweets": total,
+                    "avg_score": columns["avg_score"][i],
+                    "pct_positive": int(columns["positive"][i]) * 100.0 / total if total else 0,
+                    "pct_negative": int(columns["negative"][i]) * 100.0 / total if total else 0,
+                    "pct_neutral": int(columns["neutral"][i]) * 100.0 / total if total else 0,
+                }
+            elif not int(g_day):
+                if int(columns["total_tweets"][i]) > 0:
+                    days.append(i)
+            elif columns["bucket_start"][i] is not None:
+                buckets.append(i)
+
+        days.sort(key=columns["day"].__getitem__)
+        buckets.sort(key=lambda i: float(columns["bucket_start"][i]))
+
+        return {
+            "summary": summary_from_row(summary_row).model_dump(exclude_none=True),
+            "trend": {"data": trend_points(take_rows(columns, days))},
+            "distribution": {"buckets": distribution_buckets(take_rows(columns, buckets))},
+        }
+
+    result = await cached_result_async("dashboard", sql, query_params, compute)
+    trend = downsample_trend(result["trend"]["data"], max_points)
+    return ORJSONResponse(dict(result, trend=dict(trend, granularity=granularity)))
+
+
+TWEETS_PAGE_SIZE = 500
+TWEETS_MAX_PAGE_SIZE = 1000
+TWEETS_STREAM_BATCH_SIZE = 1000
+
+
+def encode_tweets_cursor(created_at: datetime.datetime, tweet_id: str) -> str:
+    """Opaque keyset cursor: the (created_at, tweet_id) of the last row."""
+    raw = orjson.dumps([created_at.isoformat(), tweet_id])
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_tweets_cursor(cursor: str) -> tuple[datetime.datetime, str]:
+    try:
+        created_at, tweet_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.datetime.fromisoformat(created_at), str(tweet_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def tweets_from_columns(columns: dict[str, list]) -> list[dict]:
+    return [
+        {
+            "tweet_id": tweet_id,
+            "created_at": created_at,
+            "user": user,
+            "sentiment_label": label,
+            "sentiment_score": round(score, 4),
+            "text": text,
+        }
+        for tweet_id, created_at, user, label, score, text in zip(
+            columns["tweet_id"],
+            columns["created_at"],
+            columns["user"],
+            columns["sentiment_label"],
+            map(float, columns["sentiment_score"]),
+            columns["text"],
+        )
+    ]
+
+
+def build_tweets_query(
+    start_date: str,
+    end_date: str,
+    keyword: Optional[str],
+    sentiment_filter: Optional[str],
+    cursor: Optional[str],
+    limit: Optional[int],
+) -> tuple[str, tuple]:
+    """Newest-first tweets, continuing after cursor when given. Ordering on
+    (created_at, tweet_id) makes the keyset unique, so no row is skipped or
+    repeated between pages. Both the ORDER BY and the cursor comparison use
+    the table columns (qualified, since the select list reuses the name
+    created_at for the display string), so they can prune on created_at."""
     where, params = build_where_clause(start_date, end_date, keyword, sentiment_filter)
 
+    if cursor:
+        created_at, tweet_id = decode_tweets_cursor(cursor)
+        where += " AND (m.created_at < %s OR (m.created_at = %s AND m.tweet_id < %s))"
+        params.extend([created_at, created_at, tweet_id])
+
     sql = f"""
         SELECT
+            tweet_id,
             TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS') AS created_at,
+            created_at AS cursor_created_at,
             "USER" AS user,
             sentiment_label,
             sentiment_score,
             text
-        FROM SCORED_MENTIONS
+        FROM SCORED_MENTIONS m
         {where}
-        ORDER BY created_at DESC
-        LIMIT {int(limit)}
+        ORDER BY m.created_at DESC, m.tweet_id DESC
     """
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
 
-    rows = execute_query(sql, tuple(params))
+    return sql, tuple(params)
 
-    tweets = [
-        {
-            "created_at": row["created_at"],
-            "user": row["user"],
-            "sentiment_label": row["sentiment_label"],
-            "sentiment_score": round(float(row["sentiment_score"]), 4),
-            "text": row["text"],
-        }
-        for row in rows
-    ]
 
-    return {"tweets": tweets}
+async def stream_tweets_ndjson(sql: str, params: tuple):
+    """Yields one NDJSON line per tweet, fetched TWEETS_STREAM_BATCH_SIZE
+    rows at a time. Closing the query when the response ends, including on
+    a client disconnect, returns its pooled connection straight away."""
+    batches = iter_query(sql, params, TWEETS_STREAM_BATCH_SIZE)
+    try:
+        async for columns in iterate_in_threadpool(batches):
+            tweets = tweets_from_columns(columns)
+            yield b"".join(orjson.dumps(tweet) + b"\n" for tweet in tweets)
+    finally:
+        batches.close()
+
+
+@app.get("/api/tweets")
+async def get_tweets(
+    start_date: str = Query(...),
+    end_date: str = Query(...),
+    keyword: Optional[str] = Query(None, description=KEYWORD_DESCRIPTION),
+    sentiment_filter: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=TWEETS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Pages of tweets, newest first. JSON pages hold `limit` tweets (500 by
+    default, at most 1000) and return next_cursor while more remain.
+    format=ndjson streams every matching tweet (or the first `limit`)
+    without buffering the result."""
+    if format == "ndjson":
+        sql, params = build_tweets_query(
+            start_date, end_date, keyword, sentiment_filter, cursor, limit
+        )
+        return StreamingResponse(
+            stream_tweets_ndjson(sql, params), media_type="application/x-ndjson"
+        )
+
+    page_size = limit or TWEETS_PAGE_SIZE
+
+    # Fetch one extra row to learn whether another page exists.
+    sql, params = build_tweets_query(
+        start_date, end_date, keyword, sentiment_filter, cursor, page_size + 1
+    )
+    columns = await execute_columnar_async(sql, params)
+
+    next_cursor = None
+    if len(columns["tweet_id"]) > page_size:
+        columns = {name: values[:page_size] for name, values in columns.items()}
+        next_cursor = encode_tweets_cursor(
+            columns["cursor_created_at"][-1], columns["tweet_id"][-1]
+        )
+
+    return ORJSONResponse(
+        {"tweets": tweets_from_columns(columns), "next_cursor": next_cursor}
+    )
+
+
+def why_http_error(e: Exception) -> HTTPException:
+    """Maps Why Layer pipeline failures to the API's HTTP errors."""
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=404, detail=str(e))
+    logger.error(f"Cortex COMPLETE failed: {e}")
+    return HTTPException(
+        status_code=502,
+        detail="The AI analysis service is temporarily unavailable. Please try again.",
+    )
+
+
+def job_http_error(job) -> HTTPException:
+    """The HTTP error a failed Why job answers with."""
+    if isinstance(job.error, (ValueError, RuntimeError)):
+        return why_http_error(job.error)
+    return HTTPException(status_code=500, detail="Why analysis failed.")
+
 
+def job_response(job) -> WhyJobResponse:
+    result = None
+    if job.status == "done":
+        result = WhyResponse(
+            bullets=job.result, from_cache=False, generated_at="just now"
+        )
+    return WhyJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        result=result,
+        queue_wait_seconds=job.queue_wait_seconds,
+        run_seconds=job.run_seconds,
+    )
+
+
+async def generate_and_store_why(
+    cache_key: str,
+    sentiment_type: str,
+    start_date: str,
+    end_date: str,
+    keyword: Optional[str],
+    force: bool,
+) -> str:
+    """Runs the Why pipeline and writes the result through write_cache."""
+    bullet_summary, tweet_sample, content_key = await generate_why_analysis_async(
+        sentiment_type=sentiment_type,
+        start_date=start_date,
+        end_date=end_date,
+        keyword=keyword,
+        force=force,
+    )
+    await write_cache_async(
+        cache_key, sentiment_type, bullet_summary, tweet_sample, content_key
+    )
+    return bullet_summary
 
-@app.post("/api/why", response_model=WhyResponse)
-def post_why(request: WhyRequest):
+
+@app.post("/api/why", response_model=WhyResponse | WhyJobResponse)
+async def post_why(
+    request: WhyRequest, response: Response, background_tasks: BackgroundTasks
+):
+    """Cache hits return bullets directly. On a miss the analysis is queued
+    and a job id is returned (HTTP 202) for polling GET /api/why/jobs/{id};
+    wait=true instead holds the request until the job is done and returns
+    the bullets. Either way a full queue answers 429."""
     if request.sentiment_type not in ("NEGATIVE", "POSITIVE"):
         raise HTTPException(
             status_code=400, detail="sentiment_type must be NEGATIVE or POSITIVE"
@@ -250,11 +1032,17 @@ def post_why(request: WhyRequest):
     cache_key = compute_cache_key(
         request.start_date, request.end_date, request.keyword, request.sentiment_type
     )
+    background_tasks.add_task(
+        log_why_request_async,
+        cache_key,
+        request.start_date,
+        request.end_date,
+        request.keyword,
+        request.sentiment_type,
+    )
 
-    if request.force_refresh:
-        delete_cache(cache_key)
-
-    cached = read_cache(cache_key)
+    # force_refresh skips the read; the MERGE in write_cache replaces the entry.
+    cached = None if request.force_refresh else await read_cache_async(cache_key)
     if cached:
         return WhyResponse(
             bullets=cached["bullet_summary"],
@@ -262,40 +1050,164 @@ def post_why(request: WhyRequest):
             generated_at=str(cached["generated_at"]),
         )
 
+    # Every miss for a cache key, polled or waited on, is a why_jobs job run
+    # inside one flight, so it counts against the concurrency cap and the
+    # queue depth, and concurrent requests share a single Cortex call.
+    def generate() -> Awaitable[str]:
+        return why_flights.do(cache_key, lambda: generate_and_store_why(
+            cache_key,
+            request.sentiment_type,
+            request.start_date,
+            request.end_date,
+            request.keyword,
+            bool(request.force_refresh),
+        ))
+
     try:
-        bullet_summary, tweet_sample = generate_why_analysis(
-            sentiment_type=request.sentiment_type,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            keyword=request.keyword,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except RuntimeError as e:
-        logger.error(f"Cortex COMPLETE failed: {e}")
+        job = why_jobs.submit(cache_key, generate)
+    except QueueFullError as e:
         raise HTTPException(
-            status_code=502,
-            detail="The AI analysis service is temporarily unavailable. Please try again.",
+            status_code=429, detail=str(e), headers={"Retry-After": "5"}
         )
 
-    write_cache(cache_key, request.sentiment_type, bullet_summary, tweet_sample)
+    if not request.wait:
+        response.status_code = 202
+        return job_response(job)
+
+    await job.done.wait()
+    if job.status == "failed":
+        raise job_http_error(job)
 
     return WhyResponse(
-        bullets=bullet_summary,
+        bullets=job.result,
         from_cache=False,
         generated_at="just now",
     )
 
 
+def sse_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.get("/api/why/stream")
+async def stream_why(
+    sentiment_type: str = Query(...),
+    start_date: str = Query(...),
+    end_date: str = Query(...),
+    keyword: Optional[str] = Query(None, description=KEYWORD_DESCRIPTION),
+    force_refresh: bool = Query(False),
+):
+    """POST /api/why as Server-Sent Events, for EventSource clients. A cache
+    hit is sent at once as a done event. A miss takes a slot in why_jobs and
+    the flight for the cache key exactly as post_why does (429 when the queue
+    is full), then streams progress events (tweets_fetched, prompt_built), a
+    bullet event per completed line, then done; the final text is written
+    through write_cache as in post_why. stream_cortex_complete_async yields
+    the whole completion as one chunk, so bullets only arrive once Cortex has
+    finished. Joining a job or flight already running for the key sends only
+    done. Failures end the stream with a failed event carrying the status
+    post_why would have returned."""
+    if sentiment_type not in ("NEGATIVE", "POSITIVE"):
+        raise HTTPException(
+            status_code=400, detail="sentiment_type must be NEGATIVE or POSITIVE"
+        )
+
+    cache_key = compute_cache_key(start_date, end_date, keyword, sentiment_type)
+    # Filled by stream_and_store when this request's job leads the flight; a
+    # request joining another job or flight for the key only receives done.
+    progress: asyncio.Queue = asyncio.Queue()
+
+    async def stream_and_store() -> str:
+        result = None
+        async for event in generate_why_analysis_stream(
+            sentiment_type, start_date, end_date, keyword, force=force_refresh
+        ):
+            name = event.pop("event")
+            if name == "result":
+                result = event
+            else:
+                progress.put_nowait(sse_event(name, event))
+        await write_cache_async(
+            cache_key,
+            sentiment_type,
+            result["bullet_summary"],
+            result["prompt_text"],
+            result["content_key"],
+        )
+        return result["bullet_summary"]
+
+    async def cached_event(cached: dict):
+        yield sse_event("done", {
+            "bullets": cached["bullet_summary"],
+            "from_cache": True,
+            "generated_at": str(cached["generated_at"]),
+        })
+
+    async def job_events(job):
+        finished = asyncio.ensure_future(job.done.wait())
+        finished.add_done_callback(lambda _: progress.put_nowait(None))
+        while (chunk := await progress.get()) is not None:
+            yield chunk
+
+        if job.status == "failed":
+            error = job_http_error(job)
+            yield sse_event("failed", {"status": error.status_code, "detail": error.detail})
+            return
+
+        yield sse_event("done", {
+            "bullets": job.result,
+            "from_cache": False,
+            "generated_at": "just now",
+        })
+
+    cached = None if force_refresh else await read_cache_async(cache_key)
+    if cached:
+        events = cached_event(cached)
+    else:
+        try:
+            job = why_jobs.submit(
+                cache_key, lambda: why_flights.do(cache_key, stream_and_store)
+            )
+        except QueueFullError as e:
+            raise HTTPException(
+                status_code=429, detail=str(e), headers={"Retry-After": "5"}
+            )
+        events = job_events(job)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(
+            log_why_request_async,
+            cache_key,
+            start_date,
+            end_date,
+            keyword,
+            sentiment_type,
+        ),
+    )
+
+
+@app.get("/api/why/jobs/{job_id}", response_model=WhyJobResponse)
+async def get_why_job(job_id: str):
+    job = why_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job.status == "failed":
+        raise job_http_error(job)
+    return job_response(job)
+
+
 @app.get("/api/date-range", response_model=DateRangeResponse)
-def get_date_range():
+async def get_date_range():
     sql = """
         SELECT
             TO_CHAR(MIN(created_at), 'YYYY-MM-DD') AS min_date,
             TO_CHAR(MAX(created_at), 'YYYY-MM-DD') AS max_date
         FROM SCORED_MENTIONS
     """
-    results = execute_query(sql)
+    results = await execute_query_async(sql)
 
     if not results or results[0]["min_date"] is None:
         raise HTTPException(
@@ -304,3 +1216,77 @@ def get_date_range():
 
     row = results[0]
     return DateRangeResponse(min_date=row["min_date"], max_date=row["max_date"])
+
+
+# --- Warm Start ---
+
+
+async def warm_start() -> dict:
+    """Opens WARMUP_CONNECTIONS pooled connections (paying the deferred
+    connector import), then runs the date range, default summary and default
+    dashboard queries the frontend's first view issues. This resumes the
+    warehouse and leaves those results cached. Returns seconds per step."""
+    timings = {}
+    started = step = time.monotonic()
+
+    await asyncio.to_thread(open_pool, WARMUP_CONNECTIONS)
+    timings["connections"] = time.monotonic() - step
+
+    step = time.monotonic()
+    date_range = await get_date_range()
+    timings["date_range"] = time.monotonic() - step
+
+    step = time.monotonic()
+    await get_summary(
+        start_date=date_range.min_date,
+        end_date=date_range.max_date,
+        keyword=None,
+        sentiment_filter=None,
+        approx=None,
+    )
+    timings["summary"] = time.monotonic() - step
+
+    step = time.monotonic()
+    await get_dashboard(
+        start_date=date_range.min_date,
+        end_date=date_range.max_date,
+        keyword=None,
+        sentiment_filter=None,
+        granularity="auto",
+        max_points=TREND_MAX_POINTS,
+    )
+    timings["dashboard"] = time.monotonic() - step
+
+    timings["total"] = time.monotonic() - started
+    return {name: round(seconds, 3) for name, seconds in timings.items()}
+
+
+async def run_warm_start() -> None:
+    warm_start_report["status"] = "running"
+    try:
+        warm_start_report["seconds"] = await warm_start()
+        warm_start_report["status"] = "done"
+        logger.info(f"Warm start finished: {warm_start_report['seconds']}")
+    except Exception as e:
+        warm_start_report["status"] = "failed"
+        logger.warning(f"Warm start failed: {e}")
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint."""
+    pool = pool_stats()
+    for state in ("idle", "in_use"):
+        metrics.POOL_CONNECTIONS.set((state,), pool[state])
+    return Response(metrics.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    return {
+        "results": cache_stats(),
+        "why": why_cache_stats(),
+        "why_jobs": why_jobs.stats(),
+        "warm_start": warm_start_report,
+        "keepalive": keepalive.stats(),
+    }
@@ -0,0 +1,274 @@
+import bisect
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger("sentiment_api.metrics")
+
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_SECONDS", "2"))
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Route template of the request being served ("/api/trend"); queries issued
+# outside a request (prewarm, Why job workers, CLIs) are labelled "background".
+current_endpoint: ContextVar[str] = ContextVar("metrics_endpoint", default="background")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label set, rendered as <name> in text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Point-in-time value per label set."""
+
+    def set(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Bucketed observations per label set, with _bucket/_sum/_count series."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    label_str = _labels(self.labelnames, labels, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+                label_str = _labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_str} {_number(series[-1])}")
+                lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+QUERY_SECONDS = Histogram(
+    "sentiment_query_seconds",
+    "Snowflake query wall time, including pool wait and polling.",
+    ("endpoint", "fingerprint", "status"),
+)
+QUERY_ROWS = Counter(
+    "sentiment_query_rows_total",
+    "Rows returned or affected by Snowflake queries.",
+    ("endpoint", "fingerprint"),
+)
+POOL_WAIT_SECONDS = Histogram(
+    "sentiment_pool_wait_seconds",
+    "Time spent waiting for a pooled Snowflake connection per query.",
+    ("endpoint",),
+)
+CORTEX_SECONDS = Histogram(
+    "sentiment_cortex_seconds",
+    "CORTEX.COMPLETE call latency.",
+    ("endpoint", "status"),
+)
+CACHE_SECONDS = Histogram(
+    "sentiment_cache_seconds",
+    "Cached lookups by outcome; misses include computing the value.",
+    ("cache", "outcome"),
+)
+HTTP_SECONDS = Histogram(
+    "sentiment_http_request_seconds",
+    "HTTP request latency by route template.",
+    ("endpoint", "method", "status"),
+)
+POOL_CONNECTIONS = Gauge(
+    "sentiment_pool_connections",
+    "Snowflake connection pool size by state.",
+    ("state",),
+)
+REGISTRY = (
+    HTTP_SECONDS,
+    QUERY_SECONDS,
+    QUERY_ROWS,
+    POOL_WAIT_SECONDS,
+    CORTEX_SECONDS,
+    CACHE_SECONDS,
+    POOL_CONNECTIONS,
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_statements: dict[str, str] = {}
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapses whitespace and replaces string and number literals with ?."""
+    return _LITERALS.sub("?", " ".join(sql.split()))
+
+
+def fingerprint(sql: str) -> str:
+    """Short stable id for a statement shape, used as a metric label."""
+    normalized = normalize_sql(sql)
+    key = hashlib.md5(normalized.encode("utf-8")).hexdigest()[:12]
+    _statements.setdefault(key, normalized[:500])
+    return key
+
+
+def statement(fingerprint_key: str) -> str | None:
+    """Normalized SQL for a fingerprint seen by this process."""
+    return _statements.get(fingerprint_key)
+
+
+class QueryTimer:
+    """Times one query from pool checkout to the last fetch. Callers add
+    pool_wait, rows and query_id as they learn them; the with-block exit
+    records the metrics and logs the query if it exceeded
+    SLOW_QUERY_SECONDS."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.endpoint = current_endpoint.get()
+        self.pool_wait = 0.0
+        self.rows = 0
+        self.query_id: str | None = None
+        self.started = 0.0
+
+    def __enter__(self) -> "QueryTimer":
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            status = "ok"
+        elif issubclass(exc_type, Exception):
+            status = "error"
+        else:
+            status = "cancelled"
+        observe_query(
+            self.sql,
+            time.monotonic() - self.started,
+            self.pool_wait,
+            self.rows,
+            self.query_id,
+            status,
+            self.endpoint,
+        )
+
+
+def observe_query(
+    sql: str,
+    seconds: float,
+    pool_wait: float,
+    rows: int,
+    query_id: str | None,
+    status: str = "ok",
+    endpoint: str | None = None,
+) -> None:
+    endpoint = endpoint or current_endpoint.get()
+    key = fingerprint(sql)
+    QUERY_SECONDS.observe((endpoint, key, status), seconds)
+    QUERY_ROWS.inc((endpoint, key), rows)
+    POOL_WAIT_SECONDS.observe((endpoint,), pool_wait)
+    if SLOW_QUERY_SECONDS > 0 and seconds >= SLOW_QUERY_SECONDS:
+        logger.warning(
+            "slow query %.2fs endpoint=%s fingerprint=%s query_id=%s rows=%d "
+            "pool_wait=%.3fs status=%s: %s",
+            seconds,
+            endpoint,
+            key,
+            query_id,
+            rows,
+            pool_wait,
+            status,
+            statement(key),
+        )
+
+
+@contextmanager
+def cortex_timer():
+    """Times a CORTEX.COMPLETE call; the status is error if the block raises."""
+    started = time.monotonic()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        CORTEX_SECONDS.observe((current_endpoint.get(), status), time.monotonic() - started)
+
+
+def observe_cache(cache: str, hit: bool, seconds: float) -> None:
+    CACHE_SECONDS.observe((cache, "hit" if hit else "miss"), seconds)
+
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float) -> None:
+    HTTP_SECONDS.observe((endpoint, method, str(status)), seconds)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
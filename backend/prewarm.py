@@ -0,0 +1,237 @@
+"""
+Why Layer Cache Prewarmer
+Populates WHY_LAYER_CACHE for the date-range defaults and the most-requested
+Why keys, so the first analyst of the day does not pay the Cortex latency.
+
+Usage:
+    python prewarm.py                      # defaults + top 20 keys of the last 7 days
+    python prewarm.py --dry-run            # report how many Cortex calls it would make,
+                                           # apart from WHY_CONTENT_CACHE hits
+    python prewarm.py --force              # regenerate even if already cached
+    python prewarm.py --watch              # prewarm again whenever new rows are scored
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from cache import compute_cache_key, read_cache, read_content_cache, write_cache
+from cortex import generate_why_analysis, resolve_content_key
+from snowflake_client import (
+    close_connection,
+    execute_dml_async,
+    execute_query,
+    execute_scalar,
+)
+
+logger = logging.getLogger("sentiment_api.prewarm")
+
+SENTIMENT_TYPES = ("NEGATIVE", "POSITIVE")
+
+LOG_REQUEST_SQL = """
+    INSERT INTO WHY_REQUEST_LOG
+        (cache_key, start_date, end_date, keyword, sentiment_type, requested_at)
+    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP())
+"""
+
+
+@dataclass(frozen=True)
+class PrewarmTarget:
+    start_date: str
+    end_date: str
+    keyword: str | None
+    sentiment_type: str
+
+    @property
+    def cache_key(self) -> str:
+        return compute_cache_key(
+            self.start_date, self.end_date, self.keyword, self.sentiment_type
+        )
+
+
+async def log_why_request_async(
+    cache_key: str,
+    start_date: str,
+    end_date: str,
+    keyword: str | None,
+    sentiment_type: str,
+) -> None:
+    """Records a Why request so prewarming can target the most-requested keys."""
+    normalized_keyword = (keyword or "").lower().strip() or None
+    try:
+        await execute_dml_async(
+            LOG_REQUEST_SQL,
+            (cache_key, start_date, end_date, normalized_keyword, sentiment_type),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to log Why request: {e}")
+
+
+def default_targets() -> list[PrewarmTarget]:
+    """The dashboard's initial view: full date range, no keyword."""
+    rows = execute_query(
+        """
+        SELECT
+            TO_CHAR(MIN(created_at), 'YYYY-MM-DD') AS min_date,
+            TO_CHAR(MAX(created_at), 'YYYY-MM-DD') AS max_date
+        FROM SCORED_MENTIONS
+        """
+    )
+    if not rows or rows[0]["min_date"] is None:
+        return []
+    row = rows[0]
+    return [
+        PrewarmTarget(row["min_date"], row["max_date"], None, sentiment_type)
+        for sentiment_type in SENTIMENT_TYPES
+    ]
+
+
+def top_requested_targets(limit: int, days: int) -> list[PrewarmTarget]:
+    """Most frequently requested Why keys over the last `days` days."""
+    if limit <= 0:
+        return []
+    rows = execute_query(
+        f"""
+        SELECT start_date, end_date, keyword, sentiment_type, COUNT(*) AS requests
+        FROM WHY_REQUEST_LOG
+        WHERE requested_at > DATEADD('day', -%s, CURRENT_TIMESTAMP())
+        GROUP BY start_date, end_date, keyword, sentiment_type
+        ORDER BY requests DESC
+        LIMIT {int(limit)}
+        """,
+        (days,),
+    )
+    return [
+        PrewarmTarget(
+            row["start_date"], row["end_date"], row["keyword"], row["sentiment_type"]
+        )
+        for row in rows
+    ]
+
+
+def plan(targets: list[PrewarmTarget], force: bool = False) -> list[PrewarmTarget]:
+    """De-duplicates targets by cache key and drops ones already cached."""
+    seen = set()
+    pending = []
+    for target in targets:
+        key = target.cache_key
+        if key in seen:
+            continue
+        seen.add(key)
+        if force or read_cache(key) is None:
+            pending.append(target)
+    return pending
+
+
+def _warm(target: PrewarmTarget) -> str:
+    try:
+        bullet_summary, tweet_sample, content_key = generate_why_analysis(
+            target.sentiment_type, target.start_date, target.end_date, target.keyword
+        )
+    except ValueError:
+        return "empty"
+    write_cache(
+        target.cache_key,
+        target.sentiment_type,
+        bullet_summary,
+        tweet_sample,
+        content_key,
+    )
+    return "warmed"
+
+
+def _dry_run(target: PrewarmTarget) -> str:
+    # Pending targets whose tweets were already analysed are served from
+    # WHY_CONTENT_CACHE by _warm and cost no Cortex call.
+    content_key = resolve_content_key(
+        target.sentiment_type, target.start_date, target.end_date, target.keyword
+    )
+    if content_key is None:
+        return "empty"
+    if read_content_cache(content_key) is not None:
+        return "content_hits"
+    return "cortex_calls"
+
+
+def run(
+    top: int = 20,
+    days: int = 7,
+    concurrency: int = 2,
+    force: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    """Plans and, unless dry_run, executes one prewarm pass. dry_run resolves
+    each pending target's content key instead, splitting it into
+    cortex_calls, content_hits and empty."""
+    targets = default_targets() + top_requested_targets(top, days)
+    pending = plan(targets, force=force)
+    report = {
+        "targets": len(targets),
+        "pending": len(pending),
+        "warmed": 0,
+        "empty": 0,
+        "failed": 0,
+    }
+    if dry_run:
+        report.update(cortex_calls=0, content_hits=0)
+    if not pending:
+        return report
+
+    started = time.monotonic()
+    work = _dry_run if dry_run else _warm
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(work, target) for target in pending]
+        for target, future in zip(pending, futures):
+            try:
+                report[future.result()] += 1
+            except Exception as e:
+                report["failed"] += 1
+                logger.error(f"Prewarm failed for {target}: {e}")
+    report["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    return report
+
+
+def scored_watermark() -> str:
+    return str(execute_scalar("SELECT MAX(loaded_at) FROM SCORED_MENTIONS"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm the Why Layer cache")
+    parser.add_argument("--top", type=int, default=20, help="Most-requested keys to include")
+    parser.add_argument("--days", type=int, default=7, help="Request-log lookback window")
+    parser.add_argument("--concurrency", type=int, default=2, help="Max concurrent Cortex calls")
+    parser.add_argument("--force", action="store_true", help="Regenerate cached entries too")
+    parser.add_argument("--dry-run", action="store_true", help="Only report planned Cortex calls")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Poll SCORED_MENTIONS and prewarm after each scoring run",
+    )
+    parser.add_argument("--interval", type=int, default=300, help="Watch poll interval (s)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        if not args.watch:
+            print(run(args.top, args.days, args.concurrency, args.force, args.dry_run))
+            return
+
+        last = None
+        while True:
+            current = scored_watermark()
+            if current != last:
+                # New scored rows make existing analyses stale: regenerate.
+                force = args.force or last is not None
+                print(f"Watermark {current}: prewarming (force={force})")
+                print(run(args.top, args.days, args.concurrency, force, args.dry_run))
+                last = current
+            time.sleep(args.interval)
+    finally:
+        close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Why Layer Prompt Benchmark
+Compares the Why prompt before and after near-duplicate grouping and token
+budgeting, on real tweets pulled from SCORED_MENTIONS.
+
+Usage:
+    python prompt_benchmark.py                                   # full date range
+    python prompt_benchmark.py --start 2009-05-01 --end 2009-06-01
+    python prompt_benchmark.py --keyword "ipod" --sentiment NEGATIVE
+"""
+
+import argparse
+import time
+
+from cortex import (
+    MAX_TWEET_BATCH,
+    build_prompt,
+    fetch_tweets_for_why,
+    select_prompt_tweets,
+)
+from prewarm import SENTIMENT_TYPES, default_targets
+from prompt_dedup import TweetCluster, estimate_tokens
+from snowflake_client import close_connection
+
+
+def compare(tweets: list[dict], sentiment_type: str) -> dict:
+    """Prompt size for the first MAX_TWEET_BATCH tweets as-is versus the
+    de-duplicated, budgeted selection from the same candidates."""
+    baseline = build_prompt(
+        [TweetCluster(tweet, [tweet]) for tweet in tweets[:MAX_TWEET_BATCH]],
+        sentiment_type,
+    )
+
+    started = time.perf_counter()
+    clusters = select_prompt_tweets(tweets)
+    elapsed = time.perf_counter() - started
+    deduped = build_prompt(clusters, sentiment_type)
+
+    return {
+        "candidates": len(tweets),
+        "baseline_tweets": min(len(tweets), MAX_TWEET_BATCH),
+        "baseline_chars": len(baseline),
+        "baseline_tokens": estimate_tokens(baseline),
+        "distinct_tweets": len(clusters),
+        "tweets_represented": sum(cluster.count for cluster in clusters),
+        "deduped_chars": len(deduped),
+        "deduped_tokens": estimate_tokens(deduped),
+        "dedup_ms": round(elapsed * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Why prompt assembly")
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD); default: earliest")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD); default: latest")
+    parser.add_argument("--keyword", default=None, help="Optional keyword filter")
+    parser.add_argument("--sentiment", choices=SENTIMENT_TYPES, help="Default: both")
+    args = parser.parse_args()
+
+    try:
+        start, end = args.start, args.end
+        if not (start and end):
+            defaults = default_targets()
+            if not defaults:
+                print("SCORED_MENTIONS is empty")
+                return
+            start = start or defaults[0].start_date
+            end = end or defaults[0].end_date
+
+        for sentiment_type in [args.sentiment] if args.sentiment else SENTIMENT_TYPES:
+            tweets = fetch_tweets_for_why(sentiment_type, start, end, args.keyword)
+            if not tweets:
+                print(f"{sentiment_type}: no tweets")
+                continue
+            print(f"{sentiment_type} {start}..{end}: {compare(tweets, sentiment_type)}")
+    finally:
+        close_connection()
+
+
+if __name__ == "__main__":
+    main()
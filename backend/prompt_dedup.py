@@ -0,0 +1,138 @@
+import os
+import random
+import re
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable
+
+# Near-duplicate clustering for the Why Layer prompt. Tweets are shingled
+# into character n-grams, MinHash signatures are bucketed with LSH banding to
+# find candidate pairs, and candidates are confirmed with exact Jaccard
+# similarity. Hashing is seeded so the same tweets always cluster the same
+# way (the Why content key depends on it).
+WHY_DEDUP_THRESHOLD = float(os.environ.get("WHY_DEDUP_THRESHOLD", "0.6"))
+WHY_PROMPT_TOKEN_BUDGET = int(os.environ.get("WHY_PROMPT_TOKEN_BUDGET", "6000"))
+SHINGLE_SIZE = 4
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8  # 4 rows per band: candidate pairs from Jaccard ~0.6 upwards
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(140)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_MENTION = re.compile(r"@\w+")
+_NON_WORD = re.compile(r"[^a-z0-9#]+")
+
+
+@dataclass
+class TweetCluster:
+    representative: dict
+    members: list[dict] = field(default_factory=list)
+    shingles: frozenset = frozenset()
+
+    @property
+    def count(self) -> int:
+        return len(self.members)
+
+
+def normalize(text: str | None) -> str:
+    """Lowercases and strips URLs, @mentions and punctuation, so retweet-style
+    copies and link variants compare equal."""
+    text = _URL.sub(" ", (text or "").lower())
+    text = _MENTION.sub(" ", text)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def shingles(text: str | None) -> frozenset:
+    """Character n-gram shingles of the normalized text, hashed to ints."""
+    norm = normalize(text)
+    if len(norm) <= SHINGLE_SIZE:
+        return frozenset([zlib.crc32(norm.encode("utf-8"))])
+    return frozenset(
+        zlib.crc32(norm[i : i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(norm) - SHINGLE_SIZE + 1)
+    )
+
+
+@lru_cache(maxsize=65536)
+def _permuted(shingle: int) -> tuple:
+    # Near-duplicates share most shingles, so their permuted hashes are reused.
+    return tuple((a * shingle + b) % _PRIME for a, b in _PERMUTATIONS)
+
+
+def minhash(shingle_set: frozenset) -> tuple:
+    return tuple(map(min, zip(*(_permuted(x) for x in shingle_set))))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_near_duplicates(
+    tweets: list[dict],
+    threshold: float = WHY_DEDUP_THRESHOLD,
+) -> list[TweetCluster]:
+    """Greedily groups tweets whose shingle Jaccard similarity to a cluster's
+    representative is at least threshold. Input order is preserved: each
+    cluster is represented by its first (most extreme) tweet."""
+    clusters: list[TweetCluster] = []
+    buckets: dict[tuple, list[int]] = {}
+
+    for tweet in tweets:
+        tweet_shingles = shingles(tweet["text"])
+        signature = minhash(tweet_shingles)
+        bands = [
+            (band, signature[band * _ROWS_PER_BAND : (band + 1) * _ROWS_PER_BAND])
+            for band in range(LSH_BANDS)
+        ]
+
+        match = None
+        candidates = sorted({i for key in bands for i in buckets.get(key, ())})
+        for i in candidates:
+            if jaccard(tweet_shingles, clusters[i].shingles) >= threshold:
+                match = clusters[i]
+                break
+
+        if match is not None:
+            match.members.append(tweet)
+            continue
+
+        clusters.append(TweetCluster(tweet, [tweet], tweet_shingles))
+        for key in bands:
+            buckets.setdefault(key, []).append(len(clusters) - 1)
+
+    return clusters
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def within_budget(
+    clusters: list[TweetCluster],
+    line_for: Callable[[int, TweetCluster], str],
+    max_items: int,
+    budget_tokens: int = WHY_PROMPT_TOKEN_BUDGET,
+) -> list[TweetCluster]:
+    """Keeps clusters in order until max_items or the token budget is reached.
+    line_for(index, cluster) renders the prompt line a cluster will occupy."""
+    selected = []
+    used = 0
+    for cluster in clusters:
+        if len(selected) >= max_items:
+            break
+        cost = estimate_tokens(line_for(len(selected) + 1, cluster))
+        if selected and used + cost > budget_tokens:
+            break
+        selected.append(cluster)
+        used += cost
+    return selected
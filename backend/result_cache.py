@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+import orjson
+
+from metrics import observe_cache
+from snowflake_client import execute_query, execute_query_async
+
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "512"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get("RESULT_CACHE_TTL", "3600"))
+WATERMARK_PROBE_SECONDS = float(os.environ.get("WATERMARK_PROBE_SECONDS", "30"))
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximates the in-memory footprint of a cached value by its JSON size."""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    return len(orjson.dumps(value, default=str))
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL, bounded by entry count and
+    approximate byte size. Cleared whenever the data watermark changes."""
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._watermark = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Returns (hit, value). Expired entries count as misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, expires_at, size = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        """Stores a value, evicting least-recently-used entries to stay in bounds.
+        ttl_seconds overrides the cache-wide TTL for this entry."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = _estimate_size(value)
+        if size > self.max_bytes or ttl <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def check_watermark(self, watermark) -> None:
+        """Drops every entry if the data watermark differs from the last one seen."""
+        with self._lock:
+            if watermark == self._watermark:
+                return
+            if self._watermark is not None:
+                self.invalidations += 1
+            self._watermark = watermark
+            self._entries.clear()
+            self._bytes = 0
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = ResultCache()
+_watermark_lock = threading.Lock()
+_watermark_value = None
+_watermark_checked_at = 0.0
+
+
+def make_key(endpoint: str, where: str, params: list | tuple) -> str:
+    """Builds a cache key from the endpoint and the normalized WHERE clause."""
+    normalized = " ".join(where.split())
+    raw = json.dumps([endpoint, normalized, list(params)], default=str)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+WATERMARK_SQL = """
+    SELECT
+        MAX(loaded_at) AS max_loaded_at,
+        COUNT(*) AS row_count,
+        (SELECT SUM(tweet_count) FROM DAILY_SENTIMENT_ROLLUP) AS rollup_count
+    FROM SCORED_MENTIONS
+"""
+
+
+def _watermark_from_rows(rows: list[dict]) -> tuple:
+    row = rows[0] if rows else {}
+    return (
+        str(row.get("max_loaded_at")),
+        int(row.get("row_count") or 0),
+        int(row.get("rollup_count") or 0),
+    )
+
+
+def probe_watermark() -> tuple:
+    """Cheap metadata probe: MAX(loaded_at) and row count of SCORED_MENTIONS,
+    plus the DAILY_SENTIMENT_ROLLUP total so a lagging rollup refresh also
+    invalidates results served from it."""
+    return _watermark_from_rows(execute_query(WATERMARK_SQL))
+
+
+async def probe_watermark_async() -> tuple:
+    return _watermark_from_rows(await execute_query_async(WATERMARK_SQL))
+
+
+def _watermark_is_fresh() -> bool:
+    return (
+        _watermark_value is not None
+        and time.monotonic() - _watermark_checked_at < WATERMARK_PROBE_SECONDS
+    )
+
+
+def current_watermark() -> tuple:
+    """Returns the data watermark, re-probing at most every WATERMARK_PROBE_SECONDS."""
+    global _watermark_value, _watermark_checked_at
+    with _watermark_lock:
+        if not _watermark_is_fresh():
+            _watermark_value = probe_watermark()
+            _watermark_checked_at = time.monotonic()
+        return _watermark_value
+
+
+_watermark_async_lock: asyncio.Lock | None = None
+
+
+async def current_watermark_async() -> tuple:
+    """Async current_watermark; concurrent callers share a single probe."""
+    global _watermark_value, _watermark_checked_at, _watermark_async_lock
+    if _watermark_is_fresh():
+        return _watermark_value
+    if _watermark_async_lock is None:
+        _watermark_async_lock = asyncio.Lock()
+    async with _watermark_async_lock:
+        if not _watermark_is_fresh():
+            _watermark_value = await probe_watermark_async()
+            _watermark_checked_at = time.monotonic()
+        return _watermark_value
+
+
+def cached_result(endpoint: str, where: str, params: list | tuple, compute: Callable[[], Any]):
+    """Returns the cached result for (endpoint, where, params) or computes and stores it."""
+    started = time.monotonic()
+    _cache.check_watermark(current_watermark())
+    key = make_key(endpoint, where, params)
+    hit, value = _cache.get(key)
+    if not hit:
+        value = compute()
+        _cache.put(key, value)
+    observe_cache("result", hit, time.monotonic() - started)
+    return value
+
+
+async def cached_result_async(
+    endpoint: str,
+    where: str,
+    params: list | tuple,
+    compute: Callable[[], Awaitable[Any]],
+):
+    """Async cached_result; compute is a coroutine function."""
+    started = time.monotonic()
+    _cache.check_watermark(await current_watermark_async())
+    key = make_key(endpoint, where, params)
+    hit, value = _cache.get(key)
+    if not hit:
+        value = await compute()
+        _cache.put(key, value)
+    observe_cache("result", hit, time.monotonic() - started)
+    return value
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,191 @@
+"""
+Incremental Scoring Driver
+Scores RAW_MENTIONS into SCORED_MENTIONS in batches ordered by
+(loaded_at, tweet_id), calling CORTEX.SENTIMENT once per row. Progress is
+checkpointed in SCORING_CHECKPOINT after every batch, so an interrupted run
+resumes where it stopped, and a rerun of the same batch inserts nothing twice.
+
+Usage:
+    python scoring.py                      # score everything past the checkpoint
+    python scoring.py --batch-size 20000   # larger batches
+    python scoring.py --max-batches 1      # score a single batch
+    python scoring.py --dry-run            # report how many rows are pending
+"""
+
+import argparse
+import logging
+import time
+
+from cortex import SENTIMENT_NEGATIVE_THRESHOLD, SENTIMENT_POSITIVE_THRESHOLD
+from snowflake_client import (
+    close_connection,
+    execute_dml,
+    execute_query,
+    execute_scalar,
+)
+
+logger = logging.getLogger("sentiment_api.scoring")
+
+CHECKPOINT_JOB = "SCORE_NEW_MENTIONS"
+# Keyset lower bound used before the first checkpoint is written.
+INITIAL_WATERMARK = ("1970-01-01 00:00:00", "")
+
+# Rows strictly after the (loaded_at, tweet_id) watermark.
+_AFTER = "(loaded_at > %s OR (loaded_at = %s AND tweet_id > %s))"
+
+CHECKPOINT_READ_SQL = """
+    SELECT
+        TO_CHAR(watermark_loaded_at, 'YYYY-MM-DD HH24:MI:SS.FF9') AS loaded_at,
+        watermark_tweet_id AS tweet_id
+    FROM SCORING_CHECKPOINT
+    WHERE job = %s
+"""
+CHECKPOINT_MERGE_SQL = """
+    MERGE INTO SCORING_CHECKPOINT t
+    USING (
+        SELECT %s AS job, %s::TIMESTAMP_NTZ AS watermark_loaded_at,
+               %s AS watermark_tweet_id, %s AS rows_scored
+    ) s
+    ON t.job = s.job
+    WHEN MATCHED THEN UPDATE SET
+        watermark_loaded_at = s.watermark_loaded_at,
+        watermark_tweet_id = s.watermark_tweet_id,
+        rows_scored = t.rows_scored + s.rows_scored,
+        updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+        (job, watermark_loaded_at, watermark_tweet_id, rows_scored, updated_at)
+        VALUES (s.job, s.watermark_loaded_at, s.watermark_tweet_id, s.rows_scored,
+                CURRENT_TIMESTAMP())
+"""
+BATCH_END_SQL = f"""
+    SELECT
+        TO_CHAR(loaded_at, 'YYYY-MM-DD HH24:MI:SS.FF9') AS loaded_at,
+        tweet_id
+    FROM (
+        SELECT loaded_at, tweet_id
+        FROM RAW_MENTIONS
+        WHERE {_AFTER}
+        ORDER BY loaded_at, tweet_id
+        LIMIT %s
+    )
+    ORDER BY loaded_at DESC, tweet_id DESC
+    LIMIT 1
+"""
+# SENTIMENT is evaluated once per row in the inner SELECT; the label is
+# derived from that column. Rows already in SCORED_MENTIONS are skipped
+# before scoring, which makes replaying a batch a no-op.
+SCORE_BATCH_SQL = f"""
+    INSERT INTO SCORED_MENTIONS
+        (tweet_id, user, created_at, text, source_label, loaded_at,
+         sentiment_score, sentiment_label)
+    SELECT
+        tweet_id, "USER", created_at, text, source_label, loaded_at,
+        sentiment_score,
+        CASE
+            WHEN sentiment_score >= {SENTIMENT_POSITIVE_THRESHOLD} THEN 'POSITIVE'
+            WHEN sentiment_score <= {SENTIMENT_NEGATIVE_THRESHOLD} THEN 'NEGATIVE'
+            ELSE 'NEUTRAL'
+        END
+    FROM (
+        SELECT r.*, SNOWFLAKE.CORTEX.SENTIMENT(r.text) AS sentiment_score
+        FROM RAW_MENTIONS r
+        WHERE (r.loaded_at > %s OR (r.loaded_at = %s AND r.tweet_id > %s))
+          AND (r.loaded_at < %s OR (r.loaded_at = %s AND r.tweet_id <= %s))
+          AND NOT EXISTS (
+              SELECT 1 FROM SCORED_MENTIONS s
+              WHERE s.tweet_id = r.tweet_id
+                AND s.loaded_at >= %s::TIMESTAMP_NTZ
+          )
+    )
+"""
+PENDING_SQL = f"SELECT COUNT(*) FROM RAW_MENTIONS WHERE {_AFTER}"
+
+
+def _bound(watermark: tuple) -> tuple:
+    loaded_at, tweet_id = watermark
+    return (loaded_at, loaded_at, tweet_id)
+
+
+def read_checkpoint() -> tuple:
+    """Returns the (loaded_at, tweet_id) of the last scored row."""
+    rows = execute_query(CHECKPOINT_READ_SQL, (CHECKPOINT_JOB,))
+    if not rows or rows[0]["loaded_at"] is None:
+        return INITIAL_WATERMARK
+    return rows[0]["loaded_at"], rows[0]["tweet_id"]
+
+
+def write_checkpoint(watermark: tuple, rows_scored: int) -> None:
+    execute_dml(CHECKPOINT_MERGE_SQL, (CHECKPOINT_JOB, *watermark, rows_scored))
+
+
+def pending_rows(watermark: tuple) -> int:
+    return int(execute_scalar(PENDING_SQL, _bound(watermark)) or 0)
+
+
+def score_batch(watermark: tuple, batch_size: int) -> tuple[tuple | None, int]:
+    """Scores the next batch_size rows after watermark.
+    Returns (new_watermark, rows_inserted); new_watermark is None when
+    nothing is pending."""
+    end = execute_query(BATCH_END_SQL, (*_bound(watermark), batch_size))
+    if not end:
+        return None, 0
+    batch_end = (end[0]["loaded_at"], end[0]["tweet_id"])
+    inserted = execute_dml(
+        SCORE_BATCH_SQL,
+        (*_bound(watermark), *_bound(batch_end), watermark[0]),
+    )
+    return batch_end, inserted
+
+
+def run(batch_size: int = 5000, max_batches: int = 0) -> dict:
+    """Scores batches until caught up (or max_batches) and checkpoints each."""
+    watermark = read_checkpoint()
+    report = {"start_watermark": list(watermark), "batches": 0, "rows_scored": 0}
+    started = time.monotonic()
+
+    while not max_batches or report["batches"] < max_batches:
+        batch_started = time.monotonic()
+        batch_end, inserted = score_batch(watermark, batch_size)
+        if batch_end is None:
+            break
+        write_checkpoint(batch_end, inserted)
+        watermark = batch_end
+        report["batches"] += 1
+        report["rows_scored"] += inserted
+        elapsed = time.monotonic() - batch_started
+        logger.info(
+            "scored %d rows up to %s in %.2fs (%.1f rows/s)",
+            inserted,
+            batch_end,
+            elapsed,
+            inserted / elapsed if elapsed else 0.0,
+        )
+
+    elapsed = time.monotonic() - started
+    report["end_watermark"] = list(watermark)
+    report["elapsed_seconds"] = round(elapsed, 2)
+    report["rows_per_second"] = round(report["rows_scored"] / elapsed, 1) if elapsed else 0.0
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score new RAW_MENTIONS incrementally")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows scored per batch")
+    parser.add_argument("--max-batches", type=int, default=0, help="Stop after N batches (0 = all)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report pending rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        if args.dry_run:
+            watermark = read_checkpoint()
+            print({"watermark": list(watermark), "pending_rows": pending_rows(watermark)})
+            return
+        print(run(args.batch_size, args.max_batches))
+    finally:
+        close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Result Serialization Benchmark
+Times fetch, shaping and JSON encoding of /api/tweets pages and /api/trend
+series, per row, for the row path the endpoints used before and the
+columnar path they use now. Results come from an in-memory cursor, so only
+the Python side is measured; the Arrow variant runs when pyarrow is
+installed.
+
+Paths:
+    rows      fetchall -> dict per row -> per-row casts -> jsonable_encoder -> json
+    columnar  fetchall transposed to columns -> column casts -> orjson
+    arrow     fetch_arrow_all -> columns -> column casts -> orjson
+
+Usage:
+    python serialization_benchmark.py                       # 1000-row pages, 10-year trend
+    python serialization_benchmark.py --tweet-rows 1000 --trend-days 36500
+    python serialization_benchmark.py --repeat 200
+"""
+
+import argparse
+import datetime
+import json
+import random
+import time
+from decimal import Decimal
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from main import trend_points, tweets_from_columns
+from snowflake_client import _columns, _rows_as_dicts, pyarrow
+
+
+class StaticCursor:
+    """Serves a fixed result the way a connector cursor does. Scores and
+    counts are Decimals, as the connector returns NUMBER columns."""
+
+    def __init__(self, names: list[str], rows: list[tuple]):
+        self.description = [(name.upper(),) for name in names]
+        self._rows = rows
+
+    def fetchall(self) -> list[tuple]:
+        return list(self._rows)
+
+
+class ArrowCursor(StaticCursor):
+    def __init__(self, names: list[str], rows: list[tuple]):
+        super().__init__(names, rows)
+        self._table = pyarrow.table(
+            {name: list(column) for name, column in zip(names, zip(*rows))}
+        )
+
+    def fetch_arrow_all(self):
+        return self._table
+
+
+def tweet_result(rows: int, seed: int = 7) -> tuple[list[str], list[tuple]]:
+    rnd = random.Random(seed)
+    start = datetime.datetime(2009, 6, 1)
+    names = [
+        "tweet_id", "created_at", "cursor_created_at", "user",
+        "sentiment_label", "sentiment_score", "text",
+    ]
+    result = []
+    for i in range(rows):
+        created = start - datetime.timedelta(seconds=i * 7)
+        score = Decimal(f"{rnd.uniform(-1, 1):.6f}")
+        result.append((
+            str(1467810000 + i),
+            created.strftime("%Y-%m-%d %H:%M:%S"),
+            created.strftime("%Y-%m-%d %H:%M:%S.%f000"),
+            f"user{rnd.randrange(10**5)}",
+            "POSITIVE" if score >= 0 else "NEGATIVE",
+            score,
+            "just setting up my twttr " * rnd.randint(1, 5),
+        ))
+    return names, result
+
+
+def trend_result(days: int, seed: int = 7) -> tuple[list[str], list[tuple]]:
+    rnd = random.Random(seed)
+    start = datetime.date(2000, 1, 1)
+    names = ["day", "positive", "negative", "neutral"]
+    result = [
+        (
+            (start + datetime.timedelta(days=i)).isoformat(),
+            Decimal(rnd.randrange(5000)),
+            Decimal(rnd.randrange(5000)),
+            Decimal(rnd.randrange(5000)),
+        )
+        for i in range(days)
+    ]
+    return names, result
+
+
+def legacy_tweets(cursor) -> bytes:
+    rows = _rows_as_dicts(cursor)
+    tweets = [
+        {
+            "tweet_id": row["tweet_id"],
+            "created_at": row["created_at"],
+            "user": row["user"],
+            "sentiment_label": row["sentiment_label"],
+            "sentiment_score": round(float(row["sentiment_score"]), 4),
+            "text": row["text"],
+        }
+        for row in rows
+    ]
+    return _render_legacy({"tweets": tweets, "next_cursor": None})
+
+
+def legacy_trend(cursor) -> bytes:
+    rows = _rows_as_dicts(cursor)
+    data = [
+        {
+            "day": row["day"],
+            "POSITIVE": int(row["positive"]),
+            "NEGATIVE": int(row["negative"]),
+            "NEUTRAL": int(row["neutral"]),
+        }
+        for row in rows
+    ]
+    return _render_legacy({"data": data})
+
+
+def _render_legacy(content: dict) -> bytes:
+    # What FastAPI's default JSONResponse did with a returned dict.
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+        indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def columnar_tweets(cursor) -> bytes:
+    tweets = tweets_from_columns(_columns(cursor))
+    return orjson.dumps({"tweets": tweets, "next_cursor": None})
+
+
+def columnar_trend(cursor) -> bytes:
+    return orjson.dumps({"data": trend_points(_columns(cursor))})
+
+
+def measure(render, cursor_factory, names, rows, repeat: int) -> tuple[float, bytes]:
+    """Best-of-repeat microseconds per row, and the rendered body."""
+    best = float("inf")
+    for _ in range(repeat):
+        cursor = cursor_factory(names, rows)
+        started = time.perf_counter()
+        body = render(cursor)
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6 / max(len(rows), 1), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark result serialization")
+    parser.add_argument("--tweet-rows", type=int, default=1000, help="Rows per tweet page")
+    parser.add_argument("--trend-days", type=int, default=3650, help="Days in the trend")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per case (best kept)")
+    args = parser.parse_args()
+
+    cases = [
+        ("tweets", tweet_result(args.tweet_rows), legacy_tweets, columnar_tweets),
+        ("trend", trend_result(args.trend_days), legacy_trend, columnar_trend),
+    ]
+    for label, (names, rows), legacy, columnar in cases:
+        paths = [("rows", legacy, StaticCursor), ("columnar", columnar, StaticCursor)]
+        if pyarrow is not None:
+            paths.append(("arrow", columnar, ArrowCursor))
+
+        baseline = None
+        bodies = []
+        print(f"{label} ({len(rows):,} rows)")
+        for path, render, cursor_factory in paths:
+            per_row, body = measure(render, cursor_factory, names, rows, args.repeat)
+            bodies.append(orjson.loads(body))
+            baseline = baseline or per_row
+            print(
+                f"  {path:<9} {per_row:>7.2f} us/row  "
+                f"{per_row * len(rows) / 1000:>7.2f} ms total  "
+                f"{baseline / per_row:>5.1f}x"
+            )
+        print(f"  same JSON: {all(body == bodies[0] for body in bodies)}\n")
+
+    if pyarrow is None:
+        print("pyarrow not installed; arrow path skipped")
+
+
+if __name__ == "__main__":
+    main()
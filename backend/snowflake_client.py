@@ -1,70 +1,499 @@
+import asyncio
 import os
-import snowflake.connector
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
 from dotenv import load_dotenv
 
+from metrics import QueryTimer
+
+try:
+    import pyarrow
+except ImportError:  # connector installed without the [pandas] extra
+    pyarrow = None
+
 load_dotenv()
 
-_connection = None
+POOL_MIN_SIZE = int(os.environ.get("SNOWFLAKE_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.environ.get("SNOWFLAKE_POOL_MAX_SIZE", "8"))
+POOL_TIMEOUT_SECONDS = float(os.environ.get("SNOWFLAKE_POOL_TIMEOUT", "30"))
+POOL_RECYCLE_SECONDS = float(os.environ.get("SNOWFLAKE_POOL_RECYCLE", "3600"))
+ASYNC_POLL_INITIAL_SECONDS = 0.05
+ASYNC_POLL_MAX_SECONDS = 1.0
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+def _connect():
+    """Opens a new Snowflake connection from environment credentials."""
+    # Imported here rather than at module load: the connector takes about a
+    # second to import, which would otherwise delay the app from listening.
+    # The first connection (normally main.warm_start) pays for it instead.
+    import snowflake.connector
+
+    return snowflake.connector.connect(
+        account=os.environ["SNOWFLAKE_ACCOUNT"],
+        user=os.environ["SNOWFLAKE_USER"],
+        password=os.environ["SNOWFLAKE_PASSWORD"],
+        database=os.environ.get("SNOWFLAKE_DATABASE", "SENTIMENT_TRACKER"),
+        schema=os.environ.get("SNOWFLAKE_SCHEMA", "MAIN"),
+        warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE", "SENTIMENT_WH"),
+        role=os.environ.get("SNOWFLAKE_ROLE"),
+    )
+
+
+def _close_quietly(conn) -> None:
+    try:
+        if not conn.is_closed():
+            conn.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of Snowflake connections.
+    Idle connections are health-checked with is_closed() and recycled
+    once older than recycle_seconds."""
+
+    def __init__(
+        self,
+        connect: Callable = _connect,
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = POOL_TIMEOUT_SECONDS,
+        recycle_seconds: float = POOL_RECYCLE_SECONDS,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool bounds: min_size={min_size}, max_size={max_size}"
+            )
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_seconds = recycle_seconds
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: deque = deque()  # (conn, created_at)
+        self._created_at: dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._wait_seconds = 0.0
+
+    def open(self, size: int | None = None) -> None:
+        """Pre-opens connections up to size (min_size by default, capped at
+        max_size)."""
+        target = min(self.max_size, self.min_size if size is None else size)
+        while True:
+            with self._cond:
+                if self._closed or self._size >= target:
+                    return
+                self._size += 1
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, self._created_at[id(conn)]))
+                self._cond.notify()
+
+    def acquire(self, timeout: float | None = None):
+        """Checks out a healthy connection, opening one if under max_size.
+        Blocks up to timeout seconds; raises PoolTimeoutError otherwise."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        stale = []
+        conn = None
+
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    while self._idle:
+                        candidate, created_at = self._idle.pop()
+                        if self._is_usable(candidate, created_at):
+                            conn = candidate
+                            break
+                        self._discard_locked(candidate, recycled=True)
+                        stale.append(candidate)
+                    if conn is not None:
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout}s waiting for a "
+                            f"Snowflake connection (max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                self._checkouts += 1
+                self._wait_seconds += time.monotonic() - started
+        finally:
+            for candidate in stale:
+                _close_quietly(candidate)
+
+        if conn is not None:
+            return conn
+
+        try:
+            return self._new_connection()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Returns a connection to the pool, or closes it if it is unhealthy,
+        past its recycle age, or the pool has been closed."""
+        with self._cond:
+            created_at = self._created_at.get(id(conn), 0.0)
+            stale = not discard and not self._is_usable(conn, created_at)
+            keep = not discard and not self._closed and not stale
+            if keep:
+                self._idle.append((conn, created_at))
+            else:
+                self._discard_locked(conn, recycled=stale)
+            self._cond.notify()
+        if not keep:
+            _close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """Borrows a connection for the duration of the with-block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=conn.is_closed())
+            raise
+        self.release(conn)
+
+    def close(self) -> None:
+        """Closes idle connections and rejects further checkouts.
+        Connections still checked out are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            for conn in idle:
+                self._discard_locked(conn)
+            self._cond.notify_all()
+        for conn in idle:
+            _close_quietly(conn)
+
+    def stats(self) -> dict:
+        """Returns a snapshot of pool size and checkout counters."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "wait_seconds_total": round(self._wait_seconds, 6),
+            }
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._cond:
+            self._created += 1
+            self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_usable(self, conn, created_at: float) -> bool:
+        if conn.is_closed():
+            return False
+        age = time.monotonic() - created_at
+        return self.recycle_seconds <= 0 or age < self.recycle_seconds
+
+    def _discard_locked(self, conn, recycled: bool = False) -> None:
+        # recycled counts connections dropped for age or health only, not
+        # explicit discards or pool shutdown.
+        self._created_at.pop(id(conn), None)
+        self._size -= 1
+        if recycled:
+            self._recycled += 1
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def init_pool(connect: Callable = _connect, **kwargs) -> ConnectionPool:
+    """Replaces the module-level pool, draining any existing one.
+    Accepts a custom connect factory so a fake connector can be swapped in."""
+    global _pool, _async_capable
+    _async_capable = None
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(connect, **kwargs)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def get_pool() -> ConnectionPool:
+    """Returns the module-level pool, creating it lazily on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_connection():
+    """Context manager that borrows a pooled connection and returns it on exit."""
+    return get_pool().connection()
+
+
+def open_pool(size: int | None = None) -> None:
+    """Pre-opens pooled connections ahead of the first request."""
+    get_pool().open(size)
+
+
+def pool_stats() -> dict:
+    """Returns the current pool statistics."""
+    return get_pool().stats()
+
+
+def _rows_as_dicts(cursor) -> list[dict]:
+    if cursor.description is None:
+        return []
+    columns = [col[0].lower() for col in cursor.description]
+    rows = cursor.fetchall()
+    return [dict(zip(columns, row)) for row in rows]
+
 
+def _arrow_columns(names: list[str], table) -> dict[str, list]:
+    if table is None:  # empty result
+        return {name: [] for name in names}
+    columns = {}
+    for name, column in zip(names, table.columns):
+        if pyarrow.types.is_decimal(column.type):
+            column = column.cast(pyarrow.float64())
+        columns[name] = column.to_pylist()
+    return columns
 
-def get_connection() -> snowflake.connector.SnowflakeConnection:
-    """Returns a module-level singleton Snowflake connection.
-    Lazily initializes on first call. Reconnects if closed."""
-    global _connection
-    if _connection is None or _connection.is_closed():
-        _connection = snowflake.connector.connect(
-            account=os.environ["SNOWFLAKE_ACCOUNT"],
-            user=os.environ["SNOWFLAKE_USER"],
-            password=os.environ["SNOWFLAKE_PASSWORD"],
-            database=os.environ.get("SNOWFLAKE_DATABASE", "SENTIMENT_TRACKER"),
-            schema=os.environ.get("SNOWFLAKE_SCHEMA", "MAIN"),
-            warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE", "SENTIMENT_WH"),
-            role=os.environ.get("SNOWFLAKE_ROLE"),
-        )
-    return _connection
+
+def _columns(cursor) -> dict[str, list]:
+    """Result as {column: values}. Reads the connector's Arrow batches when
+    pyarrow is installed (fixed-point NUMBERs come back as floats); otherwise
+    transposes fetchall(), which is what stand-in cursors go through."""
+    if cursor.description is None:
+        return {}
+    names = [col[0].lower() for col in cursor.description]
+
+    if pyarrow is not None and hasattr(cursor, "fetch_arrow_all"):
+        from snowflake.connector.errors import NotSupportedError
+
+        try:
+            return _arrow_columns(names, cursor.fetch_arrow_all())
+        except NotSupportedError:  # JSON result format, e.g. SHOW commands
+            pass
+
+    rows = cursor.fetchall()
+    values = zip(*rows) if rows else [()] * len(names)
+    return {name: list(column) for name, column in zip(names, values)}
+
+
+def _first_value(cursor):
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _rowcount(cursor) -> int:
+    return cursor.rowcount
+
+
+@contextmanager
+def _timed_connection(timer: QueryTimer):
+    """get_connection that adds the checkout wait to timer.pool_wait."""
+    started = time.monotonic()
+    with get_connection() as conn:
+        timer.pool_wait += time.monotonic() - started
+        yield conn
+
+
+def _run(sql: str, params: tuple, handler: Callable):
+    with QueryTimer(sql) as timer, _timed_connection(timer) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            timer.query_id = getattr(cursor, "sfqid", None)
+            result = handler(cursor)
+            timer.rows = cursor.rowcount or 0
+            return result
+        finally:
+            cursor.close()
 
 
 def execute_query(sql: str, params: tuple = None) -> list[dict]:
     """Executes a parameterized query and returns results as a list of dicts."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(sql, params)
-        if cursor.description is None:
-            return []
-        columns = [col[0].lower() for col in cursor.description]
-        rows = cursor.fetchall()
-        return [dict(zip(columns, row)) for row in rows]
-    finally:
-        cursor.close()
+    return _run(sql, params, _rows_as_dicts)
+
+
+def execute_columnar(sql: str, params: tuple = None) -> dict[str, list]:
+    """Executes a query and returns results column-wise as {column: values}."""
+    return _run(sql, params, _columns)
 
 
 def execute_scalar(sql: str, params: tuple = None):
     """Executes a query and returns the first column of the first row."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(sql, params)
-        row = cursor.fetchone()
-        return row[0] if row else None
-    finally:
-        cursor.close()
+    return _run(sql, params, _first_value)
 
 
 def execute_dml(sql: str, params: tuple = None) -> int:
     """Executes an INSERT/UPDATE/DELETE and returns the rowcount."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(sql, params)
-        return cursor.rowcount
-    finally:
-        cursor.close()
+    return _run(sql, params, _rowcount)
+
+
+def iter_query(sql: str, params: tuple = None, batch_size: int = 1000):
+    """Executes a query and yields its rows batch_size at a time, each batch
+    column-wise as {column: values}, so a large result is never materialized
+    at once. The pooled connection is held until the generator is exhausted
+    or closed."""
+    pool = get_pool()
+    with QueryTimer(sql) as timer:
+        started = time.monotonic()
+        conn = pool.acquire()
+        timer.pool_wait += time.monotonic() - started
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                timer.query_id = getattr(cursor, "sfqid", None)
+                if cursor.description is None:
+                    return
+                names = [col[0].lower() for col in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    timer.rows += len(rows)
+                    yield {name: list(column) for name, column in zip(names, zip(*rows))}
+            finally:
+                cursor.close()
+        finally:
+            # Also reached when the generator is closed part-way, e.g. a
+            # streaming client disconnecting mid-result.
+            pool.release(conn, discard=conn.is_closed())
+
+
+# --- Async API ---
+#
+# Queries are submitted with the connector's execute_async and polled with
+# get_query_status, so a pooled connection is only borrowed for the short
+# submit/poll/fetch calls and never held for the full warehouse round trip.
+# Those calls still block, so each runs on a worker thread; the wait between
+# polls is an asyncio.sleep that holds neither a thread nor a connection.
+
+
+def _submit(sql: str, params: tuple, timer: QueryTimer) -> str:
+    with _timed_connection(timer) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute_async(sql, params)
+            return cursor.sfqid
+        finally:
+            cursor.close()
+
+
+def _still_running(query_id: str, timer: QueryTimer) -> bool:
+    with _timed_connection(timer) as conn:
+        status = conn.get_query_status_throw_if_error(query_id)
+        return conn.is_still_running(status)
+
+
+def _fetch(query_id: str, handler: Callable, timer: QueryTimer):
+    with _timed_connection(timer) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.get_results_from_sfqid(query_id)
+            result = handler(cursor)
+            timer.rows = cursor.rowcount or 0
+            return result
+        finally:
+            cursor.close()
+
+
+def _supports_async() -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            return hasattr(cursor, "execute_async")
+        finally:
+            cursor.close()
+
+
+_async_capable: bool | None = None
+
+
+async def _run_async(sql: str, params: tuple, handler: Callable):
+    global _async_capable
+    if _async_capable is None:
+        _async_capable = await asyncio.to_thread(_supports_async)
+    if not _async_capable:
+        # Stand-in connectors without execute_async run the query on a thread.
+        return await asyncio.to_thread(_run, sql, params, handler)
+
+    with QueryTimer(sql) as timer:
+        query_id = timer.query_id = await asyncio.to_thread(_submit, sql, params, timer)
+        delay = ASYNC_POLL_INITIAL_SECONDS
+        while await asyncio.to_thread(_still_running, query_id, timer):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, ASYNC_POLL_MAX_SECONDS)
+        return await asyncio.to_thread(_fetch, query_id, handler, timer)
+
+
+async def execute_query_async(sql: str, params: tuple = None) -> list[dict]:
+    """Async execute_query: submits with execute_async and polls until done."""
+    return await _run_async(sql, params, _rows_as_dicts)
+
+
+async def execute_columnar_async(sql: str, params: tuple = None) -> dict[str, list]:
+    """Async execute_columnar: submits with execute_async and polls until done."""
+    return await _run_async(sql, params, _columns)
+
+
+async def execute_scalar_async(sql: str, params: tuple = None):
+    """Async execute_scalar: submits with execute_async and polls until done."""
+    return await _run_async(sql, params, _first_value)
+
+
+async def execute_dml_async(sql: str, params: tuple = None) -> int:
+    """Async execute_dml: submits with execute_async and polls until done."""
+    return await _run_async(sql, params, _rowcount)
 
 
 def close_connection():
-    """Cleanly close the Snowflake connection on app shutdown."""
-    global _connection
-    if _connection and not _connection.is_closed():
-        _connection.close()
-        _connection = None
+    """Drains the connection pool on app shutdown."""
+    global _pool, _async_capable
+    _async_capable = None
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
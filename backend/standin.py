@@ -0,0 +1,402 @@
+import itertools
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+import duckdb
+
+# Local Snowflake stand-in for benchmarks: a DuckDB database seeded with
+# synthetic data, behind connection/cursor objects that implement the parts
+# of snowflake.connector the backend uses (execute, execute_async polling,
+# get_results_from_sfqid, fetch*). Install with snowflake_client.init_pool:
+#
+#     engine = StandinEngine(open_database(rows=200_000), latency=0.05)
+#     init_pool(engine.connect)
+#
+# CORTEX.COMPLETE and CORTEX.SENTIMENT are deterministic SQL macros, so the
+# same inputs always produce the same scores and bullets.
+
+STANDIN_LATENCY_SECONDS = float(os.environ.get("STANDIN_LATENCY_SECONDS", "0.05"))
+STANDIN_CORTEX_LATENCY_SECONDS = float(os.environ.get("STANDIN_CORTEX_LATENCY_SECONDS", "1.5"))
+# Cold-start model, off by default: opening a connection costs
+# STANDIN_CONNECT_SECONDS, and the first query after the warehouse has been
+# idle for STANDIN_AUTO_SUSPEND_SECONDS waits STANDIN_RESUME_SECONDS for it.
+STANDIN_CONNECT_SECONDS = float(os.environ.get("STANDIN_CONNECT_SECONDS", "0"))
+STANDIN_RESUME_SECONDS = float(os.environ.get("STANDIN_RESUME_SECONDS", "0"))
+STANDIN_AUTO_SUSPEND_SECONDS = float(os.environ.get("STANDIN_AUTO_SUSPEND_SECONDS", "120"))
+
+# Sentiment140 covers 2009-04-06 .. 2009-06-25.
+SEED_START = "2009-04-06"
+SEED_DAYS = 81
+SEED_LOADED_AT = "2009-06-26 00:00:00"
+SEED_USERS = 50_000
+VOCABULARY = (
+    "i im my you the a to and is it in for of on at so just not this that "
+    "love hate happy sad good bad great tired sick thanks lol omg wow ugh "
+    "work school home sleep exam today tomorrow tonight morning night weekend "
+    "movie music twitter iphone ipod google facebook lakers rain sun coffee "
+    "birthday friends party miss wish hope really going want need got new"
+).split()
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS RAW_MENTIONS (
+        tweet_id VARCHAR, "USER" VARCHAR, created_at TIMESTAMP, text VARCHAR,
+        source_label VARCHAR, loaded_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS SCORED_MENTIONS (
+        tweet_id VARCHAR, "USER" VARCHAR, created_at TIMESTAMP, text VARCHAR,
+        source_label VARCHAR, loaded_at TIMESTAMP, sentiment_score DOUBLE,
+        sentiment_label VARCHAR
+    );
+    CREATE TABLE IF NOT EXISTS WHY_LAYER_CACHE (
+        cache_key VARCHAR PRIMARY KEY, sentiment_type VARCHAR,
+        bullet_summary VARCHAR, tweet_sample VARCHAR, content_key VARCHAR,
+        generated_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS DAILY_SENTIMENT_ROLLUP (
+        day DATE, sentiment_label VARCHAR, bucket_start DOUBLE,
+        tweet_count BIGINT, score_sum DOUBLE, score_count BIGINT
+    );
+    CREATE TABLE IF NOT EXISTS MENTION_TOKENS (
+        token VARCHAR, tweet_id VARCHAR, created_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS WHY_REQUEST_LOG (
+        cache_key VARCHAR, start_date VARCHAR, end_date VARCHAR, keyword VARCHAR,
+        sentiment_type VARCHAR, requested_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS WHY_CONTENT_CACHE (
+        content_key VARCHAR PRIMARY KEY, model VARCHAR, prompt_version VARCHAR,
+        bullet_summary VARCHAR, tweet_sample VARCHAR, generated_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS SCORING_CHECKPOINT (
+        job VARCHAR PRIMARY KEY, watermark_loaded_at TIMESTAMP,
+        watermark_tweet_id VARCHAR, rows_scored BIGINT DEFAULT 0,
+        updated_at TIMESTAMP
+    );
+"""
+
+# Word-count polarity plus hash jitter, clamped to [-1, 1] like SENTIMENT.
+# Bullets reuse the prompt hash so a repeated prompt gives the same answer.
+CORTEX_MACROS_SQL = r"""
+    CREATE OR REPLACE MACRO cortex_sentiment(t) AS greatest(-1.0, least(1.0,
+        (len(regexp_extract_all(lower(t), '\b(love|happy|good|great|thanks|wow|hope)\b'))
+         - len(regexp_extract_all(lower(t), '\b(hate|sad|bad|tired|sick|ugh|miss)\b'))) * 0.35
+        + ((hash(t) % 1001) / 1000.0 - 0.5) * 0.6
+    ));
+    CREATE OR REPLACE MACRO cortex_complete(model, prompt) AS
+        '• [~' || (30 + hash(prompt) % 25) || '%] Recurring theme A in the sampled tweets' || chr(10)
+        || '• [~' || (15 + hash(prompt, 1) % 15) || '%] Recurring theme B in the sampled tweets' || chr(10)
+        || '• [~' || (5 + hash(prompt, 2) % 10) || '%] Recurring theme C in the sampled tweets';
+"""
+
+SEED_SQL = """
+    INSERT INTO SCORED_MENTIONS
+    WITH raw AS (
+        SELECT
+            CAST(1467810000 + i AS VARCHAR) AS tweet_id,
+            'user' || CAST(hash(i, 1) % {users} AS VARCHAR) AS "USER",
+            TIMESTAMP '{start}' + to_seconds(CAST(hash(i, 2) % {seconds} AS BIGINT)) AS created_at,
+            array_to_string(
+                list_transform(
+                    range(CAST(4 + hash(i, 3) % 12 AS BIGINT)),
+                    lambda w: $words[1 + CAST(hash(i, 4, w) % {vocabulary} AS BIGINT)]
+                ),
+                ' '
+            ) AS text,
+            IF(hash(i, 5) % 2 = 0, 'NEGATIVE', 'POSITIVE') AS source_label
+        FROM range({rows}) r(i)
+    ), scored AS (
+        SELECT *, cortex_sentiment(text) AS sentiment_score FROM raw
+    )
+    SELECT
+        tweet_id, "USER", created_at, text, source_label,
+        TIMESTAMP '{loaded_at}', sentiment_score,
+        CASE
+            WHEN sentiment_score >= 0.2 THEN 'POSITIVE'
+            WHEN sentiment_score <= -0.2 THEN 'NEGATIVE'
+            ELSE 'NEUTRAL'
+        END
+    FROM scored
+"""
+
+# Same shape as REFRESH_DAILY_ROLLUP and BUILD_MENTION_TOKENS in tasks.sql.
+DERIVED_SQL = """
+    DELETE FROM DAILY_SENTIMENT_ROLLUP;
+    INSERT INTO DAILY_SENTIMENT_ROLLUP
+    SELECT
+        CAST(created_at AS DATE), sentiment_label,
+        FLOOR(sentiment_score * 5) / 5, COUNT(*),
+        COALESCE(SUM(sentiment_score), 0), COUNT(sentiment_score)
+    FROM SCORED_MENTIONS
+    GROUP BY 1, 2, 3;
+    DELETE FROM MENTION_TOKENS;
+    INSERT INTO MENTION_TOKENS
+    SELECT DISTINCT token, tweet_id, created_at
+    FROM (
+        SELECT
+            unnest(string_split(
+                regexp_replace(lower(text), '[^a-z0-9_#@'']+', ' ', 'g'), ' '
+            )) AS token,
+            tweet_id,
+            created_at
+        FROM SCORED_MENTIONS
+    )
+    WHERE token <> '';
+"""
+
+
+def seed(db: duckdb.DuckDBPyConnection, rows: int) -> None:
+    """Replaces SCORED_MENTIONS with `rows` synthetic tweets and rebuilds
+    the rollup and token index from them. Deterministic for a given rows."""
+    db.execute("DELETE FROM SCORED_MENTIONS")
+    db.execute(
+        SEED_SQL.format(
+            rows=int(rows),
+            users=SEED_USERS,
+            start=SEED_START,
+            seconds=SEED_DAYS * 86400,
+            vocabulary=len(VOCABULARY),
+            loaded_at=SEED_LOADED_AT,
+        ),
+        {"words": VOCABULARY},
+    )
+    db.execute(DERIVED_SQL)
+
+
+def open_database(path: str = ":memory:", rows: int = 50_000) -> duckdb.DuckDBPyConnection:
+    """Opens (or creates) a stand-in database holding exactly `rows` scored
+    mentions, seeding only when the existing row count differs."""
+    db = duckdb.connect(path)
+    db.execute(SCHEMA_SQL)
+    db.execute(CORTEX_MACROS_SQL)
+    existing = db.execute("SELECT COUNT(*) FROM SCORED_MENTIONS").fetchone()[0]
+    if existing != rows:
+        seed(db, rows)
+    return db
+
+
+# --- Dialect translation ---
+
+_TO_CHAR_FORMATS = {
+    "YYYY-MM-DD": "%Y-%m-%d",
+    "YYYY-MM-DD HH24:MI:SS": "%Y-%m-%d %H:%M:%S",
+    "YYYY-MM-DD HH24:MI": "%Y-%m-%d %H:%M",
+    "YYYY-MM": "%Y-%m",
+    # DuckDB timestamps are microsecond precision.
+    "YYYY-MM-DD HH24:MI:SS.FF9": "%Y-%m-%d %H:%M:%S.%f",
+}
+_DATEADD_UNITS = {"second": "to_seconds", "minute": "to_minutes", "hour": "to_hours", "day": "to_days"}
+_ARG = r"((?:[^(),]|\((?:[^()]|\([^()]*\))*\))+)"
+_TO_CHAR = re.compile(r"TO_CHAR\(" + _ARG + r",\s*'([^']+)'\)")
+_DATEADD = re.compile(r"DATEADD\('(\w+)',\s*" + _ARG + r",\s*" + _ARG + r"\)")
+_DATE_CALL = re.compile(r"\bDATE\(" + _ARG + r"\)")
+_SAMPLE = re.compile(r"SAMPLE (BERNOULLI|SYSTEM) \(([\d.]+)\) SEED \((\d+)\)")
+_DML = re.compile(r"^\s*(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+
+def _to_char(match: re.Match) -> str:
+    expr, fmt = match.groups()
+    return f"strftime({expr}, '{_TO_CHAR_FORMATS[fmt]}')"
+
+
+def _dateadd(match: re.Match) -> str:
+    unit, amount, expr = match.groups()
+    return f"({expr} + {_DATEADD_UNITS[unit.lower()]}({amount}))"
+
+
+@lru_cache(maxsize=1024)
+def translate(sql: str) -> str:
+    """Rewrites the Snowflake SQL used by the backend into DuckDB SQL."""
+    sql = sql.replace("%s", "?")
+    sql = sql.replace("CURRENT_TIMESTAMP()", "CAST(now() AS TIMESTAMP)")
+    sql = sql.replace("::TIMESTAMP_NTZ", "::TIMESTAMP")
+    sql = sql.replace("SNOWFLAKE.CORTEX.COMPLETE(", "cortex_complete(")
+    sql = sql.replace("SNOWFLAKE.CORTEX.SENTIMENT(", "cortex_sentiment(")
+    sql = re.sub(r"\bIFF\(", "IF(", sql)
+    sql = re.sub(r"\bDATEDIFF\(", "date_diff(", sql)
+    sql = _DATEADD.sub(_dateadd, sql)
+    sql = _TO_CHAR.sub(_to_char, sql)
+    sql = _DATE_CALL.sub(r"CAST(\1 AS DATE)", sql)
+    sql = _SAMPLE.sub(r"TABLESAMPLE \1(\2%) REPEATABLE (\3)", sql)
+    return sql
+
+
+# --- Connector surface ---
+
+
+class _Result:
+    def __init__(self, description, rows: list, rowcount: int):
+        self.description = description
+        self.rows = rows
+        self.rowcount = rowcount
+
+
+class StandinEngine:
+    """Shared state behind every stand-in connection: the database, the
+    injected latencies and results of queries submitted with execute_async."""
+
+    def __init__(
+        self,
+        db: duckdb.DuckDBPyConnection,
+        latency: float = STANDIN_LATENCY_SECONDS,
+        cortex_latency: float = STANDIN_CORTEX_LATENCY_SECONDS,
+        connect_latency: float = STANDIN_CONNECT_SECONDS,
+        resume_latency: float = STANDIN_RESUME_SECONDS,
+        auto_suspend: float = STANDIN_AUTO_SUSPEND_SECONDS,
+    ):
+        self.db = db
+        self.latency = latency
+        self.cortex_latency = cortex_latency
+        self.connect_latency = connect_latency
+        self.resume_latency = resume_latency
+        self.auto_suspend = auto_suspend
+        self._lock = threading.Lock()
+        # The warehouse starts suspended; _resumed_at is when the current
+        # resume completes and _suspends_at when it next auto-suspends.
+        self._resumed_at = 0.0
+        self._suspends_at = 0.0
+        self.resumes = 0
+        self._ids = itertools.count(1)
+        # query id -> (ready_at, _Result | None, exception | None)
+        self._queries: dict[str, tuple] = {}
+        self.queries_run = 0
+
+    def connect(self) -> "StandinConnection":
+        """Connection factory for snowflake_client.init_pool."""
+        time.sleep(self.connect_latency)
+        return StandinConnection(self)
+
+    def latency_for(self, sql: str) -> float:
+        latency = self.latency + self._warehouse_wait()
+        if "cortex_complete(" in sql:
+            return latency + self.cortex_latency
+        return latency
+
+    def _warehouse_wait(self) -> float:
+        """Time a query starting now waits for the warehouse to resume."""
+        if self.resume_latency <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._suspends_at:
+                self._resumed_at = now + self.resume_latency
+                self.resumes += 1
+            wait = max(self._resumed_at - now, 0.0)
+            self._suspends_at = now + wait + self.auto_suspend
+            return wait
+
+    def run(self, db: duckdb.DuckDBPyConnection, sql: str, params) -> _Result:
+        translated = translate(sql)
+        result = db.execute(translated, list(params or []))
+        with self._lock:
+            self.queries_run += 1
+        if _DML.match(translated):
+            return _Result(None, [], int(result.fetchone()[0]))
+        rows = result.fetchall() if result.description else []
+        return _Result(result.description, rows, len(rows))
+
+    def submit(self, db: duckdb.DuckDBPyConnection, sql: str, params) -> str:
+        query_id = f"standin-{next(self._ids):08d}"
+        ready_at = time.monotonic() + self.latency_for(translate(sql))
+        try:
+            entry = (ready_at, self.run(db, sql, params), None)
+        except Exception as e:
+            entry = (ready_at, None, e)
+        with self._lock:
+            self._queries[query_id] = entry
+        return query_id
+
+    def still_running(self, query_id: str) -> bool:
+        """Raises the query's error once it has 'finished', like
+        get_query_status_throw_if_error."""
+        with self._lock:
+            ready_at, _, error = self._queries[query_id]
+        if time.monotonic() < ready_at:
+            return True
+        if error is not None:
+            with self._lock:
+                self._queries.pop(query_id, None)
+            raise error
+        return False
+
+    def take_result(self, query_id: str) -> _Result:
+        with self._lock:
+            _, result, error = self._queries.pop(query_id)
+        if error is not None:
+            raise error
+        return result
+
+
+class StandinCursor:
+    def __init__(self, engine: StandinEngine, db: duckdb.DuckDBPyConnection):
+        self._engine = engine
+        self._db = db
+        self._rows: list = []
+        self._position = 0
+        self.description = None
+        self.rowcount = -1
+        self.sfqid: str | None = None
+
+    def _load(self, result: _Result) -> None:
+        self.description = result.description
+        self._rows = result.rows
+        self._position = 0
+        self.rowcount = result.rowcount
+
+    def execute(self, sql: str, params=None) -> "StandinCursor":
+        time.sleep(self._engine.latency_for(translate(sql)))
+        self.sfqid = f"standin-sync-{next(self._engine._ids):08d}"
+        self._load(self._engine.run(self._db, sql, params))
+        return self
+
+    def execute_async(self, sql: str, params=None) -> None:
+        self.sfqid = self._engine.submit(self._db, sql, params)
+
+    def get_results_from_sfqid(self, query_id: str) -> None:
+        self.sfqid = query_id
+        self._load(self._engine.take_result(query_id))
+
+    def fetchall(self) -> list:
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def fetchmany(self, size: int) -> list:
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self) -> None:
+        self._rows = []
+
+
+class StandinConnection:
+    def __init__(self, engine: StandinEngine):
+        self._engine = engine
+        # DuckDB cursors are independent connections to the same database,
+        # safe to use from the pool's worker threads.
+        self._db = engine.db.cursor()
+        self._closed = False
+
+    def cursor(self) -> StandinCursor:
+        return StandinCursor(self._engine, self._db)
+
+    def get_query_status_throw_if_error(self, query_id: str) -> bool:
+        return self._engine.still_running(query_id)
+
+    def is_still_running(self, status: bool) -> bool:
+        return status
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._db.close()
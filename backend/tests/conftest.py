@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STANDIN_ROWS = 20_000
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """A DuckDB stand-in for Snowflake with no injected latency, installed
+    as the module-level connection pool, with empty result caches."""
+    import cache
+    import result_cache
+    from snowflake_client import init_pool
+    from standin import StandinEngine, open_database
+
+    monkeypatch.setattr(result_cache, "_cache", result_cache.ResultCache())
+    monkeypatch.setattr(result_cache, "_watermark_value", None)
+    monkeypatch.setattr(result_cache, "_watermark_async_lock", None)
+    monkeypatch.setattr(cache, "_memory", result_cache.ResultCache())
+    monkeypatch.setattr(cache, "_content_memory", result_cache.ResultCache())
+
+    engine = StandinEngine(
+        open_database(":memory:", STANDIN_ROWS),
+        latency=0,
+        cortex_latency=0,
+        connect_latency=0,
+        resume_latency=0,
+    )
+    pool = init_pool(engine.connect)
+    yield engine
+    pool.close()
+    engine.db.close()
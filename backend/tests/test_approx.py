@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+
+import main
+
+RANGE = {"start_date": "2009-04-06", "end_date": "2009-06-27"}
+# Estimates are rounded to these steps before they are compared.
+ROUNDING = {"total_tweets": 1, "avg_score": 0.0001}
+
+
+def fetch(path: str, **params) -> dict:
+    async def run() -> dict:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"/api/{path}", params=dict(RANGE, **params))
+            response.raise_for_status()
+            return response.json()
+
+    return asyncio.run(run())
+
+
+def test_exact_values_fall_inside_approx_margins(standin, monkeypatch):
+    monkeypatch.setattr(main, "USE_DAILY_ROLLUP", False)
+    monkeypatch.setattr(main, "APPROX_SAMPLE_ROWS", 4000)
+
+    summary = fetch("summary", approx="true")
+    exact = fetch("summary", approx="false")
+    assert summary["approx"]["sample_rows"] > 0
+    assert "approx" not in exact
+    for field in ("total_tweets", "avg_score", "pct_positive", "pct_negative", "pct_neutral"):
+        margin = summary["approx"][f"{field}_margin"] + ROUNDING.get(field, 0.01)
+        assert abs(summary[field] - exact[field]) <= margin, field
+
+    distribution = fetch("distribution", approx="true")
+    exact_buckets = fetch("distribution", approx="false")["buckets"]
+    assert [b["range"] for b in distribution["buckets"]] == [b["range"] for b in exact_buckets]
+    for bucket, exact_bucket, margin in zip(
+        distribution["buckets"], exact_buckets, distribution["approx"]["count_margins"]
+    ):
+        assert abs(bucket["count"] - exact_bucket["count"]) <= margin + 1, bucket["range"]
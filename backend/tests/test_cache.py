@@ -0,0 +1,47 @@
+import time
+
+import cache
+
+
+def memory_ttl(memory, key: str) -> float:
+    return memory._entries[key][1] - time.monotonic()
+
+
+def test_content_entries_use_their_own_memory_tier(standin):
+    cache.write_content_cache("abc", "model", "v1", "• [~100%] Theme", "prompt")
+    assert cache.read_content_cache("abc")["bullet_summary"] == "• [~100%] Theme"
+
+    assert cache._content_memory.stats()["entries"] == 1
+    assert cache._content_memory.stats()["hits"] == 1
+    assert cache._memory.stats()["entries"] == 0
+    assert cache.why_cache_stats()["content"]["memory"]["hits"] == 1
+
+
+def test_content_memory_ttl_ends_with_the_snowflake_row(standin):
+    ttl_hours = cache.WHY_CONTENT_CACHE_TTL_HOURS
+    standin.db.execute(
+        "INSERT INTO WHY_CONTENT_CACHE VALUES "
+        "('old', 'model', 'v1', 'bullets', 'prompt', "
+        f"CAST(now() AS TIMESTAMP) - INTERVAL {ttl_hours - 1} HOUR)"
+    )
+    assert cache.read_content_cache("old") is not None
+    assert 3500 < memory_ttl(cache._content_memory, "old") <= 3600
+
+    cache.write_content_cache("new", "model", "v1", "bullets", "prompt")
+    assert memory_ttl(cache._content_memory, "new") > (ttl_hours - 1) * 3600
+
+
+def test_write_is_one_merge_and_memory_never_outlives_the_row(standin, monkeypatch):
+    def no_read_back(*args):
+        raise AssertionError("write_cache read the row back")
+
+    monkeypatch.setattr(cache, "execute_query", no_read_back)
+    cache.write_cache("key", "NEGATIVE", "bullets", "prompt", "abc")
+    hit, entry = cache._memory.get("key")
+    assert hit and entry["bullet_summary"] == "bullets"
+
+    row_ttl = standin.db.execute(
+        "SELECT date_diff('second', CAST(now() AS TIMESTAMP), "
+        "generated_at + INTERVAL 24 HOUR) FROM WHY_LAYER_CACHE WHERE cache_key = 'key'"
+    ).fetchone()[0]
+    assert 0 < memory_ttl(cache._memory, "key") <= row_ttl + 1
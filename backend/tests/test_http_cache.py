@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+
+import main
+
+ORIGIN = "http://localhost:3000"
+RANGE = {"start_date": "2009-04-06", "end_date": "2009-06-27"}
+
+
+def test_cross_origin_revalidation_gets_304_with_cors_headers(standin):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get(
+                "/api/summary", params=RANGE,
+                headers={"Origin": ORIGIN, "Accept-Encoding": "gzip"},
+            )
+            again = await client.get(
+                "/api/summary", params=RANGE,
+                headers={"Origin": ORIGIN, "If-None-Match": first.headers["etag"]},
+            )
+            return first, again
+
+    first, again = asyncio.run(run())
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('W/"')
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+    for response in (first, again):
+        assert response.headers["access-control-allow-origin"] == ORIGIN
+        assert "Accept-Encoding" in response.headers["vary"]
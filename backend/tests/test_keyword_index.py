@@ -0,0 +1,26 @@
+import cache
+import keyword_index
+from keyword_index import keyword_condition
+
+
+def test_whole_word_and_prefix_match_through_token_index():
+    condition, params = keyword_condition("Love", "2009-05-01", "2009-05-02")
+    assert "MENTION_TOKENS WHERE token = %s" in condition
+    assert params == ["love", "2009-05-01", "2009-05-02"]
+
+    condition, params = keyword_condition("lov*", "2009-05-01", "2009-05-02")
+    assert "token LIKE %s" in condition
+    assert params[0] == "lov%"
+
+
+def test_substring_fallback_drops_trailing_star(monkeypatch):
+    assert keyword_condition("c++", "a", "b") == ("LOWER(text) LIKE %s", ["%c++%"])
+
+    monkeypatch.setattr(keyword_index, "USE_TOKEN_INDEX", False)
+    assert keyword_condition("lov*", "a", "b") == ("LOWER(text) LIKE %s", ["%lov%"])
+
+
+def test_why_cache_key_is_namespaced_by_version(monkeypatch):
+    key = cache.compute_cache_key("2009-05-01", "2009-05-02", "love", "NEGATIVE")
+    monkeypatch.setattr(cache, "WHY_CACHE_KEY_VERSION", "v1")
+    assert cache.compute_cache_key("2009-05-01", "2009-05-02", "love", "NEGATIVE") != key
@@ -0,0 +1,19 @@
+import cache
+import prewarm
+from cortex import resolve_content_key
+
+
+def test_dry_run_reports_content_cache_hits_apart_from_cortex_calls(standin):
+    negative, positive = prewarm.default_targets()
+    content_key = resolve_content_key(
+        negative.sentiment_type, negative.start_date, negative.end_date, negative.keyword
+    )
+    cache.write_content_cache(content_key, "model", "v1", "bullets", "prompt")
+
+    report = prewarm.run(top=0, dry_run=True)
+
+    assert report["pending"] == 2
+    assert report["content_hits"] == 1
+    assert report["cortex_calls"] == 1
+    assert report["warmed"] == report["failed"] == 0
+    assert cache.read_cache(negative.cache_key) is None
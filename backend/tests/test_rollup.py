@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+RANGES = [
+    ("2009-04-06", "2009-06-27"),
+    ("2009-05-01", "2009-05-02"),
+    ("2009-05-10", "2009-06-10"),
+]
+
+
+def fetch_aggregates(start_date: str, end_date: str, sentiment_filter: str | None) -> dict:
+    dates = {"start_date": start_date, "end_date": end_date}
+    filtered = dict(dates, sentiment_filter=sentiment_filter) if sentiment_filter else dates
+    queries = {
+        "summary": filtered,
+        "trend": dict(filtered, granularity="day"),
+        "distribution": dates,
+    }
+
+    async def run() -> dict:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            results = {}
+            for path, params in queries.items():
+                response = await client.get(f"/api/{path}", params=params)
+                response.raise_for_status()
+                results[path] = response.json()
+            return results
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("start_date,end_date", RANGES)
+@pytest.mark.parametrize("sentiment_filter", [None, "NEGATIVE,NEUTRAL"])
+def test_rollup_matches_scored_mentions(standin, monkeypatch, start_date, end_date, sentiment_filter):
+    assert main.can_use_rollup(start_date, end_date, None)
+    rollup = fetch_aggregates(start_date, end_date, sentiment_filter)
+
+    monkeypatch.setattr(main, "USE_DAILY_ROLLUP", False)
+    assert not main.can_use_rollup(start_date, end_date, None)
+    raw = fetch_aggregates(start_date, end_date, sentiment_filter)
+
+    assert rollup["summary"]["total_tweets"] > 0
+    assert rollup["summary"]["total_tweets"] == raw["summary"]["total_tweets"]
+    for field in ("avg_score", "pct_positive", "pct_negative", "pct_neutral"):
+        assert rollup["summary"][field] == pytest.approx(raw["summary"][field], abs=1e-9)
+    assert rollup["trend"] == raw["trend"]
+    assert rollup["distribution"] == raw["distribution"]
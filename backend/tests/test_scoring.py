@@ -0,0 +1,58 @@
+import pytest
+
+import scoring
+
+RAW_ROWS = 1000
+
+
+def load_raw_mentions(db) -> None:
+    """Moves RAW_ROWS seeded tweets back to RAW_MENTIONS, unscored, in two
+    loads so the (loaded_at, tweet_id) keyset has ties on loaded_at."""
+    db.execute(f"""
+        INSERT INTO RAW_MENTIONS
+        SELECT tweet_id, "USER", created_at, text, source_label,
+               IF(row_number() OVER (ORDER BY tweet_id) <= {RAW_ROWS // 2},
+                  TIMESTAMP '2009-06-26 00:00:00', TIMESTAMP '2009-06-27 00:00:00')
+        FROM SCORED_MENTIONS
+        ORDER BY tweet_id
+        LIMIT {RAW_ROWS}
+    """)
+    db.execute("DELETE FROM SCORED_MENTIONS")
+
+
+def scored_ids(db) -> list[str]:
+    return [row[0] for row in db.execute("SELECT tweet_id FROM SCORED_MENTIONS").fetchall()]
+
+
+def test_interrupted_run_resumes_without_duplicates_or_gaps(standin, monkeypatch):
+    load_raw_mentions(standin.db)
+
+    # Crash on the 4th checkpoint: that batch is inserted but not recorded,
+    # so the resumed run replays it.
+    write_checkpoint = scoring.write_checkpoint
+    checkpoints = 0
+
+    def crash_on_fourth(watermark, rows_scored):
+        nonlocal checkpoints
+        checkpoints += 1
+        if checkpoints == 4:
+            raise RuntimeError("interrupted")
+        write_checkpoint(watermark, rows_scored)
+
+    monkeypatch.setattr(scoring, "write_checkpoint", crash_on_fourth)
+    with pytest.raises(RuntimeError, match="interrupted"):
+        scoring.run(batch_size=150)
+    assert len(scored_ids(standin.db)) == 4 * 150
+    monkeypatch.setattr(scoring, "write_checkpoint", write_checkpoint)
+
+    resumed = scoring.run(batch_size=150)
+    assert resumed["rows_scored"] == RAW_ROWS - 4 * 150
+
+    ids = scored_ids(standin.db)
+    raw_ids = [row[0] for row in standin.db.execute("SELECT tweet_id FROM RAW_MENTIONS").fetchall()]
+    assert len(ids) == len(set(ids)) == RAW_ROWS
+    assert set(ids) == set(raw_ids)
+
+    again = scoring.run(batch_size=150)
+    assert (again["batches"], again["rows_scored"]) == (0, 0)
+    assert len(scored_ids(standin.db)) == RAW_ROWS
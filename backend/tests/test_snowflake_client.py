@@ -0,0 +1,166 @@
+import decimal
+import threading
+import time
+
+import pyarrow
+from snowflake.connector.errors import NotSupportedError
+
+import snowflake_client
+from snowflake_client import ConnectionPool, init_pool, iter_query
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+        self.description = None
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.description = [("N",)]
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows=()):
+        self.rows = rows
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_concurrent_acquire_release():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=3, timeout=5)
+    lock = threading.Lock()
+    in_use = set()
+    peak = 0
+    errors = []
+
+    def worker():
+        nonlocal peak
+        for _ in range(200):
+            conn = pool.acquire()
+            with lock:
+                if id(conn) in in_use:
+                    errors.append("connection checked out twice")
+                in_use.add(id(conn))
+                peak = max(peak, len(in_use))
+            time.sleep(0)
+            with lock:
+                in_use.discard(id(conn))
+            pool.release(conn)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert errors == []
+    assert peak <= 3
+    assert stats["checkouts"] == 1600
+    assert stats["in_use"] == 0
+    assert stats["size"] == stats["idle"] <= 3
+    assert stats["created"] == stats["size"]
+    assert stats["timeouts"] == 0
+    assert stats["recycled"] == 0
+
+
+def test_recycled_counts_only_stale_connections():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=2, recycle_seconds=0)
+
+    pool.release(pool.acquire(), discard=True)
+    broken = pool.acquire()
+    broken.close()
+    pool.release(broken)
+    assert pool.stats()["recycled"] == 1
+
+    pool.release(pool.acquire())
+    pool.close()
+    assert pool.stats()["recycled"] == 1
+
+    aging = ConnectionPool(FakeConnection, min_size=0, max_size=1, recycle_seconds=0.01)
+    aging.release(aging.acquire())
+    time.sleep(0.02)
+    aging.release(aging.acquire())
+    assert aging.stats()["recycled"] == 1
+    assert aging.stats()["created"] == 2
+
+
+def test_iter_query_releases_connection_when_closed_mid_stream():
+    pool = init_pool(lambda: FakeConnection([(n,) for n in range(10)]), min_size=0)
+    try:
+        batches = iter_query("SELECT n", batch_size=2)
+        assert next(batches) == {"n": [0, 1]}
+        assert pool.stats()["in_use"] == 1
+
+        batches.close()
+        assert pool.stats()["in_use"] == 0
+        assert pool.stats()["idle"] == 1
+    finally:
+        pool.close()
+        snowflake_client._pool = None
+
+
+class ArrowCursor:
+    """Cursor with the connector's Arrow fetch, plus fetchall for the
+    fallback paths."""
+
+    description = [("SCORE",), ("LABEL",)]
+
+    def __init__(self, table=None, arrow_error=None):
+        self.table = table
+        self.arrow_error = arrow_error
+        self.fetched_all = False
+
+    def fetch_arrow_all(self):
+        if self.arrow_error is not None:
+            raise self.arrow_error
+        return self.table
+
+    def fetchall(self):
+        self.fetched_all = True
+        return [(0.5, "POSITIVE"), (-0.25, "NEGATIVE")]
+
+
+def test_columns_reads_arrow_and_casts_decimals():
+    table = pyarrow.table({
+        "SCORE": pyarrow.array(
+            [decimal.Decimal("0.5"), decimal.Decimal("-0.25")], pyarrow.decimal128(9, 4)
+        ),
+        "LABEL": ["POSITIVE", "NEGATIVE"],
+    })
+    cursor = ArrowCursor(table)
+
+    columns = snowflake_client._columns(cursor)
+
+    assert columns == {"score": [0.5, -0.25], "label": ["POSITIVE", "NEGATIVE"]}
+    assert all(type(value) is float for value in columns["score"])
+    assert not cursor.fetched_all
+    assert snowflake_client._columns(ArrowCursor(None)) == {"score": [], "label": []}
+
+
+def test_columns_falls_back_to_fetchall_without_arrow(monkeypatch):
+    expected = {"score": [0.5, -0.25], "label": ["POSITIVE", "NEGATIVE"]}
+
+    json_result = ArrowCursor(arrow_error=NotSupportedError("JSON result"))
+    assert snowflake_client._columns(json_result) == expected
+    assert json_result.fetched_all
+
+    monkeypatch.setattr(snowflake_client, "pyarrow", None)
+    no_pyarrow = ArrowCursor(arrow_error=AssertionError("Arrow path taken"))
+    assert snowflake_client._columns(no_pyarrow) == expected
+    assert no_pyarrow.fetched_all
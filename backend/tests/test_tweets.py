@@ -0,0 +1,77 @@
+import asyncio
+from urllib.parse import urlencode
+
+import httpx
+
+import main
+from snowflake_client import pool_stats
+
+RANGE = {"start_date": "2009-04-06", "end_date": "2009-06-27"}
+
+
+def test_ndjson_stream_releases_connection_on_disconnect(standin, monkeypatch):
+    monkeypatch.setattr(main, "TWEETS_STREAM_BATCH_SIZE", 100)
+
+    async def run():
+        disconnected = asyncio.Event()
+        chunks = []
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/api/tweets",
+            "raw_path": b"/api/tweets", "root_path": "",
+            "query_string": urlencode(dict(RANGE, format="ndjson")).encode(),
+            "headers": [(b"host", b"test")],
+            "client": ("127.0.0.1", 1), "server": ("test", 80),
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message.get("body"):
+                chunks.append(message["body"])
+                disconnected.set()
+
+        await main.app(scope, receive, send)
+        return chunks
+
+    chunks = asyncio.run(run())
+    streamed = b"".join(chunks).count(b"\n")
+    assert 0 < streamed < standin.db.execute("SELECT COUNT(*) FROM SCORED_MENTIONS").fetchone()[0]
+    stats = pool_stats()
+    assert stats["in_use"] == 0
+    assert stats["idle"] == stats["size"]
+
+
+def test_cursor_pages_cover_every_tweet_once(standin):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            too_large = await client.get(
+                "/api/tweets", params=dict(RANGE, limit=main.TWEETS_MAX_PAGE_SIZE + 1)
+            )
+            pages, cursor = [], None
+            while True:
+                params = dict(RANGE, limit=main.TWEETS_MAX_PAGE_SIZE)
+                if cursor:
+                    params["cursor"] = cursor
+                body = (await client.get("/api/tweets", params=params)).json()
+                pages.append(body["tweets"])
+                cursor = body["next_cursor"]
+                if cursor is None:
+                    return too_large, pages
+
+    too_large, pages = asyncio.run(run())
+    assert too_large.status_code == 422
+    ids = [tweet["tweet_id"] for page in pages for tweet in page]
+    expected = standin.db.execute(
+        "SELECT tweet_id FROM SCORED_MENTIONS ORDER BY created_at DESC, tweet_id DESC"
+    ).fetchall()
+    assert len(pages) > 1
+    assert ids == [tweet_id for (tweet_id,) in expected]
@@ -0,0 +1,170 @@
+import asyncio
+
+import httpx
+import pytest
+
+import cortex
+import main
+import metrics
+from singleflight import SingleFlight
+from why_jobs import WhyJobQueue
+
+WHY = {
+    "sentiment_type": "NEGATIVE",
+    "start_date": "2009-04-06",
+    "end_date": "2009-06-27",
+    "keyword": "work",
+}
+BULLETS = "• [~60%] Work stress\n• [~40%] Long hours"
+
+
+@pytest.fixture
+def why(standin, monkeypatch):
+    """Fresh single-flight and job queue, with Cortex stubbed out. Returns
+    the prompts each stub was called with."""
+    monkeypatch.setattr(main, "why_flights", SingleFlight())
+    monkeypatch.setattr(main, "why_jobs", WhyJobQueue())
+    calls = {"complete": [], "stream": []}
+
+    async def complete(prompt):
+        calls["complete"].append(prompt)
+        await asyncio.sleep(0.2)
+        return BULLETS
+
+    async def stream(prompt):
+        calls["stream"].append(prompt)
+        await asyncio.sleep(0.2)
+        yield BULLETS
+
+    monkeypatch.setattr(cortex, "call_cortex_complete_async", complete)
+    monkeypatch.setattr(cortex, "stream_cortex_complete_async", stream)
+    return calls
+
+
+def client() -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def post_and_poll(http: httpx.AsyncClient, body: dict) -> str:
+    response = await http.post("/api/why", json=body)
+    response.raise_for_status()
+    payload = response.json()
+    if response.status_code == 200:
+        return payload["bullets"]
+    while payload["status"] != "done":
+        await asyncio.sleep(0.02)
+        response = await http.get(f"/api/why/jobs/{payload['job_id']}")
+        response.raise_for_status()
+        payload = response.json()
+    return payload["result"]["bullets"]
+
+
+def test_concurrent_identical_requests_call_cortex_once(why):
+    async def run():
+        async with client() as http:
+            return await asyncio.gather(
+                *(post_and_poll(http, dict(WHY, wait=True)) for _ in range(10))
+            )
+
+    assert asyncio.run(run()) == [BULLETS] * 10
+    assert len(why["complete"]) == 1
+
+
+def test_queued_inline_and_streamed_misses_share_one_flight(why):
+    async def stream(http: httpx.AsyncClient) -> str:
+        response = await http.get("/api/why/stream", params=WHY)
+        response.raise_for_status()
+        return response.text
+
+    async def run():
+        async with client() as http:
+            return await asyncio.gather(
+                *(post_and_poll(http, WHY) for _ in range(4)),
+                *(post_and_poll(http, dict(WHY, wait=True)) for _ in range(4)),
+                *(stream(http) for _ in range(4)),
+            )
+
+    results = asyncio.run(run())
+    assert results[:8] == [BULLETS] * 8
+    assert all("event: done" in body for body in results[8:])
+    assert len(why["complete"]) + len(why["stream"]) == 1
+
+
+def test_waiting_request_takes_a_job_slot_and_answers_429_when_full(why, monkeypatch):
+    # No workers, room for one waiting job: the POST below fills the queue.
+    monkeypatch.setattr(main, "why_jobs", WhyJobQueue(max_concurrency=0, max_queue_depth=1))
+
+    async def run():
+        async with client() as http:
+            queued = await http.post("/api/why", json=WHY)
+            other_key = await http.post("/api/why", json=dict(WHY, keyword="love", wait=True))
+            return queued, other_key
+
+    queued, other_key = asyncio.run(run())
+    assert queued.status_code == 202
+    assert other_key.status_code == 429
+    assert main.why_jobs.stats()["rejected"] == 1
+
+
+def test_stream_takes_a_job_slot_and_answers_429_when_full(why, monkeypatch):
+    # No workers, room for one waiting job: the POST below fills the queue.
+    monkeypatch.setattr(main, "why_jobs", WhyJobQueue(max_concurrency=0, max_queue_depth=1))
+
+    async def run():
+        async with client() as http:
+            queued = await http.post("/api/why", json=WHY)
+            other_key = await http.get("/api/why/stream", params=dict(WHY, keyword="love"))
+            return queued, other_key
+
+    queued, other_key = asyncio.run(run())
+    assert queued.status_code == 202
+    assert other_key.status_code == 429
+    assert main.why_jobs.stats()["rejected"] == 1
+
+
+def test_stream_sends_each_bullet_before_the_completion_ends(standin):
+    released = asyncio.Event()
+
+    async def complete(prompt):
+        yield "• [~60%] Work stress\n• [~40%]"
+        await released.wait()
+        yield " Long hours"
+
+    async def run():
+        events = []
+        stream = cortex.generate_why_analysis_stream(
+            WHY["sentiment_type"], WHY["start_date"], WHY["end_date"], WHY["keyword"],
+            complete=complete,
+        )
+        async for event in stream:
+            events.append(event)
+            if event["event"] == "bullet":
+                released.set()
+        return events
+
+    events = asyncio.run(asyncio.wait_for(run(), timeout=10))
+    assert [e.get("stage") for e in events[:2]] == ["tweets_fetched", "prompt_built"]
+    assert [e["text"] for e in events if e["event"] == "bullet"] == BULLETS.splitlines()
+    assert events[-1]["event"] == "result"
+    assert events[-1]["bullet_summary"] == BULLETS
+
+
+def test_job_worker_queries_are_labelled_background(why, monkeypatch):
+    observed = []
+    observe_query = metrics.observe_query
+
+    def record(sql, seconds, pool_wait, rows, query_id, status="ok", endpoint=None):
+        observed.append((sql, endpoint or metrics.current_endpoint.get()))
+        observe_query(sql, seconds, pool_wait, rows, query_id, status, endpoint)
+
+    monkeypatch.setattr(metrics, "observe_query", record)
+
+    async def run():
+        async with client() as http:
+            return await post_and_poll(http, WHY)
+
+    assert asyncio.run(run()) == BULLETS
+    worker_queries = [endpoint for sql, endpoint in observed if "SCORED_MENTIONS" in sql]
+    assert worker_queries
+    assert set(worker_queries) == {"background"}
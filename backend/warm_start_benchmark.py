@@ -0,0 +1,150 @@
+"""
+Warm Start Benchmark
+Measures the first dashboard view after a deploy against the DuckDB
+Snowflake stand-in (standin.py), with connection setup and warehouse resume
+latency injected:
+
+    cold   pool empty, warehouse suspended; the first view opens connections
+           (importing the connector) and resumes the warehouse
+    warm   main.warm_start() has run, as the startup hook does; the first view
+           finds connections open, the warehouse running and results cached
+
+Each run is a fresh process, which also times importing the app, i.e. how
+long before uvicorn can start listening. The first view is what the frontend
+issues on load: /api/date-range, then /api/dashboard and the first
+/api/tweets page concurrently.
+
+Requires duckdb and httpx (pip install duckdb httpx).
+
+Usage:
+    python warm_start_benchmark.py
+    python warm_start_benchmark.py --connect-ms 800 --resume-ms 3000 --rows 200000
+    python warm_start_benchmark.py --repeat 5
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ("cold", "warm")
+STEPS = ("import", "warm_start", "date_range", "dashboard", "tweets", "first_view")
+
+
+def run_scenario(args) -> dict:
+    """One scenario in this process; prints its timings as JSON."""
+    started = time.perf_counter()
+    import main
+    from snowflake_client import init_pool
+    from standin import StandinEngine, open_database
+
+    timings = {"import": time.perf_counter() - started}
+
+    engine = StandinEngine(
+        open_database(args.db, args.rows),
+        latency=args.latency_ms / 1000,
+        connect_latency=args.connect_ms / 1000,
+        resume_latency=args.resume_ms / 1000,
+    )
+
+    def connect():
+        # What snowflake_client._connect does before its first connection.
+        importlib.import_module("snowflake.connector")
+        return engine.connect()
+
+    init_pool(connect)
+
+    async def first_view() -> None:
+        import httpx
+
+        if args.scenario == "warm":
+            step = time.perf_counter()
+            await main.warm_start()
+            timings["warm_start"] = time.perf_counter() - step
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def timed(name: str, path: str, params: dict | None = None):
+                step = time.perf_counter()
+                response = await client.get(path, params=params)
+                response.raise_for_status()
+                timings[name] = time.perf_counter() - step
+                return response.json()
+
+            step = time.perf_counter()
+            date_range = await timed("date_range", "/api/date-range")
+            params = {"start_date": date_range["min_date"], "end_date": date_range["max_date"]}
+            await asyncio.gather(
+                timed("dashboard", "/api/dashboard", dict(params, granularity="auto", max_points=200)),
+                timed("tweets", "/api/tweets", dict(params, limit=500)),
+            )
+            timings["first_view"] = time.perf_counter() - step
+
+    asyncio.run(first_view())
+    return {name: round(seconds, 4) for name, seconds in timings.items()}
+
+
+def spawn(args, scenario: str) -> dict:
+    command = [
+        sys.executable, os.path.abspath(__file__), "--scenario", scenario,
+        "--db", args.db, "--rows", str(args.rows),
+        "--latency-ms", str(args.latency_ms),
+        "--connect-ms", str(args.connect_ms),
+        "--resume-ms", str(args.resume_ms),
+    ]
+    output = subprocess.run(
+        command, check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm first requests")
+    parser.add_argument("--rows", type=int, default=50_000, help="Seeded SCORED_MENTIONS rows")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Injected latency per query")
+    parser.add_argument("--connect-ms", type=float, default=500, help="Latency to open a connection")
+    parser.add_argument("--resume-ms", type=float, default=2000, help="Latency to resume a suspended warehouse")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (median reported)")
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args)))
+        return
+
+    from standin import open_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.db = os.path.join(tmp, "standin.duckdb")
+        open_database(args.db, args.rows).close()
+
+        results = {
+            scenario: [spawn(args, scenario) for _ in range(args.repeat)]
+            for scenario in SCENARIOS
+        }
+
+    print(
+        f"{args.rows:,} rows, {args.latency_ms:g} ms/query, "
+        f"{args.connect_ms:g} ms/connection, {args.resume_ms:g} ms resume "
+        f"(median of {args.repeat}, seconds)\n"
+    )
+    print(f"{'scenario':<10}" + "".join(f"{step:>12}" for step in STEPS))
+    for scenario, runs in results.items():
+        cells = []
+        for step in STEPS:
+            values = [run[step] for run in runs if step in run]
+            cells.append(f"{statistics.median(values):>12.3f}" if values else f"{'-':>12}")
+        print(f"{scenario:<10}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
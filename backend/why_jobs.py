@@ -0,0 +1,194 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("sentiment_api.why_jobs")
+
+WHY_JOB_MAX_CONCURRENCY = int(os.environ.get("WHY_JOB_MAX_CONCURRENCY", "4"))
+WHY_JOB_MAX_QUEUE_DEPTH = int(os.environ.get("WHY_JOB_MAX_QUEUE_DEPTH", "100"))
+WHY_JOB_RETENTION_SECONDS = float(os.environ.get("WHY_JOB_RETENTION_SECONDS", "3600"))
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue already holds max_queue_depth waiting jobs."""
+
+
+@dataclass
+class WhyJob:
+    job_id: str
+    key: str
+    fn: Callable[[], Awaitable[Any]]
+    status: str = "queued"  # queued | running | done | failed
+    result: Any = None
+    error: BaseException | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    finished_at: float | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def queue_wait_seconds(self) -> float | None:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.enqueued_at
+
+    @property
+    def run_seconds(self) -> float | None:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_seconds": round(self.total / self.count, 4) if self.count else 0.0,
+            "max_seconds": round(self.max, 4),
+        }
+
+
+class WhyJobQueue:
+    """FIFO job queue drained by a fixed pool of asyncio workers.
+
+    Jobs are keyed (by Why cache key): submitting a key that is already
+    queued or running returns the existing job instead of adding another.
+    Waiting jobs are capped at max_queue_depth; beyond that, submit raises
+    QueueFullError so the API can answer 429."""
+
+    def __init__(
+        self,
+        max_concurrency: int = WHY_JOB_MAX_CONCURRENCY,
+        max_queue_depth: int = WHY_JOB_MAX_QUEUE_DEPTH,
+        retention_seconds: float = WHY_JOB_RETENTION_SECONDS,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.retention_seconds = retention_seconds
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._jobs: dict[str, WhyJob] = {}
+        self._active_by_key: dict[str, WhyJob] = {}
+        self._queued = 0
+        self._running = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_wait = _Timing()
+        self.run_time = _Timing()
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [w for w in self._workers if not w.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._workers) < self.max_concurrency:
+            # Workers start lazily inside whichever request submits first; an
+            # empty context keeps that request's context variables (such as
+            # the metrics endpoint label) from leaking into every job.
+            self._workers.append(
+                loop.create_task(self._worker(), context=contextvars.Context())
+            )
+
+    def submit(self, key: str, fn: Callable[[], Awaitable[Any]]) -> WhyJob:
+        """Enqueues fn under key, or returns the job already active for key."""
+        self._ensure_started()
+        self._prune()
+
+        active = self._active_by_key.get(key)
+        if active is not None:
+            self.coalesced += 1
+            return active
+
+        if self._queued >= self.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(
+                f"Why job queue is full ({self.max_queue_depth} waiting jobs)"
+            )
+
+        job = WhyJob(job_id=uuid.uuid4().hex, key=key, fn=fn)
+        self._jobs[job.job_id] = job
+        self._active_by_key[key] = job
+        self._queued += 1
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> WhyJob | None:
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._queued -= 1
+            self._running += 1
+            job.status = "running"
+            job.started_at = time.monotonic()
+            self.queue_wait.observe(job.queue_wait_seconds)
+            try:
+                job.result = await job.fn()
+                job.status = "done"
+                self.completed += 1
+            except Exception as e:
+                job.error = e
+                job.status = "failed"
+                self.failed += 1
+            finally:
+                job.finished_at = time.monotonic()
+                self.run_time.observe(job.run_seconds)
+                self._running -= 1
+                self._active_by_key.pop(job.key, None)
+                job.done.set()
+                self._queue.task_done()
+                logger.info(
+                    "why job %s %s wait=%.3fs run=%.3fs",
+                    job.job_id,
+                    job.status,
+                    job.queue_wait_seconds,
+                    job.run_seconds,
+                )
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "queued": self._queued,
+            "running": self._running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
@@ -101,6 +101,10 @@ export default function Sidebar() {
           placeholder="Search tweets..."
           className="w-full px-3 py-2 border border-gray-300 rounded-md text-sm focus:outline-none focus:ring-2 focus:ring-blue-500"
         />
+        <p className="text-xs text-gray-500">
+          Whole words only: &quot;love&quot; won&apos;t match &quot;lovely&quot;.
+          Add * for a prefix, e.g. lov*
+        </p>
       </div>
 
       {/* Sentiment Filter */}
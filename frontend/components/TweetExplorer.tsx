@@ -18,7 +18,8 @@ function SentimentBadge({ label }: { label: string }) {
 }
 
 export default function TweetExplorer() {
-  const { data, isLoading, error } = useTweets();
+  const { data, isLoading, error, hasMore, isLoadingMore, loadMore, exportUrl } =
+    useTweets();
   const [localSearch, setLocalSearch] = useState("");
 
   const filteredTweets = useMemo(() => {
@@ -48,6 +49,15 @@ export default function TweetExplorer() {
             placeholder="Search within tweets..."
             className="px-3 py-1.5 border border-gray-300 rounded-md text-sm focus:outline-none focus:ring-2 focus:ring-blue-500 w-64"
           />
+          {exportUrl && (
+            <a
+              href={exportUrl}
+              download="tweets.ndjson"
+              className="text-xs text-blue-600 hover:underline"
+            >
+              Export
+            </a>
+          )}
         </div>
       </div>
 
@@ -84,8 +94,8 @@ export default function TweetExplorer() {
               </tr>
             </thead>
             <tbody className="divide-y divide-gray-100">
-              {filteredTweets.map((tweet, i) => (
-                <tr key={i} className="hover:bg-gray-50">
+              {filteredTweets.map((tweet) => (
+                <tr key={tweet.tweet_id} className="hover:bg-gray-50">
                   <td className="px-3 py-2 text-gray-600 whitespace-nowrap">
                     {tweet.created_at}
                   </td>
@@ -118,6 +128,18 @@ export default function TweetExplorer() {
               )}
             </tbody>
           </table>
+          {hasMore && (
+            <div className="flex justify-center py-3">
+              <button
+                type="button"
+                onClick={() => loadMore()}
+                disabled={isLoadingMore}
+                className="px-3 py-1.5 text-xs font-medium text-blue-600 border border-blue-200 rounded-md hover:bg-blue-50 disabled:opacity-50"
+              >
+                {isLoadingMore ? "Loading..." : "Load more"}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -1,12 +1,18 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { useFilter } from "@/lib/FilterContext";
 import { useSummary } from "@/lib/hooks";
-import { fetchWhy, type WhyResponse } from "@/lib/api";
+import { streamWhy, type WhyProgress, type WhyResponse } from "@/lib/api";
 
 type SentimentTab = "NEGATIVE" | "POSITIVE";
 
+const STAGE_MESSAGES: Record<WhyProgress["stage"] | "started", string> = {
+  started: "Fetching tweets...",
+  tweets_fetched: "Selecting tweets...",
+  prompt_built: "Generating root-cause analysis...",
+};
+
 export default function WhyLayer() {
   const { state: filters } = useFilter();
   const { data: summary } = useSummary();
@@ -17,30 +23,55 @@ export default function WhyLayer() {
   });
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // Progress and bullets received so far for the analysis being streamed.
+  const [stage, setStage] = useState<keyof typeof STAGE_MESSAGES>("started");
+  const [partial, setPartial] = useState<{
+    tab: SentimentTab;
+    bullets: string[];
+  } | null>(null);
+  const closeStream = useRef<(() => void) | null>(null);
+
+  useEffect(() => () => closeStream.current?.(), []);
 
-  async function handleExplain(forceRefresh = false) {
+  function handleExplain(forceRefresh = false) {
     if (!filters.startDate || !filters.endDate) return;
+    const tab = activeTab;
+    closeStream.current?.();
     setLoading(true);
     setError(null);
-    try {
-      const response = await fetchWhy({
-        sentiment_type: activeTab,
+    setStage("started");
+    setPartial({ tab, bullets: [] });
+    closeStream.current = streamWhy(
+      {
+        sentiment_type: tab,
         start_date: filters.startDate,
         end_date: filters.endDate,
         keyword: filters.keyword || undefined,
         force_refresh: forceRefresh,
-      });
-      setResults((prev) => ({ ...prev, [activeTab]: response }));
-    } catch (err) {
-      setError(
-        err instanceof Error ? err.message : "Failed to generate explanation"
-      );
-    } finally {
-      setLoading(false);
-    }
+      },
+      {
+        onProgress: (progress) => setStage(progress.stage),
+        onBullet: (text) =>
+          setPartial(
+            (prev) => prev && { ...prev, bullets: [...prev.bullets, text] }
+          ),
+        onDone: (response) => {
+          setResults((prev) => ({ ...prev, [tab]: response }));
+          setPartial(null);
+          setLoading(false);
+        },
+        onError: (message) => {
+          setError(message || "Failed to generate explanation");
+          setPartial(null);
+          setLoading(false);
+        },
+      }
+    );
   }
 
   const currentResult = results[activeTab];
+  const streamedBullets =
+    partial && partial.tab === activeTab ? partial.bullets : [];
 
   const tweetCount =
     activeTab === "NEGATIVE"
@@ -109,7 +140,18 @@ export default function WhyLayer() {
       {loading && (
         <div className="flex items-center gap-2 text-sm text-gray-500 mb-3">
           <div className="animate-spin rounded-full h-4 w-4 border-b-2 border-blue-600" />
-          Generating root-cause analysis...
+          {STAGE_MESSAGES[stage]}
+        </div>
+      )}
+
+      {/* Bullets streamed so far */}
+      {loading && streamedBullets.length > 0 && (
+        <div
+          className={`border-l-4 ${borderColor} bg-gray-50 rounded-r-md p-4 mb-3`}
+        >
+          <div className="text-sm text-gray-800 whitespace-pre-line leading-relaxed">
+            {streamedBullets.join("\n")}
+          </div>
         </div>
       )}
 
@@ -1,14 +1,32 @@
 // --- Response Types ---
 
+// Present only on approx=true responses: estimates from a row sample, with
+// 95% margins of error.
+export interface ApproxSummary {
+  sample_percent: number;
+  sample_rows: number;
+  confidence: number;
+  total_tweets_margin: number;
+  avg_score_margin: number;
+  pct_positive_margin: number;
+  pct_negative_margin: number;
+  pct_neutral_margin: number;
+}
+
 export interface SummaryResponse {
   total_tweets: number;
   avg_score: number;
   pct_positive: number;
   pct_negative: number;
   pct_neutral: number;
+  approx?: ApproxSummary;
 }
 
+export type TrendGranularity = "hour" | "day" | "week" | "month";
+
 export interface TrendDataPoint {
+  // Bucket label: "YYYY-MM-DD HH:MI" for hours, the start date for days and
+  // weeks, "YYYY-MM" for months.
   day: string;
   POSITIVE: number;
   NEGATIVE: number;
@@ -17,6 +35,9 @@ export interface TrendDataPoint {
 
 export interface TrendResponse {
   data: TrendDataPoint[];
+  granularity: TrendGranularity;
+  // Set when the series was reduced to max_points with LTTB.
+  downsampled_from?: number;
 }
 
 export interface DistributionBucket {
@@ -24,11 +45,26 @@ export interface DistributionBucket {
   count: number;
 }
 
+export interface ApproxDistribution {
+  sample_percent: number;
+  sample_rows: number;
+  confidence: number;
+  count_margins: number[];
+}
+
 export interface DistributionResponse {
   buckets: DistributionBucket[];
+  approx?: ApproxDistribution;
+}
+
+export interface DashboardResponse {
+  summary: SummaryResponse;
+  trend: TrendResponse;
+  distribution: DistributionResponse;
 }
 
 export interface Tweet {
+  tweet_id: string;
   created_at: string;
   user: string;
   sentiment_label: string;
@@ -38,6 +74,8 @@ export interface Tweet {
 
 export interface TweetsResponse {
   tweets: Tweet[];
+  // Opaque keyset cursor for the next page; null on the last page.
+  next_cursor: string | null;
 }
 
 export interface WhyRequest {
@@ -46,6 +84,7 @@ export interface WhyRequest {
   end_date: string;
   keyword?: string;
   force_refresh?: boolean;
+  wait?: boolean;
 }
 
 export interface WhyResponse {
@@ -54,6 +93,27 @@ export interface WhyResponse {
   generated_at: string;
 }
 
+export interface WhyProgress {
+  stage: "tweets_fetched" | "prompt_built";
+  tweets?: number;
+  distinct_tweets?: number;
+}
+
+export interface WhyStreamHandlers {
+  onProgress?: (progress: WhyProgress) => void;
+  onBullet: (text: string) => void;
+  onDone: (response: WhyResponse) => void;
+  onError: (message: string) => void;
+}
+
+export interface WhyJobResponse {
+  job_id: string;
+  status: "queued" | "running" | "done" | "failed";
+  result: WhyResponse | null;
+  queue_wait_seconds: number | null;
+  run_seconds: number | null;
+}
+
 export interface DateRangeResponse {
   min_date: string;
   max_date: string;
@@ -66,6 +126,11 @@ export interface FilterParams {
   sentiment_filter?: string;
 }
 
+export interface TrendOptions {
+  granularity?: TrendGranularity | "auto";
+  max_points?: number;
+}
+
 // --- Helpers ---
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
@@ -85,13 +150,39 @@ function buildUrl(
   return url.toString();
 }
 
+// Last ETag and body per GET URL. Repeat requests (e.g. on remount) are sent
+// with If-None-Match, and a 304 reuses the stored body without a download.
+const ETAG_CACHE_MAX_ENTRIES = 100;
+const etagCache = new Map<string, { etag: string; body: unknown }>();
+
+function rememberEtag(url: string, etag: string, body: unknown): void {
+  etagCache.delete(url);
+  etagCache.set(url, { etag, body });
+  if (etagCache.size > ETAG_CACHE_MAX_ENTRIES) {
+    const oldest = etagCache.keys().next().value;
+    if (oldest !== undefined) etagCache.delete(oldest);
+  }
+}
+
 async function fetchJson<T>(url: string, options?: RequestInit): Promise<T> {
-  const res = await fetch(url, options);
+  const conditional = !options?.method || options.method === "GET";
+  const cached = conditional ? etagCache.get(url) : undefined;
+  const headers = new Headers(options?.headers);
+  if (cached) headers.set("If-None-Match", cached.etag);
+
+  const res = await fetch(url, { ...options, headers });
+  if (res.status === 304 && cached) {
+    rememberEtag(url, cached.etag, cached.body);
+    return cached.body as T;
+  }
   if (!res.ok) {
     const detail = await res.text().catch(() => res.statusText);
     throw new Error(`API error ${res.status}: ${detail}`);
   }
-  return res.json();
+  const body = await res.json();
+  const etag = res.headers.get("ETag");
+  if (conditional && etag) rememberEtag(url, etag, body);
+  return body;
 }
 
 // --- GET endpoints ---
@@ -107,9 +198,12 @@ export async function fetchSummary(
 }
 
 export async function fetchTrend(
-  params: FilterParams
+  params: FilterParams,
+  options: TrendOptions = {}
 ): Promise<TrendResponse> {
-  return fetchJson<TrendResponse>(buildUrl("/api/trend", { ...params }));
+  return fetchJson<TrendResponse>(
+    buildUrl("/api/trend", { ...params, ...trendOptionParams(options) })
+  );
 }
 
 export async function fetchDistribution(
@@ -124,26 +218,132 @@ export async function fetchDistribution(
   );
 }
 
+export async function fetchDashboard(
+  params: FilterParams,
+  options: TrendOptions = {}
+): Promise<DashboardResponse> {
+  return fetchJson<DashboardResponse>(
+    buildUrl("/api/dashboard", { ...params, ...trendOptionParams(options) })
+  );
+}
+
+function trendOptionParams(options: TrendOptions): Record<string, string | undefined> {
+  return {
+    granularity: options.granularity,
+    max_points: options.max_points?.toString(),
+  };
+}
+
+function tweetsUrl(
+  params: FilterParams & { limit?: number; cursor?: string; format?: string }
+): string {
+  return buildUrl("/api/tweets", {
+    start_date: params.start_date,
+    end_date: params.end_date,
+    keyword: params.keyword,
+    sentiment_filter: params.sentiment_filter,
+    limit: params.limit?.toString(),
+    cursor: params.cursor,
+    format: params.format,
+  });
+}
+
 export async function fetchTweets(
-  params: FilterParams & { limit?: number }
+  params: FilterParams & { limit?: number; cursor?: string }
 ): Promise<TweetsResponse> {
-  return fetchJson<TweetsResponse>(
-    buildUrl("/api/tweets", {
-      start_date: params.start_date,
-      end_date: params.end_date,
-      keyword: params.keyword,
-      sentiment_filter: params.sentiment_filter,
-      limit: params.limit?.toString(),
-    })
-  );
+  return fetchJson<TweetsResponse>(tweetsUrl(params));
+}
+
+// Streams every matching tweet as NDJSON, one object per line.
+export function tweetsExportUrl(params: FilterParams): string {
+  return tweetsUrl({ ...params, format: "ndjson" });
 }
 
 // --- POST endpoint ---
 
+const WHY_POLL_INTERVAL_MS = 1000;
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+// Cache hits come back directly; misses return a job id that is polled
+// until the queued Cortex analysis finishes.
 export async function fetchWhy(body: WhyRequest): Promise<WhyResponse> {
-  return fetchJson<WhyResponse>(buildUrl("/api/why"), {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify(body),
+  const initial = await fetchJson<WhyResponse | WhyJobResponse>(
+    buildUrl("/api/why"),
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+    }
+  );
+  if (!("job_id" in initial)) {
+    return initial;
+  }
+
+  let job: WhyJobResponse = initial;
+  for (;;) {
+    if (job.status === "done" && job.result) {
+      return job.result;
+    }
+    await sleep(WHY_POLL_INTERVAL_MS);
+    // Failed jobs answer with the same 404/502 errors as wait=true.
+    job = await fetchJson<WhyJobResponse>(
+      buildUrl(`/api/why/jobs/${job.job_id}`)
+    );
+  }
+}
+
+// Streams a Why analysis from /api/why/stream: cache hits arrive as a single
+// done event, misses as progress events, then one bullet event per bullet,
+// then done. The backend's stream_cortex_complete_async yields the whole
+// completion as one chunk, so no bullet arrives before Cortex has finished;
+// the progress events are what the user sees while it runs. A full Why job
+// queue answers 429; EventSource only reports that as an error, so it reaches
+// onError as the lost-connection message.
+// Returns a function that closes the stream.
+export function streamWhy(
+  body: WhyRequest,
+  handlers: WhyStreamHandlers
+): () => void {
+  const source = new EventSource(
+    buildUrl("/api/why/stream", {
+      sentiment_type: body.sentiment_type,
+      start_date: body.start_date,
+      end_date: body.end_date,
+      keyword: body.keyword,
+      force_refresh: body.force_refresh ? "true" : undefined,
+    })
+  );
+  let finished = false;
+  // EventSource reconnects when the server ends the stream, so close it as
+  // soon as the final event arrives.
+  const close = () => {
+    finished = true;
+    source.close();
+  };
+  const payload = (event: Event) => JSON.parse((event as MessageEvent).data);
+
+  source.addEventListener("progress", (event) =>
+    handlers.onProgress?.(payload(event))
+  );
+  source.addEventListener("bullet", (event) =>
+    handlers.onBullet(payload(event).text)
+  );
+  source.addEventListener("done", (event) => {
+    close();
+    handlers.onDone(payload(event));
+  });
+  source.addEventListener("failed", (event) => {
+    close();
+    handlers.onError(payload(event).detail);
   });
+  source.onerror = () => {
+    if (!finished) {
+      close();
+      handlers.onError("Lost connection to the analysis service");
+    }
+  };
+  return close;
 }
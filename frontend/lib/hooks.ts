@@ -1,17 +1,16 @@
 "use client";
 
+import { useMemo } from "react";
 import useSWR from "swr";
+import useSWRInfinite from "swr/infinite";
 import { useFilter } from "./FilterContext";
 import {
-  fetchSummary,
-  fetchTrend,
-  fetchDistribution,
+  fetchDashboard,
   fetchTweets,
   fetchDateRange,
+  tweetsExportUrl,
   type FilterParams,
-  type SummaryResponse,
-  type TrendResponse,
-  type DistributionResponse,
+  type DashboardResponse,
   type TweetsResponse,
   type DateRangeResponse,
 } from "./api";
@@ -39,34 +38,74 @@ export function useDateRange() {
   });
 }
 
-export function useSummary() {
+// Summary, trend and distribution share one SWR key, so SWR deduplicates
+// them into a single /api/dashboard request per filter change.
+// The trend chart asks for buckets sized to the selected range, and for at
+// most this many points, so long ranges cost what the chart can show.
+const TREND_OPTIONS = { granularity: "auto", max_points: 200 } as const;
+
+export function useDashboard() {
   const params = useFilterParams();
-  return useSWR<SummaryResponse>(
-    params ? ["summary", JSON.stringify(params)] : null,
-    () => fetchSummary(params!)
+  return useSWR<DashboardResponse>(
+    params ? ["dashboard", JSON.stringify(params)] : null,
+    () => fetchDashboard(params!, TREND_OPTIONS)
   );
 }
 
+export function useSummary() {
+  const { data, ...rest } = useDashboard();
+  return { ...rest, data: data?.summary };
+}
+
 export function useTrend() {
-  const params = useFilterParams();
-  return useSWR<TrendResponse>(
-    params ? ["trend", JSON.stringify(params)] : null,
-    () => fetchTrend(params!)
-  );
+  const { data, ...rest } = useDashboard();
+  return { ...rest, data: data?.trend };
 }
 
 export function useDistribution() {
-  const params = useFilterParams();
-  return useSWR<DistributionResponse>(
-    params ? ["distribution", JSON.stringify(params)] : null,
-    () => fetchDistribution(params!)
-  );
+  const { data, ...rest } = useDashboard();
+  return { ...rest, data: data?.distribution };
 }
 
+const TWEETS_PAGE_SIZE = 500;
+
+// Pages through /api/tweets with the keyset cursor from the previous page.
+// Tweets from all loaded pages are concatenated into data.tweets.
 export function useTweets() {
   const params = useFilterParams();
-  return useSWR<TweetsResponse>(
-    params ? ["tweets", JSON.stringify(params)] : null,
-    () => fetchTweets({ ...params!, limit: 500 })
+  const filterKey = params ? JSON.stringify(params) : null;
+  const { data: pages, size, setSize, ...rest } = useSWRInfinite<TweetsResponse>(
+    (index, previous: TweetsResponse | null) => {
+      if (!filterKey) return null;
+      if (index === 0) return ["tweets", filterKey, null];
+      if (!previous?.next_cursor) return null;
+      return ["tweets", filterKey, previous.next_cursor];
+    },
+    ([, , cursor]: [string, string, string | null]) =>
+      fetchTweets({
+        ...params!,
+        limit: TWEETS_PAGE_SIZE,
+        cursor: cursor ?? undefined,
+      })
+  );
+
+  const data = useMemo(
+    () =>
+      pages
+        ? {
+            tweets: pages.flatMap((page) => page.tweets),
+            next_cursor: pages[pages.length - 1]?.next_cursor ?? null,
+          }
+        : undefined,
+    [pages]
   );
+
+  return {
+    ...rest,
+    data,
+    hasMore: Boolean(data?.next_cursor),
+    isLoadingMore: rest.isLoading || (size > 0 && pages?.[size - 1] === undefined),
+    loadMore: () => setSize(size + 1),
+    exportUrl: params ? tweetsExportUrl(params) : null,
+  };
 }
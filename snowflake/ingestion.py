@@ -2,17 +2,57 @@
 Snowflake Ingestion Script
 Uploads sentiment140_clean.csv to an internal stage and loads it into RAW_MENTIONS.
 
+The default mode truncates RAW_MENTIONS and reloads the whole file. --append
+instead splits the clean CSV into size-bounded, gzipped partitions (one or
+more per created_at day, rows sorted by tweet_id), and compares their
+content hashes with a local manifest. Only new or changed partitions are
+uploaded, with parallel PUTs, and all of them are loaded by one MERGE on
+tweet_id. Partition membership depends on sort position, so a new row can
+shift already-loaded rows into a new partition; the MERGE skips them, so
+rows already in RAW_MENTIONS (and already scored) are never loaded twice.
+
 Usage:
-    python ingestion.py
+    python ingestion.py                      # truncate and reload everything
+    python ingestion.py --append             # upload and load new/changed partitions
+    python ingestion.py --append --threads 8 # more parallel PUTs
+    python ingestion.py --append --dry-run   # print the stage operations only
 """
 
+import argparse
+import glob
+import gzip
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pandas as pd
 import snowflake.connector
 from dotenv import load_dotenv
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 CLEAN_CSV = os.path.join(PROJECT_ROOT, "data", "sentiment140_clean.csv")
+PARTITION_DIR = os.path.join(PROJECT_ROOT, "data", "partitions")
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "data", "ingestion_manifest.json")
+
+PARTITION_STAGE = "@RAW_STAGE/partitions"
+PARTITION_MAX_ROWS = 50_000
+PUT_THREADS = 4
+READ_CHUNKSIZE = 200_000
+
+CSV_FORMAT_OPTIONS = """
+        TYPE = 'CSV'
+        FIELD_OPTIONALLY_ENCLOSED_BY = '"'
+        SKIP_HEADER = 1
+        NULL_IF = ('', 'NULL')
+        EMPTY_FIELD_AS_NULL = TRUE
+"""
 
 # Load credentials from backend/.env
 load_dotenv(os.path.join(PROJECT_ROOT, "backend", ".env"))
@@ -30,12 +70,240 @@ def get_connection() -> snowflake.connector.SnowflakeConnection:
     )
 
 
-def main():
-    print(f"Clean CSV: {CLEAN_CSV}")
-    if not os.path.exists(CLEAN_CSV):
-        print("ERROR: Clean CSV not found. Run preprocessing.py first.")
-        return
+class RecordingCursor:
+    """Cursor stand-in that records statements instead of running them."""
+
+    def __init__(self, log: list, lock: threading.Lock):
+        self._log = log
+        self._lock = lock
+
+    def execute(self, sql: str, params=None):
+        with self._lock:
+            self._log.append(" ".join(sql.split()))
+        return self
+
+    def fetchall(self) -> list:
+        return []
+
+    def fetchone(self):
+        return (0,)
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingConnection:
+    """Local stand-in for a Snowflake connection. Every statement from every
+    cursor (including the PUT threads) lands in .operations."""
+
+    def __init__(self):
+        self.operations: list[str] = []
+        self._lock = threading.Lock()
+
+    def cursor(self) -> RecordingCursor:
+        return RecordingCursor(self.operations, self._lock)
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    path: str
+    sha256: str
+    rows: int
+
+
+def write_partitions(
+    clean_csv: str = CLEAN_CSV,
+    out_dir: str = PARTITION_DIR,
+    max_rows: int = PARTITION_MAX_ROWS,
+) -> list[Partition]:
+    """Splits clean_csv into mentions_<day>_<n>.csv.gz files of at most
+    max_rows rows. Rows are grouped by created_at day and sorted by tweet_id,
+    so a day's files only change when that day's rows do."""
+    os.makedirs(out_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(out_dir, "mentions_*.csv.gz")):
+        os.remove(stale)
+
+    spool_dir = tempfile.mkdtemp(dir=out_dir)
+    columns = None
+    try:
+        # Pass 1: stream the clean CSV into one uncompressed spool file per day.
+        chunks = pd.read_csv(
+            clean_csv, dtype=str, keep_default_na=False, chunksize=READ_CHUNKSIZE
+        )
+        for chunk in chunks:
+            columns = list(chunk.columns)
+            for day, rows in chunk.groupby(chunk["created_at"].str[:10], sort=False):
+                spool = os.path.join(spool_dir, f"{day}.csv")
+                rows.to_csv(spool, index=False, header=False, mode="a")
+
+        # Pass 2: sort each day and cut it into bounded, compressed partitions.
+        partitions = []
+        for spool in sorted(glob.glob(os.path.join(spool_dir, "*.csv"))):
+            day = os.path.basename(spool)[:-4]
+            rows = pd.read_csv(
+                spool, header=None, names=columns, dtype=str, keep_default_na=False
+            )
+            rows = rows.sort_values(["tweet_id", "text"], kind="stable")
+            for part, start in enumerate(range(0, len(rows), max_rows)):
+                piece = rows.iloc[start : start + max_rows]
+                body = piece.to_csv(index=False).encode("utf-8")
+                name = f"mentions_{day}_{part:03d}.csv.gz"
+                path = os.path.join(out_dir, name)
+                with open(path, "wb") as f:
+                    # mtime=0 keeps the gzip bytes reproducible.
+                    f.write(gzip.compress(body, mtime=0))
+                partitions.append(
+                    Partition(name, path, hashlib.sha256(body).hexdigest(), len(piece))
+                )
+        return partitions
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def plan(partitions: list[Partition], manifest: dict):
+    """Returns (new, changed) partitions relative to the manifest."""
+    new, changed = [], []
+    for partition in partitions:
+        entry = manifest.get(partition.name)
+        if entry is None:
+            new.append(partition)
+        elif entry["sha256"] != partition.sha256:
+            changed.append(partition)
+    return new, changed
+
+
+def put_partitions(partitions: list[Partition], connect, threads: int = PUT_THREADS):
+    """PUTs partitions to the stage in parallel, one connection per thread."""
+    local = threading.local()
+    opened = []
+    opened_lock = threading.Lock()
+
+    def put(partition: Partition):
+        if not hasattr(local, "conn"):
+            local.conn = connect()
+            with opened_lock:
+                opened.append(local.conn)
+        cursor = local.conn.cursor()
+        try:
+            path = partition.path.replace("\\", "/")
+            cursor.execute(
+                f"PUT 'file://{path}' {PARTITION_STAGE} "
+                f"AUTO_COMPRESS=FALSE SOURCE_COMPRESSION=GZIP OVERWRITE=TRUE"
+            )
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+            return list(pool.map(put, partitions))
+    finally:
+        for conn in opened:
+            conn.close()
+
+
+def files_pattern(partitions: list[Partition]) -> str:
+    """Stage PATTERN matching exactly the given partition files."""
+    names = "|".join(partition.name.replace(".", "[.]") for partition in partitions)
+    return f"(.*/)?({names})"
+
+
+def merge_partitions(cursor, partitions: list[Partition]) -> list:
+    """Loads only the tweet_ids of the given partitions not yet in RAW_MENTIONS.
+    New partitions go through it too: partition names are positional, so a
+    "new" file can hold rows an earlier run loaded under another name."""
+    cursor.execute(f"""
+        MERGE INTO RAW_MENTIONS t
+        USING (
+            SELECT $1 AS tweet_id, $2 AS "USER", $3::TIMESTAMP_NTZ AS created_at,
+                   $4 AS text, $5 AS source_label
+            FROM {PARTITION_STAGE} (
+                FILE_FORMAT => 'RAW_CSV_FORMAT',
+                PATTERN => '{files_pattern(partitions)}'
+            )
+        ) s
+        ON t.tweet_id = s.tweet_id
+        WHEN NOT MATCHED THEN INSERT (tweet_id, user, created_at, text, source_label)
+            VALUES (s.tweet_id, s."USER", s.created_at, s.text, s.source_label)
+    """)
+    return cursor.fetchall()
+
+
+def append(
+    connect=get_connection,
+    clean_csv: str = CLEAN_CSV,
+    threads: int = PUT_THREADS,
+    max_rows: int = PARTITION_MAX_ROWS,
+    manifest_path: str = MANIFEST_PATH,
+    out_dir: str = PARTITION_DIR,
+    record_manifest: bool = True,
+) -> dict:
+    """Incremental load: partition, diff against the manifest, PUT and load
+    only new or changed partitions, then record them in the manifest."""
+    partitions = write_partitions(clean_csv, out_dir, max_rows)
+    manifest = load_manifest(manifest_path)
+    new, changed = plan(partitions, manifest)
+    report = {
+        "partitions": len(partitions),
+        "new": len(new),
+        "changed": len(changed),
+        "unchanged": len(partitions) - len(new) - len(changed),
+        "rows_uploaded": sum(p.rows for p in new + changed),
+    }
+    if not new and not changed:
+        return report
+
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("ALTER WAREHOUSE SENTIMENT_WH RESUME IF SUSPENDED")
+        cursor.execute(
+            f"CREATE STAGE IF NOT EXISTS RAW_STAGE FILE_FORMAT = ({CSV_FORMAT_OPTIONS})"
+        )
+        cursor.execute(
+            f"CREATE FILE FORMAT IF NOT EXISTS RAW_CSV_FORMAT {CSV_FORMAT_OPTIONS}"
+        )
+
+        put_partitions(new + changed, connect, threads)
+
+        for row in merge_partitions(cursor, new + changed):
+            print(f"  MERGE result: {row}")
+    finally:
+        cursor.close()
+        conn.close()
 
+    if record_manifest:
+        loaded_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        for partition in new + changed:
+            manifest[partition.name] = {
+                "sha256": partition.sha256,
+                "rows": partition.rows,
+                "loaded_at": loaded_at,
+            }
+        save_manifest(manifest, manifest_path)
+    return report
+
+
+def replace():
+    """Full reload: PUT the clean CSV, truncate RAW_MENTIONS and COPY."""
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -46,15 +314,9 @@ def main():
 
         # Create stage if not exists
         print("Creating stage RAW_STAGE (if not exists)...")
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE STAGE IF NOT EXISTS RAW_STAGE
-                FILE_FORMAT = (
-                    TYPE = 'CSV'
-                    FIELD_OPTIONALLY_ENCLOSED_BY = '"'
-                    SKIP_HEADER = 1
-                    NULL_IF = ('', 'NULL')
-                    EMPTY_FIELD_AS_NULL = TRUE
-                )
+                FILE_FORMAT = ({CSV_FORMAT_OPTIONS})
         """)
 
         # Upload clean CSV to stage
@@ -71,16 +333,10 @@ def main():
 
         # COPY INTO RAW_MENTIONS
         print("Loading data into RAW_MENTIONS...")
-        cursor.execute("""
+        cursor.execute(f"""
             COPY INTO RAW_MENTIONS (tweet_id, user, created_at, text, source_label)
             FROM @RAW_STAGE/sentiment140_clean.csv.gz
-            FILE_FORMAT = (
-                TYPE = 'CSV'
-                FIELD_OPTIONALLY_ENCLOSED_BY = '"'
-                SKIP_HEADER = 1
-                NULL_IF = ('', 'NULL')
-                EMPTY_FIELD_AS_NULL = TRUE
-            )
+            FILE_FORMAT = ({CSV_FORMAT_OPTIONS})
             ON_ERROR = 'CONTINUE'
         """)
         copy_result = cursor.fetchall()
@@ -98,5 +354,49 @@ def main():
         print("Connection closed.")
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load sentiment140_clean.csv into Snowflake"
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Only upload and load new or changed partitions",
+    )
+    parser.add_argument("--threads", type=int, default=PUT_THREADS, help="Parallel PUTs")
+    parser.add_argument(
+        "--max-rows", type=int, default=PARTITION_MAX_ROWS, help="Rows per partition file"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --append: print stage operations without connecting",
+    )
+    args = parser.parse_args()
+
+    print(f"Clean CSV: {CLEAN_CSV}")
+    if not os.path.exists(CLEAN_CSV):
+        print("ERROR: Clean CSV not found. Run preprocessing.py first.")
+        return
+
+    if not args.append:
+        replace()
+        return
+
+    if args.dry_run:
+        recorder = RecordingConnection()
+        report = append(
+            lambda: recorder,
+            threads=args.threads,
+            max_rows=args.max_rows,
+            record_manifest=False,
+        )
+        for operation in recorder.operations:
+            print(f"  {operation}")
+    else:
+        report = append(threads=args.threads, max_rows=args.max_rows)
+    print(report)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,194 @@
+"""
+Preprocessing Benchmark
+Times preprocessing.py on a synthetic Sentiment140-shaped raw CSV and
+reports peak RSS for each mode. Every mode runs in its own subprocess so
+peak memory is measured independently. The clean CSVs are compared by hash
+to confirm the output is byte-identical.
+
+Modes:
+    legacy      whole file in memory, row-by-row strptime (previous behaviour)
+    vectorized  whole file in memory, pd.to_datetime per chunk (--chunksize 0)
+    streaming   chunked read and incremental write, once per --workers count
+
+Worker counts above the host's CPU cores run on shared cores, so they show
+pool overhead rather than parallel speedup; such rows are marked and no
+scaling figure should be read from them.
+
+Usage:
+    python preprocessing_benchmark.py                  # 1.6M synthetic rows
+    python preprocessing_benchmark.py --workers 1 2 4 8 --modes streaming
+    python preprocessing_benchmark.py --rows 200000 --limit 50000
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from preprocessing import (
+    COLUMN_NAMES,
+    DEFAULT_CHUNKSIZE,
+    POLARITY_MAP,
+    SAMPLE_SEED,
+    parse_timestamp,
+    preprocess,
+)
+
+MODES = ("legacy", "vectorized", "streaming")
+WORDS = (
+    "i love hate my new phone so much work today rain tired happy sad "
+    "movie lol omg school home sleep exam twitter"
+).split()
+
+
+def generate_raw_csv(path: str, rows: int, seed: int = 1600000) -> None:
+    """Writes a raw CSV in the Kaggle layout, including the rows the
+    preprocessor filters out (unknown polarity, bad dates, short text, RTs)."""
+    rnd = random.Random(seed)
+    days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    months = ["Apr", "May", "Jun"]
+    with open(path, "w", newline="", encoding="latin-1") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        for i in range(rows):
+            polarity = 3 if i % 1000 == 0 else rnd.choice((0, 2, 4))
+            date = (
+                f"{rnd.choice(days)} {rnd.choice(months)} {rnd.randint(1, 30):02d} "
+                f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:"
+                f"{rnd.randint(0, 59):02d} PDT 2009"
+            )
+            if i % 997 == 0:
+                date = "not a date"
+            text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 20)))
+            if i % 50 == 0:
+                text = "RT " + text
+            writer.writerow(
+                [polarity, 1467810000 + i, date, "NO_QUERY", f"user{rnd.randrange(10**5)}", text]
+            )
+
+
+def legacy_preprocess(raw_csv: str, clean_csv: str, limit: int) -> None:
+    """The previous implementation: full read_csv and per-row strptime."""
+    df = pd.read_csv(raw_csv, encoding="latin-1", header=None, names=COLUMN_NAMES)
+    if limit > 0 and limit < len(df):
+        df = df.sample(n=limit, random_state=SAMPLE_SEED)
+    df["source_label"] = df["polarity"].map(POLARITY_MAP)
+    df = df.dropna(subset=["source_label"])
+    df["created_at"] = df["date"].apply(parse_timestamp)
+    df = df.dropna(subset=["created_at"])
+    df = df[df["text"].astype(str).str.len() >= 5]
+    df = df[~df["text"].astype(str).str.startswith("RT ")]
+    result = df[["id", "user", "created_at", "text", "source_label"]].copy()
+    result.rename(columns={"id": "tweet_id"}, inplace=True)
+    result.to_csv(clean_csv, index=False)
+
+
+def run_mode(
+    mode: str, raw_csv: str, clean_csv: str, limit: int, chunksize: int, workers: int
+) -> dict:
+    started = time.perf_counter()
+    if mode == "legacy":
+        legacy_preprocess(raw_csv, clean_csv, limit)
+    elif mode == "vectorized":
+        preprocess(raw_csv, clean_csv, limit, 0)
+    else:
+        preprocess(raw_csv, clean_csv, limit, chunksize, workers)
+    elapsed = time.perf_counter() - started
+    with open(clean_csv, "rb") as f:
+        digest = hashlib.md5(f.read()).hexdigest()
+    return {
+        "mode": mode,
+        "seconds": round(elapsed, 2),
+        # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN covers pool workers.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "worker_peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1
+        ),
+        "md5": digest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Sentiment140 preprocessing")
+    parser.add_argument("--rows", type=int, default=1_600_000, help="Synthetic raw rows")
+    parser.add_argument("--limit", type=int, default=0, help="Sample size (0 = full dataset)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument(
+        "--workers", nargs="+", type=int, default=[1], help="Streaming worker counts"
+    )
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--raw", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        result = run_mode(
+            args.run, args.raw, args.out, args.limit, args.chunksize, args.workers[0]
+        )
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_csv = os.path.join(tmp, "raw.csv")
+        print(f"Generating {args.rows:,} synthetic raw rows...")
+        generate_raw_csv(raw_csv, args.rows)
+        print(f"  {os.path.getsize(raw_csv) / 1024**2:.1f} MB\n")
+
+        runs = [
+            (mode, workers)
+            for mode in args.modes
+            for workers in (args.workers if mode == "streaming" else [1])
+        ]
+        cores = os.cpu_count() or 1
+        results = []
+        for mode, workers in runs:
+            label = f"{mode} x{workers}" if mode == "streaming" else mode
+            if workers > cores:
+                label += "*"
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--run", mode,
+                    "--raw", raw_csv,
+                    "--out", os.path.join(tmp, f"clean_{mode}_{workers}.csv"),
+                    "--limit", str(args.limit),
+                    "--chunksize", str(args.chunksize),
+                    "--workers", str(workers),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(
+                f"{label:<13} {result['seconds']:>8.2f}s  "
+                f"peak RSS {result['peak_rss_mb']:>7.1f} MB "
+                f"(workers {result['worker_peak_rss_mb']:>6.1f} MB)  md5 {result['md5']}"
+            )
+
+        # Sampled output only matches df.sample (legacy) when nothing is sampled.
+        compared = [
+            result
+            for result in results
+            if args.limit <= 0 or result["mode"] != "legacy"
+        ]
+        identical = len({result["md5"] for result in compared}) == 1
+        print(f"\nOutputs byte-identical: {identical}")
+        print(f"CPU cores available: {cores}")
+        if any(workers > cores for _, workers in runs):
+            print("* more workers than cores: pool overhead only, not a scaling measurement")
+
+
+if __name__ == "__main__":
+    main()
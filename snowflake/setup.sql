@@ -53,18 +53,88 @@ CREATE TABLE IF NOT EXISTS SCORED_MENTIONS (
 );
 
 -- 6. Table 3 — WHY_LAYER_CACHE (LLM response cache)
---    cache_key = MD5 hash of (date_start || date_end || keyword || sentiment_type)
+--    cache_key = MD5 hash of (key version || date_start || date_end || keyword ||
+--    sentiment_type); see WHY_CACHE_KEY_VERSION in backend/cache.py
 --    24-hour TTL enforced by EXPIRE_WHY_CACHE task
 CREATE TABLE IF NOT EXISTS WHY_LAYER_CACHE (
     cache_key       VARCHAR    PRIMARY KEY,
     sentiment_type  VARCHAR,
     bullet_summary  VARCHAR,
     tweet_sample    VARCHAR,
+    content_key     VARCHAR,
     generated_at    TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
 );
+ALTER TABLE WHY_LAYER_CACHE ADD COLUMN IF NOT EXISTS content_key VARCHAR;
+
+-- 7. Table 4 — DAILY_SENTIMENT_ROLLUP (pre-aggregated dashboard source)
+--    One row per (day, sentiment_label, 0.2-wide score bucket).
+--    Maintained incrementally by the REFRESH_DAILY_ROLLUP task in tasks.sql.
+--    Keyword-free /api/summary, /api/trend, /api/distribution and
+--    /api/dashboard queries read from here instead of SCORED_MENTIONS.
+CREATE TABLE IF NOT EXISTS DAILY_SENTIMENT_ROLLUP (
+    day              DATE,
+    sentiment_label  VARCHAR,
+    bucket_start     FLOAT,
+    tweet_count      NUMBER,
+    score_sum        FLOAT,
+    score_count      NUMBER
+)
+CLUSTER BY (day);
+
+-- 8. Table 5 — MENTION_TOKENS (inverted keyword index)
+--    One row per distinct (token, tweet_id). Tokens are LOWER(text) split on
+--    runs of characters outside [a-z0-9_#@'] — keep in sync with
+--    backend/keyword_index.py. Maintained by BUILD_MENTION_TOKENS in tasks.sql.
+--    Clustering on token lets keyword semi-joins prune to a few micro-partitions.
+CREATE TABLE IF NOT EXISTS MENTION_TOKENS (
+    token       VARCHAR,
+    tweet_id    VARCHAR,
+    created_at  TIMESTAMP_NTZ
+)
+CLUSTER BY (token, DATE(created_at));
+
+-- 9. Table 6 — WHY_REQUEST_LOG (Why Layer request history)
+--    One row per POST /api/why. backend/prewarm.py reads the most-requested
+--    keys from here to prewarm WHY_LAYER_CACHE. Pruned by PRUNE_WHY_REQUEST_LOG.
+CREATE TABLE IF NOT EXISTS WHY_REQUEST_LOG (
+    cache_key       VARCHAR,
+    start_date      VARCHAR,
+    end_date        VARCHAR,
+    keyword         VARCHAR,
+    sentiment_type  VARCHAR,
+    requested_at    TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- 10. Table 7 — WHY_CONTENT_CACHE (content-addressed Cortex analyses)
+--    content_key = MD5 hash of (model || prompt_version || ordered tweet_ids)
+--    Different filter combinations that select the same tweets share one
+--    analysis. 7-day TTL enforced by EXPIRE_WHY_CONTENT_CACHE task.
+--    Cortex calls saved: compare parameter keys with distinct analyses:
+--      SELECT COUNT(DISTINCT cache_key)   AS parameter_keys,
+--             COUNT(DISTINCT content_key) AS cortex_analyses
+--      FROM WHY_LAYER_CACHE;
+CREATE TABLE IF NOT EXISTS WHY_CONTENT_CACHE (
+    content_key     VARCHAR    PRIMARY KEY,
+    model           VARCHAR,
+    prompt_version  VARCHAR,
+    bullet_summary  VARCHAR,
+    tweet_sample    VARCHAR,
+    generated_at    TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- 11. Table 8 — SCORING_CHECKPOINT (scoring driver progress)
+--    One row per job. backend/scoring.py records the (loaded_at, tweet_id)
+--    of the last RAW_MENTIONS row it scored, and resumes after it.
+CREATE TABLE IF NOT EXISTS SCORING_CHECKPOINT (
+    job                  VARCHAR    PRIMARY KEY,
+    watermark_loaded_at  TIMESTAMP_NTZ,
+    watermark_tweet_id   VARCHAR,
+    rows_scored          NUMBER DEFAULT 0,
+    updated_at           TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
 
 -- =============================================================
--- 7. Cortex Verification — run these manually after setup
+-- 12. Cortex Verification — run these manually after setup
 --    If either fails, your region does not support Cortex.
 --    Recreate the account in AWS us-east-1.
 -- =============================================================
@@ -8,28 +8,76 @@ USE SCHEMA MAIN;
 USE WAREHOUSE SENTIMENT_WH;
 
 -- Task 1: SCORE_NEW_MENTIONS
--- Runs hourly. Incrementally scores any new rows in RAW_MENTIONS
--- that don't yet have a matching tweet_id in SCORED_MENTIONS.
+-- Runs hourly. Scores the RAW_MENTIONS rows captured by an append-only stream
+-- since the last run; consuming the stream in the INSERT advances its offset,
+-- so every loaded row is considered exactly once, however old its loaded_at.
+-- Duplicates within a run are dropped before SENTIMENT is evaluated, once per
+-- row, and the label derived from it. The NOT EXISTS anti-joins on tweet_id
+-- against all of SCORED_MENTIONS, so a re-loaded tweet is never scored again.
+-- backend/scoring.py does the same work in checkpointed, resumable batches
+-- (SCORING_CHECKPOINT) for large backfills. Neither takes a lock, so suspend
+-- this task while scoring.py runs; rows the two picked up at the same time
+-- would otherwise be scored twice.
+CREATE OR REPLACE STREAM RAW_MENTIONS_STREAM
+    ON TABLE RAW_MENTIONS
+    APPEND_ONLY = TRUE;
+
+-- One-time catch-up of rows loaded before the stream existed.
+INSERT INTO SCORED_MENTIONS (tweet_id, user, created_at, text, source_label, loaded_at, sentiment_score, sentiment_label)
+SELECT
+    tweet_id,
+    "USER",
+    created_at,
+    text,
+    source_label,
+    loaded_at,
+    sentiment_score,
+    CASE
+        WHEN sentiment_score >= 0.2 THEN 'POSITIVE'
+        WHEN sentiment_score <= -0.2 THEN 'NEGATIVE'
+        ELSE 'NEUTRAL'
+    END AS sentiment_label
+FROM (
+    SELECT r.*, SNOWFLAKE.CORTEX.SENTIMENT(r.text) AS sentiment_score
+    FROM (
+        SELECT * FROM RAW_MENTIONS
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY tweet_id ORDER BY loaded_at DESC) = 1
+    ) r
+    WHERE NOT EXISTS (
+            SELECT 1 FROM SCORED_MENTIONS s WHERE s.tweet_id = r.tweet_id
+        )
+);
+
 CREATE OR REPLACE TASK SCORE_NEW_MENTIONS
     WAREHOUSE = SENTIMENT_WH
     SCHEDULE  = 'USING CRON 0 * * * * UTC'
 AS
     INSERT INTO SCORED_MENTIONS (tweet_id, user, created_at, text, source_label, loaded_at, sentiment_score, sentiment_label)
     SELECT
-        r.tweet_id,
-        r."USER",
-        r.created_at,
-        r.text,
-        r.source_label,
-        r.loaded_at,
-        SNOWFLAKE.CORTEX.SENTIMENT(r.text) AS sentiment_score,
+        tweet_id,
+        "USER",
+        created_at,
+        text,
+        source_label,
+        loaded_at,
+        sentiment_score,
         CASE
-            WHEN SNOWFLAKE.CORTEX.SENTIMENT(r.text) >= 0.2 THEN 'POSITIVE'
-            WHEN SNOWFLAKE.CORTEX.SENTIMENT(r.text) <= -0.2 THEN 'NEGATIVE'
+            WHEN sentiment_score >= 0.2 THEN 'POSITIVE'
+            WHEN sentiment_score <= -0.2 THEN 'NEGATIVE'
             ELSE 'NEUTRAL'
         END AS sentiment_label
-    FROM RAW_MENTIONS r
-    WHERE r.tweet_id NOT IN (SELECT tweet_id FROM SCORED_MENTIONS);
+    FROM (
+        SELECT r.*, SNOWFLAKE.CORTEX.SENTIMENT(r.text) AS sentiment_score
+        FROM (
+            SELECT tweet_id, "USER", created_at, text, source_label, loaded_at
+            FROM RAW_MENTIONS_STREAM
+            WHERE METADATA$ACTION = 'INSERT'
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY tweet_id ORDER BY loaded_at DESC) = 1
+        ) r
+        WHERE NOT EXISTS (
+                SELECT 1 FROM SCORED_MENTIONS s WHERE s.tweet_id = r.tweet_id
+            )
+    );
 
 -- Task 2: EXPIRE_WHY_CACHE
 -- Runs daily at midnight UTC, chained after SCORE_NEW_MENTIONS.
@@ -41,8 +89,122 @@ AS
     DELETE FROM WHY_LAYER_CACHE
     WHERE generated_at < DATEADD('hour', -24, CURRENT_TIMESTAMP());
 
--- Both tasks are created in SUSPENDED state by default.
+-- Task 3: REFRESH_DAILY_ROLLUP
+-- Chained after SCORE_NEW_MENTIONS. Folds newly scored rows (captured by an
+-- append-only stream) into DAILY_SENTIMENT_ROLLUP, so the rollup never
+-- rescans SCORED_MENTIONS. Consuming the stream in the MERGE advances its
+-- offset, so each scored row is counted exactly once.
+CREATE OR REPLACE STREAM SCORED_MENTIONS_STREAM
+    ON TABLE SCORED_MENTIONS
+    APPEND_ONLY = TRUE;
+
+-- One-time backfill of rows scored before the stream existed. Re-running
+-- this file recreates the stream, so the rollup is rebuilt alongside it.
+INSERT OVERWRITE INTO DAILY_SENTIMENT_ROLLUP
+    (day, sentiment_label, bucket_start, tweet_count, score_sum, score_count)
+SELECT
+    DATE(created_at),
+    sentiment_label,
+    FLOOR(sentiment_score * 5) / 5,
+    COUNT(*),
+    COALESCE(SUM(sentiment_score), 0),
+    COUNT(sentiment_score)
+FROM SCORED_MENTIONS
+GROUP BY 1, 2, 3;
+
+CREATE OR REPLACE TASK REFRESH_DAILY_ROLLUP
+    WAREHOUSE = SENTIMENT_WH
+    AFTER SCORE_NEW_MENTIONS
+    WHEN SYSTEM$STREAM_HAS_DATA('SCORED_MENTIONS_STREAM')
+AS
+    MERGE INTO DAILY_SENTIMENT_ROLLUP t
+    USING (
+        SELECT
+            DATE(created_at) AS day,
+            sentiment_label,
+            FLOOR(sentiment_score * 5) / 5 AS bucket_start,
+            COUNT(*) AS tweet_count,
+            COALESCE(SUM(sentiment_score), 0) AS score_sum,
+            COUNT(sentiment_score) AS score_count
+        FROM SCORED_MENTIONS_STREAM
+        WHERE METADATA$ACTION = 'INSERT'
+        GROUP BY 1, 2, 3
+    ) s
+    ON  t.day = s.day
+    AND EQUAL_NULL(t.sentiment_label, s.sentiment_label)
+    AND EQUAL_NULL(t.bucket_start, s.bucket_start)
+    WHEN MATCHED THEN UPDATE SET
+        tweet_count = t.tweet_count + s.tweet_count,
+        score_sum   = t.score_sum + s.score_sum,
+        score_count = t.score_count + s.score_count
+    WHEN NOT MATCHED THEN INSERT
+        (day, sentiment_label, bucket_start, tweet_count, score_sum, score_count)
+        VALUES (s.day, s.sentiment_label, s.bucket_start, s.tweet_count, s.score_sum, s.score_count);
+
+-- Task 4: BUILD_MENTION_TOKENS
+-- Chained after SCORE_NEW_MENTIONS. Tokenizes newly scored tweets into the
+-- MENTION_TOKENS inverted index used for keyword filters. Has its own stream
+-- so it consumes SCORED_MENTIONS changes independently of the rollup.
+CREATE OR REPLACE STREAM MENTION_TOKENS_STREAM
+    ON TABLE SCORED_MENTIONS
+    APPEND_ONLY = TRUE;
+
+-- One-time backfill of tweets scored before the stream existed.
+INSERT OVERWRITE INTO MENTION_TOKENS (token, tweet_id, created_at)
+SELECT DISTINCT
+    t.value::VARCHAR,
+    s.tweet_id,
+    s.created_at
+FROM SCORED_MENTIONS s,
+    LATERAL SPLIT_TO_TABLE(REGEXP_REPLACE(LOWER(s.text), '[^a-z0-9_#@'']+', ' '), ' ') t
+WHERE t.value <> '';
+
+CREATE OR REPLACE TASK BUILD_MENTION_TOKENS
+    WAREHOUSE = SENTIMENT_WH
+    AFTER SCORE_NEW_MENTIONS
+    WHEN SYSTEM$STREAM_HAS_DATA('MENTION_TOKENS_STREAM')
+AS
+    INSERT INTO MENTION_TOKENS (token, tweet_id, created_at)
+    SELECT DISTINCT
+        t.value::VARCHAR,
+        s.tweet_id,
+        s.created_at
+    FROM MENTION_TOKENS_STREAM s,
+        LATERAL SPLIT_TO_TABLE(REGEXP_REPLACE(LOWER(s.text), '[^a-z0-9_#@'']+', ' '), ' ') t
+    WHERE s.METADATA$ACTION = 'INSERT'
+      AND t.value <> '';
+
+-- Task 5: PRUNE_WHY_REQUEST_LOG
+-- Runs daily. Keeps 30 days of Why request history for prewarm targeting.
+CREATE OR REPLACE TASK PRUNE_WHY_REQUEST_LOG
+    WAREHOUSE = SENTIMENT_WH
+    SCHEDULE  = 'USING CRON 30 0 * * * UTC'
+AS
+    DELETE FROM WHY_REQUEST_LOG
+    WHERE requested_at < DATEADD('day', -30, CURRENT_TIMESTAMP());
+
+-- Task 6: EXPIRE_WHY_CONTENT_CACHE
+-- Runs daily. Deletes content-addressed analyses older than 7 days
+-- (WHY_CONTENT_CACHE_TTL_HOURS in backend/cache.py).
+CREATE OR REPLACE TASK EXPIRE_WHY_CONTENT_CACHE
+    WAREHOUSE = SENTIMENT_WH
+    SCHEDULE  = 'USING CRON 45 0 * * * UTC'
+AS
+    DELETE FROM WHY_CONTENT_CACHE
+    WHERE generated_at < DATEADD('day', -7, CURRENT_TIMESTAMP());
+
+-- After each scoring run, refresh the Why cache for the default ranges and
+-- most-requested keys from outside Snowflake (tasks cannot call Cortex via
+-- the backend):
+--   python backend/prewarm.py --watch
+
+-- All tasks are created in SUSPENDED state by default.
 -- To activate, run:
+--   ALTER TASK EXPIRE_WHY_CONTENT_CACHE RESUME;
+--   ALTER TASK PRUNE_WHY_REQUEST_LOG RESUME;
+--   ALTER TASK BUILD_MENTION_TOKENS RESUME;
+--   ALTER TASK REFRESH_DAILY_ROLLUP RESUME;
 --   ALTER TASK EXPIRE_WHY_CACHE RESUME;
 --   ALTER TASK SCORE_NEW_MENTIONS RESUME;
--- Note: Child task (EXPIRE_WHY_CACHE) must be resumed BEFORE the root task.
+-- Note: Child tasks (BUILD_MENTION_TOKENS, REFRESH_DAILY_ROLLUP,
+-- EXPIRE_WHY_CACHE) must be resumed BEFORE the root task.
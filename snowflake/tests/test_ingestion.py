@@ -0,0 +1,101 @@
+import csv
+import gzip
+import io
+import os
+import re
+import threading
+
+import ingestion
+
+
+class FakeSnowflake:
+    """Just enough of a stage and RAW_MENTIONS to run append(): PUT copies a
+    local file onto the stage, COPY INTO loads the listed files as they are,
+    and the MERGE loads only tweet_ids RAW_MENTIONS does not hold yet."""
+
+    def __init__(self):
+        self.stage: dict[str, bytes] = {}
+        self.raw: list[str] = []
+        self.lock = threading.Lock()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self) -> None:
+        pass
+
+    def staged_ids(self, names) -> list[str]:
+        ids = []
+        for name in names:
+            body = gzip.decompress(self.stage[name]).decode("utf-8")
+            ids.extend(row["tweet_id"] for row in csv.DictReader(io.StringIO(body)))
+        return ids
+
+
+class FakeCursor:
+    def __init__(self, db: FakeSnowflake):
+        self.db = db
+
+    def execute(self, sql: str, params=None):
+        with self.db.lock:
+            if sql.startswith("PUT"):
+                path = re.search(r"'file://([^']+)'", sql).group(1)
+                with open(path, "rb") as f:
+                    self.db.stage[os.path.basename(path)] = f.read()
+            elif "COPY INTO RAW_MENTIONS" in sql:
+                names = re.search(r"FILES = \(([^)]*)\)", sql).group(1)
+                self.db.raw.extend(self.db.staged_ids(re.findall(r"'([^']+)'", names)))
+            elif "MERGE INTO RAW_MENTIONS" in sql:
+                single = re.search(r"partitions/(mentions_\S+)", sql)
+                if single:
+                    names = [single.group(1)]
+                else:
+                    pattern = re.search(r"PATTERN => '([^']+)'", sql).group(1)
+                    names = [n for n in self.db.stage if re.fullmatch(pattern, f"partitions/{n}")]
+                loaded = set(self.db.raw)
+                for tweet_id in self.db.staged_ids(names):
+                    if tweet_id not in loaded:
+                        self.db.raw.append(tweet_id)
+                        loaded.add(tweet_id)
+        return self
+
+    def fetchall(self) -> list:
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+def write_clean_csv(path: str, tweet_ids: list[int]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["tweet_id", "user", "created_at", "text", "source_label"])
+        for tweet_id in tweet_ids:
+            writer.writerow([tweet_id, "someone", "2009-04-06 22:19:45", f"tweet {tweet_id}", 0])
+
+
+def test_append_does_not_reload_rows_shifted_into_a_new_partition(tmp_path):
+    db = FakeSnowflake()
+    clean_csv = str(tmp_path / "clean.csv")
+    options = dict(
+        clean_csv=clean_csv,
+        max_rows=4,
+        manifest_path=str(tmp_path / "manifest.json"),
+        out_dir=str(tmp_path / "partitions"),
+        threads=2,
+    )
+
+    write_clean_csv(clean_csv, [200, 300, 400, 500])
+    first = ingestion.append(lambda: db, **options)
+    assert (first["new"], first["changed"]) == (1, 0)
+    assert sorted(db.raw) == ["200", "300", "400", "500"]
+
+    # 100 sorts first, so 500 moves out of _000 into the new _001 partition.
+    write_clean_csv(clean_csv, [100, 200, 300, 400, 500])
+    second = ingestion.append(lambda: db, **options)
+    assert (second["new"], second["changed"]) == (1, 1)
+    assert sorted(db.raw) == ["100", "200", "300", "400", "500"]
+
+    third = ingestion.append(lambda: db, **options)
+    assert (third["new"], third["changed"], third["unchanged"]) == (0, 0, 2)
+    assert len(db.raw) == 5
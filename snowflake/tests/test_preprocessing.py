@@ -0,0 +1,33 @@
+import csv
+
+import pytest
+
+import preprocessing
+
+
+def write_raw_csv(path, rows: int) -> None:
+    with open(path, "w", newline="", encoding="latin-1") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        for i in range(rows):
+            writer.writerow([
+                0 if i % 2 else 4, 1000 + i, "Mon Apr 06 22:19:45 PDT 2009",
+                "NO_QUERY", f"user{i}", f"tweet number {i}",
+            ])
+
+
+def test_failed_worker_removes_part_files(tmp_path, monkeypatch):
+    raw_csv = tmp_path / "raw.csv"
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    write_raw_csv(raw_csv, 200)
+
+    def fail(df, dropped):
+        raise ValueError("worker failed")
+
+    # Workers are forked, so they see the patched clean_chunk.
+    monkeypatch.setattr(preprocessing, "clean_chunk", fail)
+    with pytest.raises(ValueError, match="worker failed"):
+        preprocessing.preprocess(
+            str(raw_csv), str(out_dir / "clean.csv"), limit=0, chunksize=50, workers=2
+        )
+    assert [p.name for p in out_dir.iterdir()] == ["clean.csv"]